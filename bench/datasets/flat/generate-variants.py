@@ -2,9 +2,28 @@
 """
 Generate dataset variants for benchmark testing.
 Same structure, different content to avoid prompt cache contamination.
+
+Usage:
+    generate-variants.py                                # 10/50/100/500, variants a-e
+    generate-variants.py --count 1000000 --variant a    # streamed, one row at a time
+    generate-variants.py --count 10000000 --format ndjson -j 8 -o users.ndjson
+
+With --count the rows are streamed to disk instead of built as a list, so
+any row count runs in constant memory. --format picks indented JSON (the
+layout of the committed files), compact JSON or NDJSON (one user object
+per line, no {"users": ...} wrapper). -j splits the id range into
+contiguous slices written by separate processes and then concatenated, so
+the output is byte-identical for any -j. Streamed files go to
+bench/scale/flat/{count}/ by default, which is gitignored and outside
+bench/datasets, so encode-all.py does not pick them up.
 """
 
+import argparse
 import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Variant configurations: (theme, domain, first_names, last_names)
@@ -245,7 +264,79 @@ def generate_dataset(count, variant_key):
     return {"users": users}
 
 
-def main():
+SCALE_DIR = Path(__file__).parent.parent.parent / "scale" / "flat"
+
+STREAM_FORMATS = {
+    # format: (extension, head, row separator, tail)
+    "pretty": (".json", '{\n  "users": [\n', ",\n", '\n  ]\n}\n'),
+    "compact": (".json", '{"users":[', ",", "]}\n"),
+    "ndjson": (".ndjson", "", "\n", "\n"),
+}
+
+
+def format_user(user, fmt):
+    """One user as it appears in a streamed file of the given format."""
+    if fmt == "pretty":
+        return "\n".join("    " + line for line in json.dumps(user, indent=2).split("\n"))
+    return json.dumps(user, separators=(",", ":"))
+
+
+def write_rows(path, variant_key, start, stop, fmt):
+    """
+    Write users start..stop-1 (1-indexed ids) to `path`, each preceded by
+    the row separator except the very first row of the dataset, so slices
+    written separately concatenate into one file.
+    """
+
+    config = VARIANTS[variant_key]
+    separator = STREAM_FORMATS[fmt][2]
+    with open(path, "w", buffering=1 << 20) as f:
+        for index in range(start, stop):
+            if index > 1:
+                f.write(separator)
+            f.write(format_user(generate_user(index, config), fmt))
+    return stop - start
+
+
+def split_range(count, parts):
+    """Contiguous 1-indexed [start, stop) slices covering ids 1..count."""
+    parts = max(1, min(parts, count))
+    bounds = [1 + count * i // parts for i in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def stream_dataset(count, variant_key, output, fmt="pretty", jobs=1):
+    """Write a `count`-row dataset to `output` without holding the rows in memory."""
+
+    _, head, _, tail = STREAM_FORMATS[fmt]
+    output.parent.mkdir(parents=True, exist_ok=True)
+    slices = split_range(count, jobs) if count else []
+    parts = [output.with_name(f"{output.name}.part{i}") for i in range(len(slices))]
+    try:
+        if len(slices) > 1:
+            with ProcessPoolExecutor(max_workers=len(slices)) as pool:
+                futures = [pool.submit(write_rows, part, variant_key, start, stop, fmt)
+                           for part, (start, stop) in zip(parts, slices)]
+                for future in futures:
+                    future.result()
+        elif slices:
+            write_rows(parts[0], variant_key, *slices[0], fmt)
+
+        with open(output, "w") as out:
+            if not count:
+                out.write(head.rstrip() + tail.lstrip())
+                return
+            out.write(head)
+            for part in parts:
+                with open(part, "r") as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+            out.write(tail)
+    finally:
+        for part in parts:
+            part.unlink(missing_ok=True)
+
+
+def generate_standard():
     base_path = Path(__file__).parent
     sizes = [10, 50, 100, 500]
     variant_keys = ["a", "b", "c", "d", "e"]
@@ -267,5 +358,31 @@ def main():
     print(f"\nGenerated {len(sizes) * len(variant_keys)} dataset variants.")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Generate flat user dataset variants.")
+    parser.add_argument("--count", type=int, help="stream one dataset with this many users")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="a", help="content variant (default: a)")
+    parser.add_argument("--format", choices=list(STREAM_FORMATS), default="pretty",
+                        help="streamed layout (default: pretty, as the committed files)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="processes writing slices of the id range (default: 1; 0 = one per CPU)")
+    parser.add_argument("-o", "--output", type=Path,
+                        help="output file (default: bench/scale/flat/{count}/variant-{v}.json|.ndjson)")
+    args = parser.parse_args()
+
+    if args.count is None:
+        generate_standard()
+        return
+    if args.count < 0:
+        print("Error: --count must not be negative", file=sys.stderr)
+        sys.exit(1)
+
+    extension = STREAM_FORMATS[args.format][0]
+    output = args.output or SCALE_DIR / str(args.count) / f"variant-{args.variant}{extension}"
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    stream_dataset(args.count, args.variant, output, args.format, jobs)
+    print(f"Generated {output} ({args.count:,} users, {output.stat().st_size:,} bytes)")
+
+
 if __name__ == "__main__":
     main()
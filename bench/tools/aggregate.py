@@ -1,189 +1,340 @@
 #!/usr/bin/env python3
 """
-Aggregate token results into summary report.
+Aggregate benchmark results into a summary report.
 
 Usage:
     aggregate.py <results-dir>
+    aggregate.py <results-dir> --db results.db
 
-Reads token-counts.json entries and produces:
+Streams every split results file ({model}-{dataset}.jsonl, as written by
+run-benchmark.sh / run-benchmark.py) once, or reads the results store with
+--db, and groups the runs by format, model and dataset. Produces:
 - results/summary.md - Human readable tables
 - results/comparison.json - Machine readable results
 
+Per cell: mean input/output/cache tokens, mean and total cost, and the
+p50/p95 of duration_ms and duration_api_ms. Per format: the change against
+JSON over the model/dataset cells both have.
+
+With repeated trials (run-benchmark.py --repeat N) it also reports
+bootstrap 95% confidence intervals for the per-cell means of input tokens,
+cost and duration_api_ms, and the paired difference of each format
+against JSON (runs paired by model, dataset and trial index). NumPy is
+used for the resampling when installed (harness/stats.py).
+
 Expected structure:
     results-dir/
-        flat-10-json/token-counts.json
-        flat-10-ascii/token-counts.json
-        flat-10-light/token-counts.json
-        flat-10-full/token-counts.json
+        haiku-flat-10.jsonl
+        haiku-nested-deep.jsonl
+        sonnet-flat-100.jsonl
         ...
 """
 
 import json
 import sys
-from pathlib import Path
-from typing import Dict, Any, List
 from collections import defaultdict
+from pathlib import Path
+from typing import Iterator, Optional
 
+from harness.matrix import DATASETS, FORMATS, MODELS
+from harness.stats import bootstrap_ci, paired_difference
 
-def parse_dir_name(dirname: str) -> tuple:
-    """
-    Parse directory name into (dataset, format).
-
-    Examples:
-        'flat-10-json' -> ('flat/10', 'json')
-        'nested-100-ascii' -> ('nested/100', 'ascii')
-    """
-
-    parts = dirname.split('-')
-    if len(parts) < 3:
-        return None, None
+TOKEN_METRICS = ['input_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens', 'output_tokens']
+LATENCY_METRICS = ['duration_ms', 'duration_api_ms']
+CI_METRICS = ['input_tokens', 'total_cost_usd', 'duration_api_ms']
+LEGACY_FILES = {'token-counts.jsonl'}
 
-    dataset_type = parts[0]  # flat, nested, deep
-    dataset_size = parts[1]   # 10, 100, 1000
-    format_name = '-'.join(parts[2:])  # json, ascii, light, full
 
-    dataset = f"{dataset_type}/{dataset_size}"
+def iter_results(results_dir: Path) -> Iterator[dict]:
+    """Every result object in the split JSONL files, one line at a time."""
 
-    return dataset, format_name
+    for path in sorted(results_dir.glob('*.jsonl')):
+        if path.name in LEGACY_FILES:
+            continue  # monolithic pre-split file; its entries are in the split files
+        with open(path, 'r') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    print(f"Warning: {path.name}:{number}: {e}", file=sys.stderr)
 
 
-def load_results(results_dir: Path) -> Dict[str, Dict[str, Any]]:
+def group_results(records) -> tuple[dict, dict]:
     """
-    Load all token-counts.json files from results directory.
-
-    Returns dict mapping (dataset, format) -> token counts
+    Returns (cells, trials):
+    (format, model, dataset) -> metric -> values over runs, and
+    (format, model, dataset) -> trial -> metric -> values in that trial.
     """
 
-    results = defaultdict(dict)
-
-    for subdir in results_dir.iterdir():
-        if not subdir.is_dir():
-            continue
-
-        token_file = subdir / 'token-counts.json'
-        if not token_file.exists():
-            print(f"Warning: No token-counts.json in {subdir.name}", file=sys.stderr)
+    cells: dict = defaultdict(lambda: defaultdict(list))
+    trials: dict = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    for record in records:
+        try:
+            key = (record['format'], record['model'], record['dataset'])
+        except KeyError:
             continue
+        values = cells[key]
+        by_trial = trials[key][record.get('trial') or 0]
+        usage = record.get('usage') or {}
+        for metric in TOKEN_METRICS:
+            values[metric].append(usage.get(metric) or 0)
+            by_trial[metric].append(usage.get(metric) or 0)
+        for metric in ['total_cost_usd'] + LATENCY_METRICS:
+            if record.get(metric) is not None:
+                values[metric].append(record[metric])
+                by_trial[metric].append(record[metric])
+    return cells, trials
+
+
+def percentile(values: list, q: float) -> Optional[float]:
+    """q-th percentile (0-100) with linear interpolation between ranks."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def mean(values: list) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def summarize_cell(values: dict[str, list]) -> dict:
+    costs = values.get('total_cost_usd', [])
+    cell = {
+        'runs': len(values['input_tokens']),
+        **{metric: mean(values[metric]) for metric in TOKEN_METRICS},
+        'total_cost_usd': mean(costs),
+        'total_cost_usd_sum': sum(costs),
+        'duration_api_ms_mean': mean(values.get('duration_api_ms', [])),
+    }
+    for metric in LATENCY_METRICS:
+        cell[f"{metric}_p50"] = percentile(values.get(metric, []), 50)
+        cell[f"{metric}_p95"] = percentile(values.get(metric, []), 95)
+    cell['ci95'] = {metric: bootstrap_ci(values.get(metric, [])) for metric in CI_METRICS}
+    return cell
 
-        dataset, format_name = parse_dir_name(subdir.name)
-        if not dataset or not format_name:
-            print(f"Warning: Could not parse directory name: {subdir.name}",
-                  file=sys.stderr)
-            continue
 
-        try:
-            with open(token_file, 'r') as f:
-                data = json.load(f)
-                results[dataset][format_name] = data
-        except Exception as e:
-            print(f"Warning: Error reading {token_file}: {e}", file=sys.stderr)
-            continue
+DELTA_METRICS = TOKEN_METRICS + ['total_cost_usd', 'duration_ms_p50', 'duration_ms_p95',
+                                 'duration_api_ms_p50', 'duration_api_ms_p95']
 
-    return dict(results)
 
+def format_deltas(cells: dict[tuple, dict]) -> dict[str, dict]:
+    """
+    Per format: percent change against JSON, summed over the (model, dataset)
+    cells where both have results, so every format is compared on the same work.
+    """
 
-def format_number(n: int) -> str:
-    """Format number with commas for readability."""
-    return f"{n:,}"
+    deltas = {}
+    for fmt in sorted({key[0] for key in cells}, key=format_order):
+        ours: dict = defaultdict(float)
+        base: dict = defaultdict(float)
+        matched = 0
+        for (cell_format, model, dataset), cell in cells.items():
+            baseline = cells.get(('json', model, dataset))
+            if cell_format != fmt or baseline is None:
+                continue
+            matched += 1
+            for metric in DELTA_METRICS:
+                if cell[metric] is not None and baseline[metric] is not None:
+                    ours[metric] += cell[metric]
+                    base[metric] += baseline[metric]
+        deltas[fmt] = {
+            'cells': matched,
+            **{metric: ((ours[metric] - base[metric]) / base[metric] * 100 if base[metric] else None)
+               for metric in DELTA_METRICS},
+        }
+    return deltas
 
 
-def generate_markdown_table(results: Dict[str, Dict[str, Any]],
-                            metric: str = 'total_all') -> str:
+def paired_deltas(trials: dict) -> dict[str, dict]:
     """
-    Generate markdown comparison table.
-
-    metric: which token count to compare (total_all, input_tokens, etc)
+    Per format and metric: mean paired relative difference against JSON with
+    its bootstrap interval. A pair is one (model, dataset, trial) that both
+    formats ran; repeated runs of the same trial are averaged first.
     """
 
-    # Get all datasets and formats
-    datasets = sorted(results.keys())
-
-    if not datasets:
-        return "No results found.\n"
+    paired = {}
+    for fmt in sorted({key[0] for key in trials}, key=format_order):
+        if fmt == 'json':
+            continue
+        paired[fmt] = {}
+        for metric in CI_METRICS:
+            ours, base = [], []
+            for (cell_format, model, dataset), by_trial in trials.items():
+                baseline = trials.get(('json', model, dataset))
+                if cell_format != fmt or baseline is None:
+                    continue
+                for trial, values in by_trial.items():
+                    if values[metric] and trial in baseline and baseline[trial][metric]:
+                        ours.append(mean(values[metric]))
+                        base.append(mean(baseline[trial][metric]))
+            paired[fmt][metric] = paired_difference(ours, base)
+    return paired
+
+
+def format_order(fmt: str) -> tuple:
+    return (FORMATS.index(fmt) if fmt in FORMATS else len(FORMATS), fmt)
+
+
+def cell_order(key: tuple) -> tuple:
+    fmt, model, dataset = key
+    return (
+        DATASETS.index(dataset) if dataset in DATASETS else len(DATASETS), dataset,
+        MODELS.index(model) if model in MODELS else len(MODELS), model,
+        format_order(fmt),
+    )
+
+
+def format_number(n: Optional[float]) -> str:
+    """Format number with commas for readability."""
+    return "-" if n is None else f"{n:,.0f}"
 
-    # Determine available formats from first dataset
-    formats = ['json', 'ascii', 'light', 'full']
-    available_formats = []
 
-    for fmt in formats:
-        if any(fmt in results[ds] for ds in datasets):
-            available_formats.append(fmt)
+def format_delta(delta: Optional[float]) -> str:
+    return "-" if delta is None else f"{delta:+.1f}%"
 
-    if not available_formats:
-        return "No format data found.\n"
 
-    # Build table
-    lines = []
+def format_ci(ci: Optional[tuple], digits: int = 0) -> str:
+    return "-" if ci is None else f"{ci[0]:,.{digits}f} – {ci[1]:,.{digits}f}"
 
-    # Header
-    header = "| Dataset | " + " | ".join(f.capitalize() for f in available_formats) + " |"
-    separator = "|---------|" + "|".join("--------" for _ in available_formats) + "|"
 
-    lines.append(header)
-    lines.append(separator)
+def generate_ci_table(cells: dict[tuple, dict]) -> str:
+    lines = [
+        "| Dataset | Model | Format | Runs | Input (95% CI) | Cost USD (95% CI) | API ms (95% CI) |",
+        "|---------|-------|--------|------|----------------|-------------------|-----------------|",
+    ]
+    for key in sorted(cells, key=cell_order):
+        fmt, model, dataset = key
+        cell = cells[key]
+        ci = cell['ci95']
+        cost = "-" if cell['total_cost_usd'] is None else f"{cell['total_cost_usd']:.4f}"
+        lines.append(
+            f"| {dataset} | {model} | {fmt} | {cell['runs']} "
+            f"| {format_number(cell['input_tokens'])} ({format_ci(ci['input_tokens'])}) "
+            f"| {cost} ({format_ci(ci['total_cost_usd'], 4)}) "
+            f"| {format_number(cell['duration_api_ms_mean'])} ({format_ci(ci['duration_api_ms'])}) |"
+        )
+    return "\n".join(lines)
 
-    # Rows
-    for dataset in datasets:
-        row_data = [dataset]
 
-        for fmt in available_formats:
-            if fmt in results[dataset]:
-                value = results[dataset][fmt].get(metric, 0)
-                row_data.append(format_number(value))
+def generate_paired_table(paired: dict[str, dict]) -> str:
+    lines = [
+        "| Format | Pairs | Input tokens | Cost | API ms |",
+        "|--------|-------|--------------|------|--------|",
+    ]
+    for fmt, metrics in paired.items():
+        cells = []
+        for metric in CI_METRICS:
+            result = metrics[metric]
+            if result is None:
+                cells.append("-")
+            elif result['ci'] is None:
+                cells.append(format_delta(result['mean']))
             else:
-                row_data.append("-")
+                low, high = result['ci']
+                cells.append(f"{format_delta(result['mean'])} [{low:+.1f}, {high:+.1f}]")
+        pairs = max((metrics[m]['pairs'] for m in CI_METRICS if metrics[m]), default=0)
+        lines.append(f"| {fmt} | {pairs} | " + " | ".join(cells) + " |")
+    return "\n".join(lines)
 
-        row = "| " + " | ".join(row_data) + " |"
-        lines.append(row)
 
+def generate_cell_table(cells: dict[tuple, dict]) -> str:
+    lines = [
+        "| Dataset | Model | Format | Runs | Input | Cache write | Cache read | Output "
+        "| Cost (USD) | p50 ms | p95 ms | p50 API ms | p95 API ms |",
+        "|---------|-------|--------|------|-------|-------------|------------|--------"
+        "|------------|--------|--------|------------|------------|",
+    ]
+    for key in sorted(cells, key=cell_order):
+        fmt, model, dataset = key
+        cell = cells[key]
+        cost = "-" if cell['total_cost_usd'] is None else f"{cell['total_cost_usd']:.4f}"
+        lines.append(
+            f"| {dataset} | {model} | {fmt} | {cell['runs']} "
+            f"| {format_number(cell['input_tokens'])} | {format_number(cell['cache_creation_input_tokens'])} "
+            f"| {format_number(cell['cache_read_input_tokens'])} | {format_number(cell['output_tokens'])} "
+            f"| {cost} | {format_number(cell['duration_ms_p50'])} | {format_number(cell['duration_ms_p95'])} "
+            f"| {format_number(cell['duration_api_ms_p50'])} | {format_number(cell['duration_api_ms_p95'])} |"
+        )
+    return "\n".join(lines)
+
+
+def generate_delta_table(deltas: dict[str, dict]) -> str:
+    lines = [
+        "| Format | Cells | Input | Cache write | Cache read | Output | Cost | p50 ms | p95 ms | p50 API ms | p95 API ms |",
+        "|--------|-------|-------|-------------|------------|--------|------|--------|--------|------------|------------|",
+    ]
+    for fmt, delta in deltas.items():
+        lines.append(f"| {fmt} | {delta['cells']} | "
+                     + " | ".join(format_delta(delta[metric]) for metric in DELTA_METRICS) + " |")
     return "\n".join(lines)
 
 
-def generate_summary(results: Dict[str, Dict[str, Any]]) -> str:
+def generate_summary(cells: dict[tuple, dict], deltas: dict[str, dict], paired: dict[str, dict]) -> str:
     """Generate complete summary markdown."""
 
+    runs = sum(cell['runs'] for cell in cells.values())
+    cost = sum(cell['total_cost_usd_sum'] for cell in cells.values())
     sections = [
-        "# Token Usage Comparison",
+        "# Benchmark Results",
         "",
-        "## Total Tokens (All Sources)",
+        f"{runs} runs over {len(cells)} cells, ${cost:.2f} total.",
         "",
-        generate_markdown_table(results, 'total_all'),
+        "## Change vs JSON",
         "",
-        "## Input Tokens (Non-Cached)",
+        "Percent change of each format's per-cell means (tokens, cost) and",
+        "percentiles (latency) against JSON, over the model/dataset cells both have.",
+        "Negative is better.",
         "",
-        generate_markdown_table(results, 'input_tokens'),
+        generate_delta_table(deltas),
         "",
-        "## Cache Read Tokens",
+        "## Paired Difference vs JSON",
         "",
-        generate_markdown_table(results, 'cache_read_input_tokens'),
+        "Mean per-pair percent change against JSON with its bootstrap 95% interval,",
+        "pairing runs by model, dataset and trial. An interval that spans zero is",
+        "no evidence of a difference.",
         "",
-        "## Output Tokens",
+        generate_paired_table(paired),
         "",
-        generate_markdown_table(results, 'output_tokens'),
+        "## Per Cell",
+        "",
+        "Tokens and cost are means over runs; latencies are percentiles over runs.",
+        "",
+        generate_cell_table(cells),
+        "",
+        "## Per Cell Confidence Intervals",
+        "",
+        "Means with bootstrap 95% intervals (cells with at least two runs).",
+        "",
+        generate_ci_table(cells),
         "",
     ]
-
     return "\n".join(sections)
 
 
-def generate_comparison_json(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+def generate_comparison_json(cells: dict[tuple, dict], deltas: dict[str, dict],
+                             paired: dict[str, dict]) -> dict:
     """Generate machine-readable comparison data."""
 
-    comparison = {
-        'datasets': {},
+    return {
+        'cells': [
+            {'format': fmt, 'model': model, 'dataset': dataset, **cells[(fmt, model, dataset)]}
+            for fmt, model, dataset in sorted(cells, key=cell_order)
+        ],
+        'vs_json': deltas,
+        'paired_vs_json': paired,
         'summary': {
-            'formats': ['json', 'ascii', 'light', 'full'],
-            'metrics': ['input_tokens', 'cache_read_input_tokens',
-                       'cache_creation_input_tokens', 'output_tokens',
-                       'total_input', 'total_all']
-        }
+            'formats': sorted({key[0] for key in cells}, key=format_order),
+            'metrics': TOKEN_METRICS + ['total_cost_usd', 'total_cost_usd_sum', 'duration_api_ms_mean']
+                       + [f"{metric}_{p}" for metric in LATENCY_METRICS for p in ('p50', 'p95')],
+        },
     }
 
-    for dataset, formats in results.items():
-        comparison['datasets'][dataset] = formats
-
-    return comparison
-
 
 def main():
     """Main entry point."""
@@ -193,6 +344,9 @@ def main():
         sys.exit(0 if len(sys.argv) >= 2 else 1)
 
     results_dir = Path(sys.argv[1])
+    db_path = None
+    if len(sys.argv) >= 4 and sys.argv[2] == '--db':
+        db_path = Path(sys.argv[3])
 
     if not results_dir.exists():
         print(f"Error: Directory not found: {results_dir}", file=sys.stderr)
@@ -202,30 +356,35 @@ def main():
         print(f"Error: Not a directory: {results_dir}", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Loading results from {results_dir}...")
-    results = load_results(results_dir)
+    if db_path:
+        from harness.store import ResultsStore
+        print(f"Loading results from {db_path}...")
+        with ResultsStore(db_path) as store:
+            grouped, trials = group_results(store.records())
+    else:
+        print(f"Loading results from {results_dir}...")
+        grouped, trials = group_results(iter_results(results_dir))
 
-    if not results:
+    if not grouped:
         print("Error: No valid results found", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Found {len(results)} datasets")
+    cells = {key: summarize_cell(values) for key, values in grouped.items()}
+    deltas = format_deltas(cells)
+    paired = paired_deltas(trials)
+    print(f"Found {sum(cell['runs'] for cell in cells.values())} runs in {len(cells)} cells")
 
     # Generate summary markdown
     summary_file = results_dir / 'summary.md'
-    summary_md = generate_summary(results)
-
     with open(summary_file, 'w') as f:
-        f.write(summary_md)
+        f.write(generate_summary(cells, deltas, paired))
 
     print(f"Wrote summary to {summary_file}")
 
     # Generate comparison JSON
     comparison_file = results_dir / 'comparison.json'
-    comparison_data = generate_comparison_json(results)
-
     with open(comparison_file, 'w') as f:
-        json.dump(comparison_data, f, indent=2)
+        json.dump(generate_comparison_json(cells, deltas, paired), f, indent=2)
 
     print(f"Wrote comparison to {comparison_file}")
 
@@ -1,165 +1,258 @@
 #!/usr/bin/env python3
 """
-Compare byte sizes across all encoded formats.
+Compare byte sizes across all encoded formats and dataset variants.
 
 Usage:
     compare-bytes.py <encoded-dir>
 
-Outputs byte comparison table for all datasets.
+Indexes the encoded tree in a single pass and reports, per dataset and
+format, the mean/min/max size over the variants, bytes per row, and how
+the stele formats split their bytes between header lines (field
+dictionary, value dictionary, schema) and the row payload.
 
 Expected structure:
     encoded-dir/
-        flat/
-            10.json
-            10.stele-ascii
-            10.stele-light
-            10.stele-full
+        flat/10/variant-a.json
+        flat/10/variant-a.toon
+        flat/10/variant-a.stele-{ascii,light,full}
+        nested/deep.json                 # pre-variant files, reported separately
+        markdown/mixed.{md,stele-*}
+
+Rows are counted from the matching .json (records under the table root)
+or .md (blocks) beside each encoded file.
 """
 
+import json
+import os
 import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List
 
+from stele.decoder import section_sizes
+from stele.encoder import split_document
+from stele.markdown import parse as parse_markdown
 
-def get_file_size(filepath: Path) -> int:
-    """Get file size in bytes, return 0 if file doesn't exist."""
-    try:
-        return filepath.stat().st_size
-    except FileNotFoundError:
-        return 0
+FORMATS = {
+    'json': 'JSON',
+    'md': 'Markdown',
+    'toon': 'TOON',
+    'stele-ascii': 'ASCII',
+    'stele-light': 'Light',
+    'stele-full': 'Full',
+}
+STELE_FORMATS = ('stele-ascii', 'stele-light', 'stele-full')
+SECTIONS = ('fields', 'values', 'schema', 'rows')
 
 
-def collect_sizes(encoded_dir: Path) -> Dict[str, Dict[str, int]]:
+def scan(encoded_dir: Path) -> dict[str, dict[str, dict[str, tuple[Path, int]]]]:
     """
-    Collect file sizes for all datasets and formats.
+    Index every encoded file with one scandir walk.
 
-    Returns dict mapping dataset -> format -> bytes
+    Returns dict mapping dataset -> format -> variant -> (path, bytes).
+    Files outside a variant directory use the variant '-'.
     """
 
-    sizes = {}
+    index: dict = defaultdict(lambda: defaultdict(dict))
+    pending = [(encoded_dir, '')]
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as entries:
+            entries = list(entries)
+        subdirs = {e.name for e in entries if e.is_dir()}
+        for entry in entries:
+            if entry.is_dir():
+                pending.append((Path(entry.path), f"{prefix}{entry.name}/"))
+                continue
+            stem, dot, fmt = entry.name.partition('.')
+            if not dot or fmt not in FORMATS:
+                continue
+            if stem.startswith('variant-'):
+                dataset, variant = prefix.rstrip('/'), stem[len('variant-'):]
+            elif stem in subdirs:
+                dataset, variant = f"{prefix}{stem} (pre-variant)", '-'
+            else:
+                dataset, variant = f"{prefix}{stem}", '-'
+            index[dataset][fmt][variant] = (Path(entry.path), entry.stat().st_size)
+    return index
 
-    # Expected structure: type/size.json, type/size.stele-*
-    for type_dir in encoded_dir.iterdir():
-        if not type_dir.is_dir():
-            continue
 
-        # Get all JSON files in this directory
-        json_files = list(type_dir.glob("*.json"))
+def count_rows(path: Path) -> int:
+    """Records in the source document: table rows, list items or markdown blocks."""
+    try:
+        if path.suffix == '.md':
+            return len(parse_markdown(path.read_text(encoding='utf-8')))
+        with open(path, 'r') as f:
+            return len(split_document(json.load(f))[2])
+    except (OSError, ValueError):
+        return 0
 
-        for json_file in json_files:
-            # Extract size from filename (e.g., "10.json" -> "10")
-            size_name = json_file.stem
 
-            dataset = f"{type_dir.name}/{size_name}"
+def measure(index: dict) -> dict[str, dict[str, dict]]:
+    """
+    Per dataset and format: sizes over variants, bytes per row and the
+    mean bytes in each section (stele formats only).
+    """
 
-            # Check for all format files
-            formats = {
-                'json': json_file,
-                'ascii': type_dir / f"{size_name}.stele-ascii",
-                'light': type_dir / f"{size_name}.stele-light",
-                'full': type_dir / f"{size_name}.stele-full"
+    stats: dict = defaultdict(dict)
+    rows_cache: dict[Path, int] = {}
+    for dataset, formats in index.items():
+        for fmt, variants in formats.items():
+            sizes, per_row, rows = [], [], []
+            sections = dict.fromkeys(SECTIONS, 0)
+            for path, size in variants.values():
+                sizes.append(size)
+                source = next((path.with_suffix(s) for s in ('.json', '.md')
+                               if path.with_suffix(s).exists()), None)
+                if source is not None:
+                    if source not in rows_cache:
+                        rows_cache[source] = count_rows(source)
+                    if rows_cache[source]:
+                        rows.append(rows_cache[source])
+                        per_row.append(size / rows_cache[source])
+                if fmt in STELE_FORMATS:
+                    text = path.read_text(encoding='utf-8')
+                    for key, value in section_sizes(text).items():
+                        sections[key] += value
+            stats[dataset][fmt] = {
+                'variants': len(sizes),
+                'mean': sum(sizes) / len(sizes),
+                'min': min(sizes),
+                'max': max(sizes),
+                'rows': sum(rows) / len(rows) if rows else 0,
+                'per_row': sum(per_row) / len(per_row) if per_row else None,
+                'sections': ({key: value / len(sizes) for key, value in sections.items()}
+                             if fmt in STELE_FORMATS else None),
             }
+    return stats
 
-            dataset_sizes = {}
-            for fmt, filepath in formats.items():
-                size = get_file_size(filepath)
-                if size > 0:  # Only include if file exists
-                    dataset_sizes[fmt] = size
-
-            if dataset_sizes:  # Only add dataset if it has files
-                sizes[dataset] = dataset_sizes
-
-    return sizes
 
-
-def format_bytes(b: int) -> str:
+def format_bytes(b: float) -> str:
     """Format bytes with comma separators."""
-    return f"{b:,}"
+    return f"{round(b):,}"
 
 
-def calculate_reduction(baseline: int, compressed: int) -> str:
-    """Calculate percentage reduction from baseline."""
+def size_change(baseline: float, size: float) -> str:
+    """Percent size change vs baseline; negative means smaller, as in the other reports."""
     if baseline == 0:
         return "-"
-    reduction = ((baseline - compressed) / baseline) * 100
-    return f"{reduction:+.1f}%"
+    change = ((size - baseline) / baseline) * 100
+    return f"{change:+.1f}%"
 
 
-def generate_table(sizes: Dict[str, Dict[str, int]]) -> str:
-    """Generate markdown table comparing byte sizes."""
+def dataset_order(dataset: str) -> list:
+    """Sort key that puts flat/50 before flat/100."""
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in dataset.split('/')]
 
-    if not sizes:
-        return "No data found.\n"
 
-    datasets = sorted(sizes.keys())
-    formats = ['json', 'ascii', 'light', 'full']
+def baseline_for(formats: dict) -> dict | None:
+    """JSON for data datasets, the markdown source for markdown ones."""
+    return formats.get('json') or formats.get('md')
 
-    lines = []
 
-    # Header
-    header = "| Dataset | JSON | ASCII | Light | Full |"
-    separator = "|---------|------|-------|-------|------|"
+def generate_matrix(stats: dict) -> str:
+    """Markdown table of mean size per dataset and format, with the change vs the baseline."""
 
-    lines.append(header)
-    lines.append(separator)
+    present = [fmt for fmt in FORMATS if any(fmt in formats for formats in stats.values())]
+    lines = [
+        "| Dataset | " + " | ".join(FORMATS[fmt] for fmt in present) + " |",
+        "|---------|" + "|".join("-" * (len(FORMATS[fmt]) + 2) for fmt in present) + "|",
+    ]
+    for dataset in sorted(stats, key=dataset_order):
+        formats = stats[dataset]
+        baseline = baseline_for(formats)
+        row = [dataset]
+        for fmt in present:
+            entry = formats.get(fmt)
+            if entry is None:
+                row.append("-")
+            elif entry is baseline:
+                row.append(format_bytes(entry['mean']))
+            else:
+                change = size_change(baseline['mean'], entry['mean']) if baseline else "-"
+                row.append(f"{format_bytes(entry['mean'])} ({change})")
+        lines.append("| " + " | ".join(row) + " |")
+    return "\n".join(lines)
 
-    # Rows
-    for dataset in datasets:
-        row_data = [dataset]
-        json_size = sizes[dataset].get('json', 0)
 
-        for fmt in formats:
-            if fmt in sizes[dataset]:
-                size = sizes[dataset][fmt]
+def generate_spread(stats: dict) -> str:
+    """Markdown table of the spread across variants and bytes per row."""
 
-                if fmt == 'json':
-                    # Just show size for baseline
-                    row_data.append(format_bytes(size))
-                else:
-                    # Show size and reduction from JSON
-                    reduction = calculate_reduction(json_size, size)
-                    row_data.append(f"{format_bytes(size)} ({reduction})")
-            else:
-                row_data.append("-")
+    lines = [
+        "| Dataset | Format | Variants | Mean | Min | Max | Bytes/row |",
+        "|---------|--------|----------|------|-----|-----|-----------|",
+    ]
+    for dataset in sorted(stats, key=dataset_order):
+        for fmt in FORMATS:
+            entry = stats[dataset].get(fmt)
+            if entry is None:
+                continue
+            per_row = f"{entry['per_row']:.1f}" if entry['per_row'] is not None else "-"
+            lines.append(
+                f"| {dataset} | {FORMATS[fmt]} | {entry['variants']} | {format_bytes(entry['mean'])} "
+                f"| {format_bytes(entry['min'])} | {format_bytes(entry['max'])} | {per_row} |"
+            )
+    return "\n".join(lines)
 
-        row = "| " + " | ".join(row_data) + " |"
-        lines.append(row)
 
+def generate_breakdown(stats: dict) -> str:
+    """
+    Markdown table of where the stele bytes go: header lines vs row payload,
+    and the size change of the row payload alone vs the source.
+    """
+
+    lines = [
+        "| Dataset | Format | Field dict | Value dict | Schema | Rows | Header share | Rows vs source |",
+        "|---------|--------|------------|------------|--------|------|--------------|----------------|",
+    ]
+    for dataset in sorted(stats, key=dataset_order):
+        baseline = baseline_for(stats[dataset])
+        for fmt in STELE_FORMATS:
+            entry = stats[dataset].get(fmt)
+            if entry is None:
+                continue
+            sections = entry['sections']
+            header = entry['mean'] - sections['rows']
+            share = f"{header / entry['mean'] * 100:.1f}%" if entry['mean'] else "-"
+            rows = size_change(baseline['mean'], sections['rows']) if baseline else "-"
+            lines.append(
+                f"| {dataset} | {FORMATS[fmt]} | {format_bytes(sections['fields'])} "
+                f"| {format_bytes(sections['values'])} | {format_bytes(sections['schema'])} "
+                f"| {format_bytes(sections['rows'])} | {share} | {rows} |"
+            )
     return "\n".join(lines)
 
 
-def generate_summary(sizes: Dict[str, Dict[str, int]]) -> str:
+def generate_summary(stats: dict) -> str:
     """Generate summary statistics."""
 
-    if not sizes:
+    if not stats:
         return ""
 
-    # Calculate averages across all datasets
-    format_totals = {'json': [], 'ascii': [], 'light': [], 'full': []}
-
-    for dataset_sizes in sizes.values():
-        for fmt, size in dataset_sizes.items():
-            format_totals[fmt].append(size)
+    totals: dict = defaultdict(lambda: {'bytes': 0.0, 'baseline': 0.0, 'rows': 0.0})
+    for formats in stats.values():
+        baseline = baseline_for(formats)
+        for fmt, entry in formats.items():
+            totals[fmt]['bytes'] += entry['mean']
+            totals[fmt]['baseline'] += baseline['mean'] if baseline else 0
+            totals[fmt]['rows'] += entry['rows']
 
     lines = [
         "",
         "## Summary Statistics",
         "",
-        "Average file sizes:",
-        ""
+        "Total of per-dataset means (change vs the JSON or markdown source; negative is smaller):",
+        "",
     ]
-
-    json_avg = sum(format_totals['json']) / len(format_totals['json']) if format_totals['json'] else 0
-
-    for fmt in ['json', 'ascii', 'light', 'full']:
-        if format_totals[fmt]:
-            avg = sum(format_totals[fmt]) / len(format_totals[fmt])
-
-            if fmt == 'json':
-                lines.append(f"- **{fmt.upper()}**: {format_bytes(int(avg))} bytes")
-            else:
-                reduction = calculate_reduction(int(json_avg), int(avg))
-                lines.append(f"- **{fmt.upper()}**: {format_bytes(int(avg))} bytes ({reduction} vs JSON)")
+    for fmt in FORMATS:
+        if fmt not in totals:
+            continue
+        total = totals[fmt]
+        line = f"- **{FORMATS[fmt]}**: {format_bytes(total['bytes'])} bytes"
+        if total['rows']:
+            line += f", {total['bytes'] / total['rows']:.1f} bytes/row"
+        if fmt not in ('json', 'md'):
+            line += f" ({size_change(total['baseline'], total['bytes'])})"
+        lines.append(line)
 
     return "\n".join(lines)
 
@@ -182,23 +275,35 @@ def main():
         sys.exit(1)
 
     print(f"Scanning {encoded_dir} for encoded files...")
-    sizes = collect_sizes(encoded_dir)
+    index = scan(encoded_dir)
 
-    if not sizes:
+    if not index:
         print("Error: No encoded files found", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Found {len(sizes)} datasets\n")
+    files = sum(len(variants) for formats in index.values() for variants in formats.values())
+    print(f"Found {files} files in {len(index)} datasets\n")
+    stats = measure(index)
 
-    # Generate and print table
     print("# Byte Size Comparison")
     print()
-    table = generate_table(sizes)
-    print(table)
+    print("Mean size over variants (change vs JSON, or vs the markdown source; negative is smaller):")
+    print()
+    print(generate_matrix(stats))
+    print()
+    print("## Spread Across Variants")
+    print()
+    print(generate_spread(stats))
+    print()
+    print("## Where the Bytes Go")
+    print()
+    print("Mean bytes per section. Header share is everything before the first")
+    print("row; Rows vs source compares the row payload alone with the JSON or")
+    print("markdown file, so it shows the change before header overhead.")
+    print()
+    print(generate_breakdown(stats))
 
-    # Print summary
-    summary = generate_summary(sizes)
-    print(summary)
+    print(generate_summary(stats))
 
     print("\n✨ Done!")
 
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Count tokens in every encoded file with a local tokenizer, offline.
+
+Tokenizes each file under encoded/ (json, toon, stele-*, md) with a
+tokenizer vocabulary loaded from disk, spread over a process pool, and
+reports tokens per format, per row and per byte. No API calls, so encoder
+changes can be compared across the whole tree before a paid run.
+
+Usage:
+    count-tokens.py <encoded-dir> --tokenizer <tokenizer.json|merges.txt|x.tiktoken>
+    count-tokens.py ../encoded --tokenizer ~/models/gpt2 -j 8
+    count-tokens.py ../encoded --tokenizer cl100k_base.tiktoken --json > tokens.json
+    count-tokens.py ../encoded --tokenizer renamed.tiktoken --pattern cl100k_base
+
+Rows are counted from the matching .json source (records under the table
+root) or from the markdown blocks, so tokens/row compares formats on the
+same data. Text is split before BPE with the encoding's own pattern
+(harness/tokenizers.py PATTERNS), named in the report header; --pattern
+overrides it, e.g. for a renamed rank file.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from harness.tokenizers import PATTERNS, load_tokenizer
+from stele.encoder import split_document
+from stele.markdown import parse as parse_markdown
+
+FORMATS = ['json', 'toon', 'stele-ascii', 'stele-light', 'stele-full', 'md']
+
+_tokenizer = None
+
+
+def _init_worker(tokenizer_path: str, pattern: str | None) -> None:
+    global _tokenizer
+    _tokenizer = load_tokenizer(tokenizer_path, pattern)
+
+
+def count_rows(path: Path) -> int:
+    """Records in the source document: table rows, list items or markdown blocks."""
+    if path.suffix == '.md':
+        return len(parse_markdown(path.read_text(encoding='utf-8')))
+    with open(path, 'r') as f:
+        try:
+            return len(split_document(json.load(f))[2])
+        except ValueError:
+            return 1
+
+
+def count_batch(paths: list[Path]) -> list[dict]:
+    """Tokenize a batch of files in one worker."""
+
+    results = []
+    for path in paths:
+        text = path.read_text(encoding='utf-8')
+        results.append({
+            'path': str(path),
+            'tokens': _tokenizer.count(text),
+            'bytes': len(text.encode('utf-8')),
+        })
+    return results
+
+
+def collect_files(encoded_dir: Path) -> list[tuple[str, str, Path]]:
+    """(dataset, format, path) for every encoded file."""
+
+    files = []
+    for path in sorted(encoded_dir.rglob('*')):
+        fmt = path.suffix[1:]
+        if not path.is_file() or fmt not in FORMATS:
+            continue
+        relative = path.relative_to(encoded_dir)
+        if path.stem.startswith('variant-'):
+            dataset = str(relative.parent)
+        elif path.with_suffix('').is_dir():
+            dataset = f"{relative.with_suffix('')} (pre-variant)"
+        else:
+            dataset = str(relative.with_suffix(''))
+        files.append((dataset, fmt, path))
+    return files
+
+
+def source_for(path: Path) -> Path:
+    """Sibling .json (or .md) that holds the same data as an encoded file."""
+    for suffix in ('.json', '.md'):
+        candidate = path.with_suffix(suffix)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def json_delta(table: dict, fmt: str):
+    """Percent token change vs json over the datasets that have both formats."""
+    ours = base = 0
+    for formats in table.values():
+        if fmt in formats and 'json' in formats:
+            ours += formats[fmt]['tokens'] / formats[fmt]['files']
+            base += formats['json']['tokens'] / formats['json']['files']
+    return (ours - base) / base * 100 if base and fmt != 'json' else None
+
+
+def batched(items: list, count: int) -> list[list]:
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count tokens in encoded files with a local tokenizer.")
+    parser.add_argument('encoded_dir', type=Path, help="encoded/ directory to scan")
+    parser.add_argument('--tokenizer', required=True,
+                        help="tokenizer.json, merges.txt (with vocab.json), *.tiktoken or a directory")
+    parser.add_argument('--pattern', choices=PATTERNS,
+                        help="split pattern, instead of the one the tokenizer file implies")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--json', action='store_true', help="machine-readable output")
+    args = parser.parse_args()
+
+    if not args.encoded_dir.exists():
+        print(f"Error: Directory not found: {args.encoded_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        pattern = load_tokenizer(args.tokenizer, args.pattern).pattern
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    files = collect_files(args.encoded_dir)
+    jobs = max(1, args.jobs)
+    # A few batches per worker keeps the pool busy without per-file overhead.
+    batches = batched([path for _, _, path in files], jobs * 4)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(args.tokenizer, args.pattern)) as pool:
+        counted = {r['path']: r for batch in pool.map(count_batch, batches) for r in batch}
+
+    rows_cache: dict[Path, int] = {}
+    table: dict = defaultdict(dict)
+    for dataset, fmt, path in files:
+        source = source_for(path)
+        if source not in rows_cache:
+            rows_cache[source] = count_rows(source)
+        result = dict(counted[str(path)], rows=rows_cache[source])
+        entry = table[dataset].setdefault(fmt, {'files': 0, 'tokens': 0, 'bytes': 0, 'rows': 0})
+        entry['files'] += 1
+        for key in ('tokens', 'bytes', 'rows'):
+            entry[key] += result[key]
+
+    totals: dict = defaultdict(lambda: {'tokens': 0, 'bytes': 0, 'rows': 0})
+    for formats in table.values():
+        for fmt, entry in formats.items():
+            for key in ('tokens', 'bytes', 'rows'):
+                totals[fmt][key] += entry[key]
+
+    if args.json:
+        print(json.dumps({'tokenizer': args.tokenizer, 'pattern': pattern, 'datasets': table, 'totals': totals},
+                         indent=2))
+        return
+
+    present = [fmt for fmt in FORMATS if fmt in totals]
+    print(f"Token counts ({args.tokenizer}, {len(files)} files)")
+    print(f"Split pattern: {pattern}")
+    print()
+    print(f"{'Dataset':<30}" + ''.join(f"{fmt:>13}" for fmt in present))
+    print("-" * (30 + 13 * len(present)))
+    for dataset in sorted(table):
+        cells = []
+        for fmt in present:
+            entry = table[dataset].get(fmt)
+            cells.append(f"{entry['tokens'] // entry['files']:>13,}" if entry else f"{'-':>13}")
+        print(f"{dataset:<30}" + ''.join(cells))
+
+    print()
+    print(f"{'Format':<14} {'Tokens':>10} {'Tokens/row':>11} {'Tokens/byte':>12} {'vs json':>8}")
+    print("-" * 59)
+    for fmt in present:
+        t = totals[fmt]
+        per_row = t['tokens'] / t['rows'] if t['rows'] else 0
+        per_byte = t['tokens'] / t['bytes'] if t['bytes'] else 0
+        delta = json_delta(table, fmt)
+        delta = f"{delta:+.1f}%" if delta is not None else '-'
+        print(f"{fmt:<14} {t['tokens']:>10,} {per_row:>11.2f} {per_byte:>12.3f} {delta:>8}")
+
+
+if __name__ == '__main__':
+    main()
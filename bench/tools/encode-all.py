@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Encode every dataset variant into every benchmark format, in parallel.
+
+Builds one job per (dataset variant, output format) across the flat, nested
+and markdown datasets, runs the jobs on a worker pool and skips any output
+that is newer than both its source and the encoder. A failing job is
+reported and the rest keep going.
+
+Usage:
+    encode-all.py                      # incremental, all datasets
+    encode-all.py flat nested/deep     # only these dataset subtrees
+    encode-all.py --force -j 8         # rebuild everything on 8 workers
+    encode-all.py --dry-run            # list the jobs that would run
+
+Outputs go to bench/encoded/<same path as in bench/datasets>. Encoded
+bytes are also kept in the content-addressed cache (harness/cache.py), so
+an output that is stale by mtime but whose source, encoder and format are
+unchanged is copied from the cache instead of being re-encoded.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import stele
+from harness import toon
+from harness.cache import (
+    CACHE_DIR, DEFAULT_MAX_BYTES, EncodingCache, cached_encode, encoder_identity, toon_identity,
+)
+from stele.markdown import encode_markdown
+
+BENCH_DIR = Path(__file__).parent.parent
+DATASETS_DIR = BENCH_DIR / "datasets"
+ENCODED_DIR = BENCH_DIR / "encoded"
+
+STELE_FORMATS = ('stele-ascii', 'stele-light', 'stele-full')
+JSON_FORMATS = ('json', 'toon') + STELE_FORMATS
+MARKDOWN_FORMATS = ('md',) + STELE_FORMATS
+
+
+@dataclass
+class Job:
+    source: Path
+    target: Path
+    format: str
+
+    @property
+    def name(self) -> str:
+        return str(self.target.relative_to(ENCODED_DIR))
+
+
+def encoder_mtime() -> float:
+    """Newest modification time of the stele package, the TOON encoder and this driver."""
+    sources = list(Path(stele.__file__).parent.glob("*.py")) + [Path(toon.__file__), Path(__file__)]
+    return max(path.stat().st_mtime for path in sources)
+
+
+def dataset_sources(targets: list[str]) -> list[Path]:
+    """Variant JSON files and markdown documents under the selected subtrees."""
+
+    roots = [DATASETS_DIR / t for t in targets] if targets else [DATASETS_DIR]
+    sources = []
+    for root in roots:
+        if not root.exists():
+            print(f"Error: Not found: {root}", file=sys.stderr)
+            sys.exit(1)
+        for path in sorted(root.rglob("*")) if root.is_dir() else [root]:
+            if path.suffix == '.md' or (path.suffix == '.json' and path.name.startswith('variant-')):
+                sources.append(path)
+    return sources
+
+
+def build_jobs(sources: list[Path]) -> list[Job]:
+    jobs = []
+    for source in sources:
+        base = ENCODED_DIR / source.relative_to(DATASETS_DIR).with_suffix('')
+        formats = MARKDOWN_FORMATS if source.suffix == '.md' else JSON_FORMATS
+        for fmt in formats:
+            jobs.append(Job(source, base.with_name(f"{base.name}.{fmt}"), fmt))
+    return jobs
+
+
+def is_fresh(job: Job, encoder_time: float) -> bool:
+    try:
+        built = job.target.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return built >= job.source.stat().st_mtime and built >= encoder_time
+
+
+def produce(job: Job, source: bytes) -> bytes:
+    """Encode one source into one output format."""
+
+    if job.format == 'toon':
+        return toon.encode(json.loads(source)).encode('utf-8')
+
+    level = job.format.split('-', 1)[1]
+    if job.source.suffix == '.md':
+        text = encode_markdown(source.decode('utf-8'), level)
+    else:
+        text = stele.encode(json.loads(source), level)
+    return text.encode('utf-8')
+
+
+def run_job(job: Job, encoder: str, toon_encoder: str, cache_dir: Path | None) -> tuple[float, int, bool]:
+    """Produce one output file. Runs in a worker; returns (seconds, bytes, cache hit)."""
+
+    start = time.perf_counter()
+    source = job.source.read_bytes()
+
+    if job.format in ('json', 'md'):
+        data, hit = source, False
+    else:
+        cache = EncodingCache(cache_dir) if cache_dir else None
+        identity = toon_encoder if job.format == 'toon' else encoder
+        data, hit = cached_encode(cache, source, identity, job.format, lambda: produce(job, source))
+
+    # Write beside the target and rename, so an interrupted job never
+    # leaves a partial file that looks up to date.
+    job.target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = job.target.with_name(job.target.name + '.tmp')
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, job.target)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    return time.perf_counter() - start, len(data), hit
+
+
+def describe_error(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode all dataset variants in parallel.")
+    parser.add_argument('targets', nargs='*',
+                        help="subtrees or files under bench/datasets (default: all)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('-f', '--force', action='store_true', help="rebuild up-to-date outputs")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="list jobs without running")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the encoding cache")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="encoding cache budget in MB (default: %(default)s)")
+    args = parser.parse_args()
+
+    jobs = build_jobs(dataset_sources(args.targets))
+    encoder_time = encoder_mtime()
+    pending = [job for job in jobs if args.force or not is_fresh(job, encoder_time)]
+
+    if args.dry_run:
+        for job in pending:
+            print(job.name)
+        print(f"\n{len(pending)} of {len(jobs)} jobs would run")
+        return
+
+    worker = partial(run_job, encoder=encoder_identity(), toon_encoder=toon_identity(),
+                     cache_dir=None if args.no_cache else CACHE_DIR)
+    results = {}
+    hits = misses = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(worker, job): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                seconds, size, hit = future.result()
+            except Exception as e:
+                results[job.name] = ('FAILED', 0.0, 0, describe_error(e))
+                continue
+            results[job.name] = ('cached' if hit else 'built', seconds, size, '')
+            if job.format not in ('json', 'md'):
+                hits += hit
+                misses += not hit
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Job':<40} {'Status':<8} {'ms':>8} {'Bytes':>9}")
+    print("-" * 68)
+    for job in jobs:
+        if job.name not in results:
+            continue
+        status, seconds, size, error = results[job.name]
+        print(f"{job.name:<40} {status:<8} {seconds * 1000:>8.1f} {size:>9,}")
+        if error:
+            print(f"    {error}")
+    print("-" * 68)
+
+    failed = sum(1 for status, *_ in results.values() if status == 'FAILED')
+    print(f"{len(results) - failed} built, {failed} failed, "
+          f"{len(jobs) - len(pending)} up to date in {elapsed:.2f}s")
+    if not args.no_cache:
+        cache = EncodingCache(CACHE_DIR, args.cache_size * 1024 * 1024)
+        freed = cache.prune()
+        print(f"Encoding cache: {hits} hits, {misses} misses, "
+              f"{cache.evictions} evicted ({freed:,} bytes), {cache.size():,} bytes on disk")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
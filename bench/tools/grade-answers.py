@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Grade every session's answers and report accuracy against cost.
+
+Usage:
+    grade-answers.py                         # grade sessions/, store grades, print report
+    grade-answers.py ../sessions -v          # also list each question's verdict
+    grade-answers.py --json > grades.json    # machine-readable report
+    grade-answers.py --no-store              # do not write results/results.db
+
+Each sessions/{test-id}/output.json (or output.txt) is cut into one answer
+per question and graded against its prompts/*.json file: the answer
+recorded for the run's variant, else `a` (harness/grading.py). Questions
+with no answer in the variant's data are skipped. Per-question verdicts are stored in the results
+store's grades table, keyed by the run's session id.
+
+Reported per format and per cell: accuracy, input tokens and cost per run,
+and the efficiency metrics input tokens per correct answer and USD per
+correct answer. Input tokens count fresh, cache-write and cache-read input.
+A format that saves tokens but loses answers shows up as a worse
+per-correct figure.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from harness.grading import expected_answer, extract_answers, grade
+from harness.matrix import DATASETS, FORMATS, MODELS, QUESTIONS_PER_TEST, SESSIONS_DIR, parse_test_id
+from harness.store import DB_PATH, ResultsStore
+
+INPUT_FIELDS = ('input_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens')
+
+
+def load_output(session_dir: Path) -> Optional[dict]:
+    """The CLI's JSON output for a session, or its plain-text answer wrapped as one."""
+
+    json_file = session_dir / 'output.json'
+    if json_file.exists():
+        try:
+            return json.loads(json_file.read_text(encoding='utf-8'))
+        except ValueError:
+            pass
+    text_file = session_dir / 'output.txt'
+    if text_file.exists():
+        return {'result': text_file.read_text(encoding='utf-8')}
+    return None
+
+
+def grade_session(session_dir: Path, questions_per_test: int) -> Optional[dict]:
+    """One graded run: its test, usage and per-question verdicts."""
+
+    try:
+        test = parse_test_id(session_dir.name)
+    except ValueError:
+        return None
+    output = load_output(session_dir)
+    if output is None or not test.prompt_file.exists():
+        return None
+
+    with open(test.prompt_file, 'r') as f:
+        questions = json.load(f)['questions'][:questions_per_test]
+    answers = extract_answers(output.get('result') or '', questions)
+    usage = output.get('usage') or {}
+    return {
+        'format': test.format,
+        'model': test.model,
+        'dataset': test.dataset,
+        'variant': test.variant,
+        'run_id': output.get('session_id') or test.test_id,
+        'trial': test.trial,
+        'input_tokens': sum(usage.get(name) or 0 for name in INPUT_FIELDS) if usage else None,
+        'total_cost_usd': output.get('total_cost_usd'),
+        'grades': [
+            {'question': i, 'q': question['q'], 'expected': expected, 'answer': answer,
+             'correct': grade(expected, answer)}
+            for i, (question, answer) in enumerate(zip(questions, answers))
+            if (expected := expected_answer(question, test.variant)) is not None
+        ],
+    }
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Accuracy and per-correct efficiency over a group of graded runs."""
+
+    questions = sum(len(run['grades']) for run in runs)
+    correct = sum(g['correct'] for run in runs for g in run['grades'])
+    tokens = [run['input_tokens'] for run in runs if run['input_tokens'] is not None]
+    costs = [run['total_cost_usd'] for run in runs if run['total_cost_usd'] is not None]
+    return {
+        'runs': len(runs),
+        'questions': questions,
+        'correct': correct,
+        'accuracy': correct / questions if questions else None,
+        'input_tokens': sum(tokens) / len(tokens) if tokens else None,
+        'total_cost_usd': sum(costs) / len(costs) if costs else None,
+        'input_tokens_per_correct': sum(tokens) / correct if correct and tokens else None,
+        'usd_per_correct': sum(costs) / correct if correct and costs else None,
+    }
+
+
+def format_order(fmt: str) -> tuple:
+    return (FORMATS.index(fmt) if fmt in FORMATS else len(FORMATS), fmt)
+
+
+def cell_order(key: tuple) -> tuple:
+    fmt, model, dataset = key
+    return (DATASETS.index(dataset) if dataset in DATASETS else len(DATASETS), dataset,
+            MODELS.index(model) if model in MODELS else len(MODELS), model, format_order(fmt))
+
+
+def group(runs: list[dict]) -> tuple[dict, dict]:
+    """Graded runs summarized per (format, model, dataset) cell and per format."""
+
+    by_cell = defaultdict(list)
+    for run in runs:
+        by_cell[(run['format'], run['model'], run['dataset'])].append(run)
+    cells = {key: summarize(by_cell[key]) for key in sorted(by_cell, key=cell_order)}
+
+    # Per format, and again over only the cells JSON also has for the comparison
+    json_cells = {(model, dataset) for fmt, model, dataset in by_cell if fmt == 'json'}
+    formats = {}
+    for fmt in sorted({key[0] for key in by_cell}, key=format_order):
+        keys = [key for key in by_cell if key[0] == fmt]
+        formats[fmt] = summarize([run for key in keys for run in by_cell[key]])
+        shared = [key[1:] for key in keys if key[1:] in json_cells]
+        ours = summarize([run for cell in shared for run in by_cell[(fmt,) + cell]])
+        base = summarize([run for cell in shared for run in by_cell[('json',) + cell]])
+        formats[fmt]['vs_json'] = {
+            metric: relative(ours[metric], base[metric])
+            for metric in ('accuracy', 'input_tokens', 'input_tokens_per_correct', 'usd_per_correct')
+        } if shared and fmt != 'json' else None
+    return cells, formats
+
+
+def relative(value: Optional[float], baseline: Optional[float]) -> Optional[float]:
+    if value is None or not baseline:
+        return None
+    return (value - baseline) / baseline * 100
+
+
+def format_number(n: Optional[float]) -> str:
+    return '-' if n is None else f"{n:,.0f}"
+
+
+def format_usd(n: Optional[float]) -> str:
+    return '-' if n is None else f"${n:.4f}"
+
+
+def format_accuracy(summary: dict) -> str:
+    if summary['accuracy'] is None:
+        return '-'
+    return f"{summary['accuracy'] * 100:.0f}% ({summary['correct']}/{summary['questions']})"
+
+
+def format_delta(delta: Optional[float]) -> str:
+    return '-' if delta is None else f"{delta:+.1f}%"
+
+
+def generate_report(cells: dict, formats: dict, runs: list[dict], verbose: bool) -> str:
+    lines = [
+        "# Answer Accuracy",
+        "",
+        "Input tokens include cache writes and reads. Per-correct figures divide the",
+        "total over all runs by the number of correct answers; '-' means none were correct.",
+        "",
+        "## By Format",
+        "",
+        "| Format | Runs | Accuracy | Input/run | Cost/run | Input/correct | USD/correct |",
+        "|--------|-----:|---------:|----------:|---------:|--------------:|------------:|",
+    ]
+    for fmt, s in formats.items():
+        lines.append(
+            f"| {fmt} | {s['runs']} | {format_accuracy(s)} | {format_number(s['input_tokens'])} "
+            f"| {format_usd(s['total_cost_usd'])} | {format_number(s['input_tokens_per_correct'])} "
+            f"| {format_usd(s['usd_per_correct'])} |"
+        )
+
+    compared = {fmt: s['vs_json'] for fmt, s in formats.items() if s['vs_json']}
+    if compared:
+        lines += [
+            "",
+            "## vs JSON (shared cells)",
+            "",
+            "| Format | Accuracy | Input tokens | Input/correct | USD/correct |",
+            "|--------|---------:|-------------:|--------------:|------------:|",
+        ]
+        for fmt, vs in compared.items():
+            lines.append(
+                f"| {fmt} | {format_delta(vs['accuracy'])} | {format_delta(vs['input_tokens'])} "
+                f"| {format_delta(vs['input_tokens_per_correct'])} | {format_delta(vs['usd_per_correct'])} |"
+            )
+
+    lines += [
+        "",
+        "## By Cell",
+        "",
+        "| Dataset | Model | Format | Runs | Accuracy | Input/correct | USD/correct |",
+        "|---------|-------|--------|-----:|---------:|--------------:|------------:|",
+    ]
+    for (fmt, model, dataset), s in cells.items():
+        lines.append(
+            f"| {dataset} | {model} | {fmt} | {s['runs']} | {format_accuracy(s)} "
+            f"| {format_number(s['input_tokens_per_correct'])} | {format_usd(s['usd_per_correct'])} |"
+        )
+
+    if verbose:
+        lines += ["", "## Answers", ""]
+        for run in sorted(runs, key=lambda r: cell_order((r['format'], r['model'], r['dataset']))):
+            lines.append(f"### {run['format']} / {run['model']} / {run['dataset']} (trial {run['trial']})")
+            lines.append("")
+            for g in run['grades']:
+                answer = ' '.join((g['answer'] or '(no answer found)').split())
+                if len(answer) > 80:
+                    answer = answer[:77] + '...'
+                mark = '✓' if g['correct'] else '✗'
+                lines.append(f"- {mark} Q{g['question'] + 1}: expected `{g['expected']}`, got: {answer}")
+            lines.append("")
+    return '\n'.join(lines).rstrip('\n') + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade session answers against the prompts' expected answers.")
+    parser.add_argument('sessions', nargs='?', type=Path, default=SESSIONS_DIR,
+                        help="sessions directory (default: %(default)s)")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help="results store (default: %(default)s)")
+    parser.add_argument('--no-store', action='store_true', help="do not write grades to the results store")
+    parser.add_argument('--questions', type=int, default=QUESTIONS_PER_TEST,
+                        help="questions asked per test (default: %(default)s)")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('-v', '--verbose', action='store_true', help="list every question's verdict")
+    args = parser.parse_args()
+
+    if not args.sessions.is_dir():
+        print(f"Error: Not a directory: {args.sessions}", file=sys.stderr)
+        sys.exit(1)
+
+    runs = []
+    for session_dir in sorted(p for p in args.sessions.iterdir() if p.is_dir()):
+        run = grade_session(session_dir, args.questions)
+        if run is None:
+            print(f"Warning: skipping {session_dir.name} (no output or prompt)", file=sys.stderr)
+            continue
+        runs.append(run)
+
+    if not runs:
+        print("Error: No gradable sessions found", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.no_store:
+        with ResultsStore(args.db) as store:
+            for run in runs:
+                store.add_grades(run, run['grades'])
+
+    cells, formats = group(runs)
+    if args.json:
+        json.dump({
+            'formats': formats,
+            'cells': [{'format': fmt, 'model': model, 'dataset': dataset, **summary}
+                      for (fmt, model, dataset), summary in cells.items()],
+            'runs': runs,
+        }, sys.stdout, indent=2)
+        print()
+    else:
+        print(generate_report(cells, formats, runs, args.verbose), end='')
+
+
+if __name__ == '__main__':
+    main()
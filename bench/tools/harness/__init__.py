@@ -0,0 +1,6 @@
+"""
+Shared benchmark infrastructure for the bench tools.
+
+The stele format itself lives in the sibling `stele` package; this package
+holds what the encode driver and benchmark runner have in common.
+"""
@@ -0,0 +1,155 @@
+"""
+Content-addressed on-disk cache for encoded outputs.
+
+Entries are keyed by (sha256 of the source, encoder identity, output
+format, options) and stored as one file per key under
+bench/.cache/encodings/. A hit refreshes the entry's mtime, and prune()
+evicts the least recently used entries until the cache fits its size
+budget.
+
+Usage:
+    cache = EncodingCache()
+    key = cache.key(source_bytes, encoder_identity(), 'stele-full')
+    data = cache.get(key)
+    if data is None:
+        data = encode(...)
+        cache.put(key, data)
+    cache.prune()
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+BENCH_DIR = Path(__file__).parent.parent.parent
+CACHE_DIR = BENCH_DIR / ".cache" / "encodings"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def package_fingerprint(package_dir: Path) -> str:
+    """Hash of every .py file in a package, as a version identity."""
+    digest = hashlib.sha256()
+    for source in sorted(Path(package_dir).glob("*.py")):
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def encoder_identity() -> str:
+    """Identity of the in-process stele encoder: a hash of its sources."""
+    import stele
+    return f"stele-py:{package_fingerprint(Path(stele.__file__).parent)[:16]}"
+
+
+def toon_identity() -> str:
+    """Identity of the in-process TOON encoder: a hash of harness/toon.py."""
+    from . import toon
+    return f"toon-py:{sha256_bytes(Path(toon.__file__).read_bytes())[:16]}"
+
+
+class EncodingCache:
+    """Size-bounded LRU cache of encoder outputs on disk."""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(source: bytes, encoder: str, fmt: str, options: Optional[dict] = None) -> str:
+        """Cache key for one (source, encoder, format, options) combination."""
+        parts = [sha256_bytes(source), encoder, fmt, options or {}]
+        return sha256_bytes(json.dumps(parts, sort_keys=True).encode())
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass  # evicted concurrently; the data we read is still valid
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{key}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def entries(self) -> list[tuple[Path, int, float]]:
+        """(path, size, last use) for every entry."""
+        found = []
+        if not self.root.exists():
+            return found
+        for path in self.root.glob("*/*"):
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            found.append((path, stat.st_size, stat.st_mtime))
+        return found
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Evict least recently used entries until the cache fits. Returns bytes freed."""
+
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for path, size, _ in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            freed += size
+            self.evictions += 1
+        return freed
+
+    def clear(self) -> int:
+        return self.prune(0)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+def cached_encode(cache: Optional[EncodingCache], source: bytes, encoder: str, fmt: str,
+                  produce, options: Optional[dict] = None) -> tuple[bytes, bool]:
+    """Return (output, hit), calling produce() and storing its bytes on a miss."""
+
+    if cache is None:
+        return produce(), False
+    key = cache.key(source, encoder, fmt, options)
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+    data = produce()
+    cache.put(key, data)
+    return data, False
@@ -0,0 +1,254 @@
+"""
+Grade benchmark answers against the expected answers in prompts/*.json.
+
+A session's result text is free-form: "Q:/A:" pairs, numbered items,
+markdown tables or "Label: value" summaries, often with the model's
+working and self-corrections mixed in. extract_answers() cuts the text
+into one segment per question, and grade() decides whether a segment
+carries the expected answer:
+
+- numbers compare numerically ("1,000", "$5M" and "99.5%" all count), using
+  the last bold number, else the number after "answer"/"total", else the
+  first number outside parentheses
+- yes/no answers compare on the first yes/no word
+- text compares case- and punctuation-insensitively; a list ("a, b and c")
+  is correct when every item is present, in any order
+
+The expected answer is the question's entry for the run's variant in
+`answers` (written by prompt-answers.py), else its `a`. A null entry means
+the question has no answer in that variant's data and is not graded.
+
+Usage:
+    answers = extract_answers(output['result'], questions)
+    for question, answer in zip(questions, answers):
+        expected = expected_answer(question, 'variant-a')
+        correct = grade(expected, answer) if expected is not None else None
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Optional
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'do', 'does', 'for', 'from', 'has', 'have',
+    'how', 'in', 'is', 'it', 'many', 'much', 'of', 'on', 'or', 'the', 'there', 'to', 'what',
+    'when', 'where', 'which', 'who', 'with', 'q', 'answer',
+}
+
+_WORD = re.compile(r"\d+(?:\.\d+)?|[a-z]+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d[\d,]*(?:\.\d+)?(?:\s*(?:k|m|million|billion|thousand)\b)?", re.I)
+_BOLD = re.compile(r"\*\*(.+?)\*\*", re.S)
+_PARENS = re.compile(r"\([^()]*\)")
+_LEAD_NUMBER = re.compile(r"(?:answer|total)[^\d\n]{0,30}?(-?\d[\d,]*(?:\.\d+)?)", re.I)
+_ANSWER_LINE = re.compile(r"^\s*(?:\d+[.)]\s*)?\**A:\**\s*", re.M)
+_QUESTION_LINE = re.compile(r"^\s*(?:\d+[.)]\s*)?\**Q:", re.M)
+_NUMBERED = re.compile(r"^(?:\*\*)?(\d+)[.)]\s*(.*)$", re.M)
+_PARAGRAPH = re.compile(r"\n\s*\n(?=\S)")
+
+SCALES = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'million': 1e6, 'billion': 1e9}
+YES = {'yes', 'true'}
+NO = {'no', 'false', 'not'}
+
+
+def words(text: str) -> list[str]:
+    """Lowercase word tokens with markdown, quotes and punctuation dropped."""
+    return _WORD.findall(text.lower().replace(',', ''))
+
+
+def keywords(text: str) -> set[str]:
+    return {word for word in words(text) if word not in STOPWORDS}
+
+
+def parse_number(token: str) -> Optional[float]:
+    match = re.fullmatch(r"\s*(-?\d[\d,]*(?:\.\d+)?)\s*([a-z]*)\s*", token, re.I)
+    if not match:
+        return None
+    scale = SCALES.get(match.group(2).lower(), 1 if not match.group(2) else None)
+    if scale is None:
+        return None
+    return float(match.group(1).replace(',', '')) * scale
+
+
+def expected_number(expected: str) -> Optional[float]:
+    """The expected answer as a number, if it is one ("42", "5,000,000", "$29", "99.5%")."""
+    return parse_number(expected.strip().lstrip('$').rstrip('%'))
+
+
+# --- Segmenting -----------------------------------------------------------
+
+def _weights(questions: list[dict]) -> dict[str, float]:
+    """Keywords that appear in fewer questions say more about which one is meant."""
+    counts = Counter(word for question in questions for word in keywords(question['q']))
+    return {word: 1 / count for word, count in counts.items()}
+
+
+def _match(label: str, questions: list[dict], weights: dict[str, float]) -> Optional[int]:
+    """Index of the question a label best matches, or None if it shares no keyword."""
+    label_words = keywords(label)
+    scores = [sum(weights.get(word, 0) for word in label_words & keywords(q['q'])) for q in questions]
+    best = max(range(len(scores)), key=scores.__getitem__, default=None)
+    if best is None or scores[best] == 0 or scores.count(scores[best]) > 1:
+        return None
+    return best
+
+
+def _answer_blocks(text: str) -> list[str]:
+    """The text after each "A:", up to the next question or blank line."""
+    blocks = []
+    starts = list(_ANSWER_LINE.finditer(text))
+    for i, match in enumerate(starts):
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(text)
+        block = text[match.end():end]
+        question = _QUESTION_LINE.search(block)
+        if question:
+            block = block[:question.start()]
+        blocks.append(block.split('\n\n')[0].strip())
+    return blocks
+
+
+def _numbered_items(text: str, questions: list[dict], weights: dict[str, float]) -> list[str]:
+    """
+    Top-level items "1." .. "N." in order, each running to the next item or
+    to the next unindented paragraph.
+    Accepted only if most item headings look like their question, so a
+    numbered list of names inside the working is not taken for answers.
+    """
+    items, expect, last = [], 1, None
+    for match in _NUMBERED.finditer(text):
+        if int(match.group(1)) != expect:
+            continue
+        if last is not None:
+            items.append(text[last:match.start()])
+        last, expect = match.start(), expect + 1
+        if expect > len(questions) + 1:
+            break
+    if last is not None:
+        items.append(text[last:])
+    items = [_PARAGRAPH.split(_NUMBERED.sub(r"\2", item, count=1), 1)[0].strip()
+             for item in items[:len(questions)]]
+    on_topic = sum(1 for i, item in enumerate(items)
+                   if _match(item.split('\n')[0], questions, weights) in (i, None)
+                   and keywords(item.split('\n')[0]) & keywords(questions[i]['q']))
+    return items if items and on_topic * 2 > len(items) else []
+
+
+def _split_label(line: str) -> Optional[tuple[str, str]]:
+    """A "Label: value" line split at its first colon outside parentheses."""
+
+    line = line.replace('**', '').strip().lstrip('*•-# ')
+    depth = 0
+    for i, char in enumerate(line):
+        depth += (char == '(') - (char == ')')
+        if char == ':' and depth == 0:
+            label, value = line[:i].strip(), line[i + 1:].strip()
+            if 2 <= len(label) <= 80:
+                return _PARENS.sub(' ', label), value
+            return None
+    return None
+
+
+def _labelled(text: str, questions: list[dict], weights: dict[str, float]) -> list[Optional[str]]:
+    """
+    "Label: value" lines (with any continuation lines) and markdown table
+    rows, matched to questions by keyword. A later line wins, so summaries
+    and corrections override the working above them.
+    """
+
+    answers: list[Optional[str]] = [None] * len(questions)
+    current = None
+    for line in text.split('\n'):
+        if line.lstrip().startswith('|'):
+            current = None
+            cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+            if len(cells) < 2 or set(''.join(cells)) <= set('-: '):
+                continue
+            label, value = _PARENS.sub(' ', cells[0]), ' | '.join(cells[1:])
+        elif current is not None and line.strip() and not _split_label(line):
+            answers[current] += '\n' + line.strip()
+            continue
+        else:
+            current = None
+            split = _split_label(line)
+            if not split:
+                continue
+            label, value = split
+        index = _match(label, questions, weights)
+        if index is not None:
+            answers[index] = value
+            current = index if not line.lstrip().startswith('|') else None
+    return answers
+
+
+def extract_answers(text: str, questions: list[dict]) -> list[Optional[str]]:
+    """
+    One answer segment per question (None where none was found), tried as
+    "A:" blocks, then numbered items, then labelled lines and table rows.
+    """
+
+    weights = _weights(questions)
+    blocks = _answer_blocks(text)
+    if len(blocks) >= len(questions):
+        return blocks[:len(questions)]
+    items = _numbered_items(text, questions, weights)
+    labelled = _labelled(text, questions, weights)
+    answers = items + [None] * (len(questions) - len(items))
+    return [answer if answer else label for answer, label in zip(answers, labelled)]
+
+
+# --- Grading --------------------------------------------------------------
+
+def expected_answer(question: dict, variant: str) -> Optional[str]:
+    """The answer for `variant`'s data: its `answers` entry if it has one, else `a`."""
+    answers = question.get('answers') or {}
+    return answers[variant] if variant in answers else question['a']
+
+
+def answer_number(answer: str) -> Optional[float]:
+    """The number an answer settles on (see the module docstring)."""
+
+    for bold in reversed(_BOLD.findall(answer)):
+        numbers = _NUMBER.findall(bold)
+        if numbers:
+            return parse_number(numbers[-1])
+    text = answer
+    while _PARENS.search(text):
+        text = _PARENS.sub(' ', text)
+    lead = _LEAD_NUMBER.search(text)
+    if lead:
+        return parse_number(lead.group(1))
+    numbers = _NUMBER.findall(text.replace('$', ' ').replace('%', ' '))
+    return parse_number(numbers[0]) if numbers else None
+
+
+def _contains(haystack: list[str], needle: list[str]) -> bool:
+    """Whether `needle` occurs as a run of words; its last word may be abbreviated ("mo")."""
+    n = len(needle)
+    for i in range(len(haystack) - n + 1):
+        if haystack[i:i + n - 1] == needle[:-1] and (
+                haystack[i + n - 1] == needle[-1]
+                or (len(needle[-1]) > 1 and not needle[-1].isdigit()
+                    and haystack[i + n - 1].startswith(needle[-1]))):
+            return True
+    return False
+
+
+def grade(expected: str, answer: Optional[str]) -> bool:
+    """Whether an extracted answer segment carries the expected answer."""
+
+    if not answer:
+        return False
+    number = expected_number(expected)
+    if number is not None:
+        got = answer_number(answer)
+        return got is not None and math.isclose(got, number, rel_tol=1e-9, abs_tol=1e-9)
+
+    expected_words = words(expected)
+    answer_words = words(answer)
+    if expected_words and expected_words[0] in YES | NO and len(expected_words) == 1:
+        first = next((word for word in answer_words if word in YES | NO), None)
+        return first is not None and (first in YES) == (expected_words[0] in YES)
+    if expected_words and _contains(answer_words, expected_words):
+        return True
+    items = [words(item) for item in re.split(r",|;|\band\b", expected.lower()) if words(item)]
+    return len(items) > 1 and all(_contains(answer_words, item) for item in items)
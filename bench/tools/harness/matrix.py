@@ -0,0 +1,157 @@
+"""
+The benchmark test matrix and where each test's inputs and results live.
+
+Mirrors the tables in run-benchmark.sh: every test is one (format, model,
+dataset) cell, and each format reads its own dataset variant so no two
+formats share a prompt prefix. Repeated runs of a cell are told apart by
+a trial index.
+
+Usage:
+    for test in all_tests(models=['haiku']):
+        prompt = build_prompt(test)
+        ...
+        append_result(test, result_record(test, output, seconds))
+"""
+
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+BENCH_DIR = Path(__file__).parent.parent.parent
+ENCODED_DIR = BENCH_DIR / "encoded"
+PROMPTS_DIR = BENCH_DIR / "prompts"
+RESULTS_DIR = BENCH_DIR / "results"
+SESSIONS_DIR = BENCH_DIR / "sessions"
+
+FORMATS = ['json', 'stele-ascii', 'stele-light', 'stele-full', 'toon']
+MODELS = ['opus', 'sonnet', 'haiku']
+DATASETS = ['flat/10', 'flat/50', 'flat/100', 'flat/500', 'nested/shallow', 'nested/medium', 'nested/deep']
+
+# Each format gets a different dataset variant, so no test can reuse
+# another test's prompt cache.
+FORMAT_VARIANTS = {
+    'json': 'variant-a',
+    'stele-ascii': 'variant-b',
+    'stele-light': 'variant-c',
+    'stele-full': 'variant-d',
+    'toon': 'variant-e',
+}
+
+MODEL_NAMES = {
+    'opus': 'claude-opus-4-5-20251101',
+    'sonnet': 'claude-sonnet-4-5-20250929',
+    'haiku': 'claude-3-5-haiku-20241022',
+}
+
+QUESTIONS_PER_TEST = 5
+
+
+@dataclass(frozen=True)
+class Test:
+    format: str
+    model: str
+    dataset: str
+    trial: int = 0
+
+    @property
+    def variant(self) -> str:
+        return FORMAT_VARIANTS[self.format]
+
+    @property
+    def model_name(self) -> str:
+        return MODEL_NAMES[self.model]
+
+    @property
+    def test_id(self) -> str:
+        test_id = f"{self.format}_{self.model}_{self.dataset.replace('/', '-')}"
+        return f"{test_id}_t{self.trial}" if self.trial else test_id
+
+    @property
+    def data_file(self) -> Path:
+        return ENCODED_DIR / self.dataset / f"{self.variant}.{self.format}"
+
+    @property
+    def prompt_file(self) -> Path:
+        return PROMPTS_DIR / f"{self.dataset}.json"
+
+    @property
+    def results_file(self) -> Path:
+        return results_file(self.model, self.dataset)
+
+    @property
+    def session_dir(self) -> Path:
+        return SESSIONS_DIR / self.test_id
+
+
+def results_file(model: str, dataset: str) -> Path:
+    """Split results file for one model and dataset, e.g. haiku-flat-10.jsonl."""
+    return RESULTS_DIR / f"{model}-{dataset.replace('/', '-')}.jsonl"
+
+
+def parse_test_id(test_id: str) -> Test:
+    """The Test a session directory name belongs to, e.g. json_haiku_flat-10_t2."""
+
+    parts = test_id.split('_')
+    trial = 0
+    if len(parts) == 4 and parts[3][:1] == 't' and parts[3][1:].isdigit():
+        trial = int(parts.pop()[1:])
+    if len(parts) != 3 or parts[0] not in FORMAT_VARIANTS or parts[1] not in MODEL_NAMES:
+        raise ValueError(f"not a test id: {test_id!r}")
+    fmt, model, dataset = parts
+    return Test(fmt, model, dataset.replace('-', '/', 1), trial)
+
+
+def all_tests(formats: Optional[list[str]] = None, models: Optional[list[str]] = None,
+              datasets: Optional[list[str]] = None, repeat: int = 1) -> list[Test]:
+    """
+    Every test in run-benchmark.sh order (format, then model, then dataset),
+    once per trial. Trials are the outer loop, so each sweep of the matrix
+    finishes before the next starts and slow drift hits all formats alike.
+    """
+    return [
+        Test(fmt, model, dataset, trial)
+        for trial in range(repeat)
+        for fmt in FORMATS if not formats or fmt in formats
+        for model in MODELS if not models or model in models
+        for dataset in DATASETS if not datasets or dataset in datasets
+    ]
+
+
+def build_prompt(test: Test) -> str:
+    """The prompt run-benchmark.sh sends: the data, then the first questions."""
+
+    data = test.data_file.read_text(encoding='utf-8').rstrip('\n')
+    with open(test.prompt_file, 'r') as f:
+        questions = json.load(f)['questions'][:QUESTIONS_PER_TEST]
+    lines = '\n'.join(f"Q: {question['q']}" for question in questions)
+    return f"Here is data:\n\n{data}\n\nAnswer these questions about the data above:\n{lines}"
+
+
+def result_record(test: Test, output: dict, duration_seconds: int,
+                  timestamp: Optional[str] = None) -> dict:
+    """One results line, built from the CLI's JSON output."""
+    return {
+        'timestamp': timestamp or datetime.now().astimezone().isoformat(timespec='seconds'),
+        'run_id': output.get('session_id') or uuid.uuid4().hex,
+        'format': test.format,
+        'model': test.model,
+        'dataset': test.dataset,
+        'trial': test.trial,
+        'duration_seconds': duration_seconds,
+        'duration_ms': output.get('duration_ms'),
+        'duration_api_ms': output.get('duration_api_ms'),
+        'num_turns': output.get('num_turns'),
+        'total_cost_usd': output.get('total_cost_usd'),
+        'usage': output.get('usage'),
+        'model_usage': output.get('modelUsage'),
+    }
+
+
+def append_result(test: Test, record: dict) -> None:
+    """Append one compact JSON line to the test's split results file."""
+    test.results_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(test.results_file, 'a') as f:
+        f.write(json.dumps(record, separators=(',', ':')) + '\n')
@@ -0,0 +1,260 @@
+"""
+Stage timings for the in-process stele encoder and decoder.
+
+Encoding runs the steps of stele.encode() one at a time:
+
+- flatten:    split_document and flatten_record for every record
+- schema:     build_schema, the column union and type inference
+- dictionary: the full-level value dictionary (cost model)
+- fields:     field token assignment
+- emit:       rendering the header and rows
+
+Decoding is split the same way into header (layout detection and header
+parse), split (rows into raw fields), convert (typed values, token
+expansion) and build (nested records).
+
+After one untimed warm-up pass, every stage is timed `repeats` times with
+the garbage collector off, as timeit does. Each pass starts from the
+source document, so no stage reuses work from an earlier pass. The first
+timed pass also records how many memory blocks each stage leaves
+allocated (sys.getallocatedblocks). That is the objects a stage creates
+and keeps, reported per row as allocations. One more pass runs under
+tracemalloc for each stage's peak memory above what it started with.
+With a profile directory, a last pass dumps one cProfile file per stage.
+
+Usage:
+    inputs = dataset_inputs(Path('bench/datasets')) + generated_inputs(rows=100_000)
+    for item in inputs:
+        result = profile(item, repeats=5)
+        result['stages']   # one dict per (pipeline, stage)
+"""
+
+import cProfile
+import gc
+import io
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from stele import symbols as sym
+from stele.decoder import RecordBuilder, SteleReader, column_decoder
+from stele.dictionary import CostModel
+from stele.encoder import (
+    assign_field_tokens, build_schema, build_value_dictionary, emit, encode, field_references,
+    flatten_record, schema_columns, split_document,
+)
+
+from .stress import Shape, generate
+
+ENCODE_STAGES = ('flatten', 'schema', 'dictionary', 'fields', 'emit')
+DECODE_STAGES = ('header', 'split', 'convert', 'build')
+
+LOG_LEVELS = ['info'] * 14 + ['debug'] * 3 + ['warn'] * 2 + ['error']
+SERVICES = ['api', 'db', 'cache', 'auth', 'queue', 'search']
+REGIONS = ['us-east-1a', 'us-east-1b', 'us-west-2a', 'eu-west-1a']
+MESSAGES = ['Request received', 'Request completed', 'Cache miss', 'Cache hit',
+            'Query executed', 'Connection timeout', 'Retrying request', 'Token refreshed']
+
+
+@dataclass
+class ProfileInput:
+    """One document to profile, with the size of its JSON text."""
+
+    name: str
+    load: Callable[[], Any]
+    json_bytes: int
+
+
+def dataset_inputs(datasets: Path) -> list[ProfileInput]:
+    """Every JSON dataset under bench/datasets, named by its relative path."""
+
+    inputs = []
+    for path in sorted(datasets.rglob('*.json')):
+        name = str(path.relative_to(datasets).with_suffix(''))
+        inputs.append(ProfileInput(name, lambda path=path: json.loads(path.read_text()), path.stat().st_size))
+    return inputs
+
+
+def service_logs(count: int, seed: int = 0) -> dict:
+    """A seeded log-shaped document: flat rows with enum-like and unique fields."""
+
+    rng = random.Random(f"logs:{count}:{seed}")
+    timestamp = 1_700_000_000
+    rows = []
+    for _ in range(count):
+        timestamp += rng.randint(0, 3)
+        service = rng.choice(SERVICES)
+        rows.append({
+            'timestamp': timestamp,
+            'level': rng.choice(LOG_LEVELS),
+            'service': {'name': service, 'instance': f"{service}-{rng.randint(1, 4)}",
+                        'region': rng.choice(REGIONS)},
+            'message': rng.choice(MESSAGES),
+            'latency_ms': round(rng.expovariate(1 / 40), 2),
+            'request_id': f"req-{rng.getrandbits(32):08x}",
+        })
+    return {'logs': rows}
+
+
+def _sized(name: str, make: Callable[[], Any]) -> ProfileInput:
+    return ProfileInput(name, make, len(json.dumps(make(), indent=2)))
+
+
+def generated_inputs(rows: int = 100_000, seed: int = 0) -> list[ProfileInput]:
+    """Large inputs the committed datasets don't cover: many flat rows, one wide nested document."""
+
+    shape = Shape(depth=4, fanout=6, ragged=0.5, optional=0.2)
+    return [
+        _sized(f"generated/logs-{rows}", lambda: service_logs(rows, seed)),
+        _sized(f"generated/nested-{shape.name}", lambda: generate(shape, 'a', seed)),
+    ]
+
+
+def encode_steps(level: str, multiline: bool) -> list[tuple[str, Callable[[dict], None]]]:
+    """The encoder's stages as functions over a shared state dict holding 'doc'."""
+
+    model = CostModel(line_separator='\n' if multiline else sym.SPACE)
+
+    def flatten(state):
+        root, meta, records = split_document(state['doc'])
+        state['parts'] = root, meta, [flatten_record(record) for record in records]
+
+    def schema(state):
+        state['flat'] = build_schema(*state['parts'])
+
+    def dictionary(state):
+        state['values'] = build_value_dictionary(state['flat'], model) if level == 'full' else {}
+
+    def fields(state):
+        columns = schema_columns(state['flat'])
+        state['tokens'] = assign_field_tokens(field_references(columns), state['values'].values(), model)
+
+    def render(state):
+        state['text'] = emit(state['flat'], level, multiline, state['values'], model, state['tokens'])
+
+    return list(zip(ENCODE_STAGES, (flatten, schema, dictionary, fields, render)))
+
+
+def decode_steps() -> list[tuple[str, Callable[[dict], None]]]:
+    """The decoder's stages as functions over a shared state dict holding 'text'."""
+
+    def header(state):
+        state['reader'] = SteleReader(io.StringIO(state['text']))
+
+    def split(state):
+        state['fields'] = list(state['reader'].fields())
+
+    def convert(state):
+        header = state['reader'].header
+        decoders = [column_decoder(header, column) for column in header.columns]
+        state['rows'] = [[decode(value) for decode, value in zip(decoders, values)]
+                         for values in state['fields']]
+
+    def build(state):
+        reader = state['reader']
+        builder = RecordBuilder(reader.header.columns)
+        builder.attach_tables(reader.header.tables, reader.tables)
+        state['records'] = [builder.build(row, number) for number, row in enumerate(state['rows'])]
+
+    return list(zip(DECODE_STAGES, (header, split, convert, build)))
+
+
+def _timed(step: Callable[[dict], None], state: dict) -> float:
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        step(state)
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _run(steps: list, state: dict, seconds: dict, blocks: Optional[dict]) -> None:
+    for name, step in steps:
+        before = sys.getallocatedblocks()
+        seconds.setdefault(name, []).append(_timed(step, state))
+        if blocks is not None:
+            blocks[name] = sys.getallocatedblocks() - before
+
+
+def _peaks(steps: list, state: dict) -> dict:
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for name, step in steps:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            step(state)
+            peaks[name] = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def _dump(steps: list, state: dict, prefix: Path) -> None:
+    for name, step in steps:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        step(state)
+        profiler.disable()
+        profiler.dump_stats(f"{prefix}.{name}.prof")
+
+
+def profile(item: ProfileInput, repeats: int = 5, level: str = 'full', multiline: bool = False,
+            profile_dir: Optional[Path] = None) -> dict:
+    """Time, measure and optionally cProfile every encode and decode stage of one input."""
+
+    doc = item.load()
+    text = encode(doc, level, multiline)
+    rows = len(split_document(doc)[2])
+    stele_bytes = len(text.encode('utf-8'))
+
+    pipelines = [
+        ('encode', encode_steps(level, multiline), lambda: {'doc': doc}, item.json_bytes),
+        ('decode', decode_steps(), lambda: {'text': text}, stele_bytes),
+    ]
+    stages = []
+    for pipeline, steps, fresh, size in pipelines:
+        warm = fresh()
+        for _, step in steps:
+            step(warm)
+        if pipeline == 'encode' and warm['text'] != text:
+            raise RuntimeError(f"{item.name}: staged encode differs from stele.encode()")
+        del warm
+
+        seconds, blocks = {}, {}
+        for repeat in range(repeats):
+            _run(steps, fresh(), seconds, blocks if repeat == 0 else None)
+        peaks = _peaks(steps, fresh())
+        if profile_dir:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            _dump(steps, fresh(), profile_dir / f"{item.name.replace('/', '-')}.{pipeline}")
+
+        for name, _ in steps:
+            best = min(seconds[name])
+            stages.append({
+                'pipeline': pipeline,
+                'stage': name,
+                'best_s': best,
+                'median_s': statistics.median(seconds[name]),
+                'rows_per_s': rows / best if best else None,
+                'mb_per_s': size / best / 1e6 if best else None,
+                'peak_bytes': peaks[name],
+                'allocs_per_row': blocks[name] / rows if rows else None,
+            })
+
+    return {
+        'input': item.name,
+        'rows': rows,
+        'json_bytes': item.json_bytes,
+        'stele_bytes': stele_bytes,
+        'stages': stages,
+    }
@@ -0,0 +1,174 @@
+"""
+Concurrent benchmark execution with bounded parallelism.
+
+Runs `claude --print --output-format json` subprocesses on an asyncio
+event loop. A global limit caps how many tests run at once, a per-model
+limit keeps one model from taking every slot, a token bucket spaces out
+request starts, and failed invocations are retried with exponential
+backoff. Results are written one test at a time under a lock, so the
+per-model-dataset JSONL files never interleave, and are indexed in the
+results store when one is given.
+
+Usage:
+    runner = BenchmarkRunner(RunnerConfig(jobs=8, per_model=3, rate=30), store=ResultsStore())
+    outcomes = asyncio.run(runner.run(all_tests()))
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from .matrix import Test, append_result, build_prompt, result_record
+from .store import ResultsStore
+
+
+class ClaudeError(Exception):
+    """A claude invocation that did not produce a usable result."""
+
+    def __init__(self, message: str, output: str = ''):
+        super().__init__(message)
+        self.output = output
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class RunnerConfig:
+    executable: str = 'claude'
+    jobs: int = 4
+    per_model: int = 2
+    rate: Optional[float] = None      # request starts per minute; None for unlimited
+    burst: Optional[int] = None       # defaults to jobs
+    retries: int = 3
+    backoff: float = 5.0              # seconds before the first retry, doubled after each
+    timeout: float = 600.0
+
+
+@dataclass
+class Outcome:
+    test: Test
+    ok: bool
+    seconds: float = 0.0
+    attempts: int = 0
+    error: str = ''
+    record: dict = field(default_factory=dict)
+
+
+async def invoke_claude(executable: str, model_name: str, prompt: str,
+                        timeout: float) -> tuple[str, dict]:
+    """Run one claude --print invocation. Returns (raw stdout, parsed JSON)."""
+
+    env = dict(os.environ, DISABLE_PROMPT_CACHING='1')
+    process = await asyncio.create_subprocess_exec(
+        executable, '--model', model_name, '--print', '--output-format', 'json',
+        '--no-session-persistence',
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT, env=env,
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate((prompt + '\n').encode()), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise ClaudeError(f"timed out after {timeout:g}s")
+
+    raw = stdout.decode(errors='replace')
+    if process.returncode != 0:
+        lines = raw.strip().splitlines()
+        raise ClaudeError(lines[-1] if lines else f"exit status {process.returncode}", raw)
+    try:
+        output = json.loads(raw)
+    except ValueError:
+        raise ClaudeError("output is not JSON", raw)
+    if output.get('is_error'):
+        raise ClaudeError(f"error result: {output.get('subtype') or output.get('result')}", raw)
+    return raw, output
+
+
+class BenchmarkRunner:
+    """Run tests concurrently and persist each result as it completes."""
+
+    def __init__(self, config: RunnerConfig, report: Callable[[Outcome], None] = lambda outcome: None,
+                 store: Optional[ResultsStore] = None):
+        self.config = config
+        self.report = report
+        self.store = store
+
+    async def run(self, tests: list[Test]) -> list[Outcome]:
+        config = self.config
+        self._slots = asyncio.Semaphore(max(1, config.jobs))
+        self._model_slots = {model: asyncio.Semaphore(max(1, config.per_model))
+                             for model in {test.model for test in tests}}
+        self._bucket = (TokenBucket(config.rate / 60, config.burst or config.jobs)
+                        if config.rate else None)
+        self._write_lock = asyncio.Lock()
+        return list(await asyncio.gather(*(self._run_one(test) for test in tests)))
+
+    async def _run_one(self, test: Test) -> Outcome:
+        config = self.config
+        outcome = Outcome(test, ok=False)
+        try:
+            prompt = build_prompt(test)
+        except (OSError, ValueError, KeyError) as e:
+            outcome.error = f"cannot build prompt: {e}"
+            self.report(outcome)
+            return outcome
+
+        while True:
+            outcome.attempts += 1
+            # Take the model slot first so a test waiting on a busy model never
+            # holds one of the global slots.
+            async with self._model_slots[test.model], self._slots:
+                if self._bucket:
+                    await self._bucket.acquire()
+                start = time.monotonic()
+                try:
+                    raw, output = await invoke_claude(config.executable, test.model_name,
+                                                      prompt, config.timeout)
+                    break
+                except (ClaudeError, OSError) as e:
+                    outcome.error = str(e)
+            if outcome.attempts > config.retries:
+                self.report(outcome)
+                return outcome
+            # Back off with both slots released so other tests can run
+            # meanwhile. Jitter keeps retries from the same burst from lining
+            # up again.
+            delay = config.backoff * 2 ** (outcome.attempts - 1)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+        outcome.seconds = time.monotonic() - start
+        outcome.record = result_record(test, output, int(outcome.seconds))
+        outcome.ok, outcome.error = True, ''
+        async with self._write_lock:
+            test.session_dir.mkdir(parents=True, exist_ok=True)
+            (test.session_dir / 'output.json').write_text(raw.rstrip('\n') + '\n')
+            append_result(test, outcome.record)
+            if self.store:
+                self.store.add(outcome.record)
+        self.report(outcome)
+        return outcome
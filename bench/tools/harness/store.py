@@ -0,0 +1,242 @@
+"""
+Indexed local store for benchmark results.
+
+One SQLite table keyed by (format, model, dataset, variant, run_id), with
+the trial index, usage, cost and duration fields pulled out into indexed
+columns and the full result kept as JSON. A second table holds the
+per-question correctness grade-answers.py derives from session outputs,
+under the same key. The split results/*.jsonl files stay the
+committed record; the database under results/ is an index over them that
+import_jsonl() can rebuild at any time.
+
+Usage:
+    with ResultsStore() as store:
+        store.import_jsonl(RESULTS_DIR.glob('*.jsonl'))
+        store.is_completed('json', 'haiku', 'flat/10')
+        store.counts('format')
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .matrix import FORMAT_VARIANTS, RESULTS_DIR
+
+DB_PATH = RESULTS_DIR / "results.db"
+
+USAGE_FIELDS = ('input_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens', 'output_tokens')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    format TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    trial INTEGER NOT NULL DEFAULT 0,
+    timestamp TEXT,
+    duration_seconds REAL,
+    duration_ms INTEGER,
+    duration_api_ms INTEGER,
+    num_turns INTEGER,
+    total_cost_usd REAL,
+    input_tokens INTEGER,
+    cache_creation_input_tokens INTEGER,
+    cache_read_input_tokens INTEGER,
+    output_tokens INTEGER,
+    record TEXT NOT NULL,
+    PRIMARY KEY (format, model, dataset, variant, run_id)
+);
+CREATE INDEX IF NOT EXISTS results_cell ON results (model, dataset, format, trial);
+CREATE INDEX IF NOT EXISTS results_cost ON results (format, total_cost_usd);
+CREATE INDEX IF NOT EXISTS results_tokens ON results (format, input_tokens, output_tokens);
+CREATE INDEX IF NOT EXISTS results_latency ON results (format, duration_ms, duration_api_ms);
+CREATE TABLE IF NOT EXISTS grades (
+    format TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    trial INTEGER NOT NULL DEFAULT 0,
+    question INTEGER NOT NULL,
+    expected TEXT,
+    answer TEXT,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (format, model, dataset, variant, run_id, question)
+);
+CREATE INDEX IF NOT EXISTS grades_cell ON grades (model, dataset, format, trial);
+"""
+
+COLUMNS = ('format', 'model', 'dataset', 'variant', 'run_id', 'trial', 'timestamp', 'duration_seconds',
+           'duration_ms', 'duration_api_ms', 'num_turns', 'total_cost_usd') + USAGE_FIELDS + ('record',)
+INSERT = (f"INSERT OR IGNORE INTO results ({', '.join(COLUMNS)}) "
+          f"VALUES ({', '.join('?' * len(COLUMNS))})")
+
+GRADE_COLUMNS = ('format', 'model', 'dataset', 'variant', 'run_id', 'trial', 'question', 'expected',
+                 'answer', 'correct')
+INSERT_GRADE = (f"INSERT OR REPLACE INTO grades ({', '.join(GRADE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(GRADE_COLUMNS))})")
+
+
+def variant_of(record: dict) -> str:
+    """The dataset variant a result was run on (recorded, or implied by its format)."""
+    return record.get('variant') or FORMAT_VARIANTS.get(record.get('format'), '-')
+
+
+def run_id_of(record: dict) -> str:
+    """A result's run id: recorded, or its timestamp for results written before run ids."""
+    return str(record.get('run_id') or record.get('timestamp') or '')
+
+
+def row_for(record: dict, variant: Optional[str] = None) -> tuple:
+    usage = record.get('usage') or {}
+    return (
+        record['format'], record['model'], record['dataset'], variant or variant_of(record),
+        run_id_of(record), record.get('trial') or 0,
+        record.get('timestamp'), record.get('duration_seconds'), record.get('duration_ms'),
+        record.get('duration_api_ms'), record.get('num_turns'), record.get('total_cost_usd'),
+        *(usage.get(name) for name in USAGE_FIELDS),
+        json.dumps(record, separators=(',', ':')),
+    )
+
+
+def read_jsonl(path: Path) -> Iterator[dict]:
+    """Result objects in a JSONL file; pretty-printed (multi-line) objects are accepted."""
+
+    decoder = json.JSONDecoder()
+    text = Path(path).read_text(encoding='utf-8')
+    pos = 0
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if pos >= len(text):
+            return
+        record, pos = decoder.raw_decode(text, pos)
+        yield record
+
+
+class ResultsStore:
+    """SQLite-backed results index."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self.db.executescript(SCHEMA)
+
+    def _migrate(self) -> None:
+        """Bring a database created before trial indexes up to the current schema."""
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(results)")}
+        if columns and 'trial' not in columns:
+            with self.db:
+                self.db.execute("DROP INDEX IF EXISTS results_cell")
+                self.db.execute("ALTER TABLE results ADD COLUMN trial INTEGER NOT NULL DEFAULT 0")
+                self.db.execute("UPDATE results SET trial = COALESCE(json_extract(record, '$.trial'), 0)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def add(self, record: dict) -> bool:
+        """Insert one result. Returns False if its key is already stored."""
+        with self.db:
+            cursor = self.db.execute(INSERT, row_for(record))
+        return cursor.rowcount > 0
+
+    def import_jsonl(self, paths: Iterable[Path], variant: Optional[str] = None) -> tuple[int, int]:
+        """
+        Import result files. Returns (added, already present); safe to repeat.
+
+        `variant` overrides the variant implied by each format, e.g. '-' for
+        results run before datasets had variants.
+        """
+
+        added = seen = 0
+        with self.db:
+            for path in paths:
+                for record in read_jsonl(path):
+                    cursor = self.db.execute(INSERT, row_for(record, variant))
+                    added += cursor.rowcount
+                    seen += 1
+        return added, seen - added
+
+    def is_completed(self, fmt: str, model: str, dataset: str, variant: Optional[str] = None,
+                     trial: int = 0) -> bool:
+        variant = variant or FORMAT_VARIANTS.get(fmt, '-')
+        row = self.db.execute(
+            "SELECT 1 FROM results WHERE model = ? AND dataset = ? AND format = ? AND trial = ? "
+            "AND variant = ? LIMIT 1",
+            (model, dataset, fmt, trial, variant),
+        ).fetchone()
+        return row is not None
+
+    def completed(self) -> set[tuple[str, str, str, str, int]]:
+        """Every (format, model, dataset, variant, trial) with at least one result."""
+        rows = self.db.execute("SELECT DISTINCT format, model, dataset, variant, trial FROM results")
+        return {tuple(row) for row in rows}
+
+    def counts(self, column: str) -> dict[str, int]:
+        """Completed cells (not runs) per format, model or dataset; pre-variant results excluded."""
+        if column not in ('format', 'model', 'dataset'):
+            raise ValueError(f"cannot count by {column!r}")
+        rows = self.db.execute(
+            f"SELECT {column}, COUNT(*) FROM "
+            f"(SELECT DISTINCT format, model, dataset FROM results WHERE variant != '-') "
+            f"GROUP BY {column}"
+        )
+        return {row[0]: row[1] for row in rows}
+
+    def summary(self) -> list[sqlite3.Row]:
+        """Per (format, model, dataset): runs, mean tokens, cost and durations."""
+        return self.db.execute("""
+            SELECT format, model, dataset, COUNT(*) AS runs,
+                   AVG(input_tokens) AS input_tokens, AVG(output_tokens) AS output_tokens,
+                   AVG(cache_creation_input_tokens) AS cache_creation_input_tokens,
+                   AVG(cache_read_input_tokens) AS cache_read_input_tokens,
+                   AVG(total_cost_usd) AS total_cost_usd,
+                   AVG(duration_ms) AS duration_ms, AVG(duration_api_ms) AS duration_api_ms
+            FROM results GROUP BY format, model, dataset ORDER BY dataset, model, format
+        """).fetchall()
+
+    def add_grades(self, key: dict, grades: Iterable[dict]) -> None:
+        """
+        Store one run's per-question grades, replacing any earlier grading of
+        it. `key` carries format, model, dataset, variant, run_id and trial;
+        each grade carries question (index), expected, answer and correct.
+        """
+
+        head = tuple(key[column] for column in GRADE_COLUMNS[:6])
+        with self.db:
+            self.db.executemany(INSERT_GRADE, [
+                head + (grade['question'], grade['expected'], grade['answer'], int(grade['correct']))
+                for grade in grades
+            ])
+
+    def grades(self, **where) -> list[sqlite3.Row]:
+        """Stored per-question grades, optionally filtered by key columns."""
+        unknown = set(where) - set(GRADE_COLUMNS[:7])
+        if unknown:
+            raise ValueError(f"cannot filter by {', '.join(sorted(unknown))}")
+        clause = ' AND '.join(f"{column} = ?" for column in where)
+        query = "SELECT * FROM grades" + (f" WHERE {clause}" if clause else "")
+        return self.db.execute(query + " ORDER BY dataset, model, format, trial, question",
+                               tuple(where.values())).fetchall()
+
+    def records(self, **where) -> Iterator[dict]:
+        """Stored result objects, optionally filtered by key columns."""
+        unknown = set(where) - {'format', 'model', 'dataset', 'variant', 'run_id', 'trial'}
+        if unknown:
+            raise ValueError(f"cannot filter by {', '.join(sorted(unknown))}")
+        clause = ' AND '.join(f"{column} = ?" for column in where)
+        query = "SELECT record FROM results" + (f" WHERE {clause}" if clause else "")
+        for row in self.db.execute(query + " ORDER BY timestamp", tuple(where.values())):
+            yield json.loads(row['record'])
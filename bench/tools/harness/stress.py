@@ -0,0 +1,109 @@
+"""
+Parameterized nested documents for path-flattening stress runs.
+
+The committed nested/deep fixtures stop at 2 departments x 2 teams x 2-3
+members. Stele flattens arrays of objects into indexed paths
+(departments჻1჻teams჻0჻members჻2჻name), so schema width grows with the
+number of array elements, not with the number of distinct fields. The
+shapes here let that be swept: depth, fan-out per level, ragged and
+empty arrays and optional fields, all drawn from a seeded generator so
+the same (shape, variant, seed) always yields the same document.
+
+Usage:
+    shape = Shape(depth=4, fanout=3, ragged=0.5, empty=0.1, optional=0.3)
+    doc = generate(shape, variant='a', seed=0)
+"""
+
+import random
+from dataclasses import dataclass
+
+# One array name per nesting level; deeper levels fall back to level<n>.
+LEVEL_NAMES = ['departments', 'teams', 'members', 'skills', 'projects', 'tasks', 'steps', 'notes']
+
+# Word pools per variant, so no two variants share a prompt prefix.
+THEMES = {
+    'a': ('Culinary', ['pepper', 'ginger', 'basil', 'sage', 'olive', 'clove', 'maple', 'hazel',
+                       'honey', 'saffron', 'thyme', 'vanilla', 'cocoa', 'nutmeg', 'almond', 'pecan']),
+    'b': ('Chromatic', ['crimson', 'scarlet', 'ruby', 'garnet', 'coral', 'amber', 'gold', 'lemon',
+                        'mint', 'jade', 'teal', 'azure', 'cobalt', 'indigo', 'violet', 'lilac']),
+    'c': ('Wildlife', ['falcon', 'hawk', 'eagle', 'kite', 'osprey', 'harrier', 'owl', 'raven',
+                       'wren', 'robin', 'thrush', 'swift', 'heron', 'crane', 'egret', 'ibis']),
+    'd': ('Metro', ['tokyo', 'osaka', 'seoul', 'beijing', 'shanghai', 'mumbai', 'bangkok', 'hanoi',
+                    'sydney', 'lima', 'quito', 'oslo', 'cairo', 'dakar', 'accra', 'lagos']),
+    'e': ('Stellar', ['nova', 'nebula', 'pulsar', 'quasar', 'photon', 'neutron', 'proton', 'electron',
+                      'comet', 'meteor', 'orbit', 'zenith', 'apogee', 'perigee', 'corona', 'aurora']),
+}
+
+ROLES = ['lead', 'senior', 'engineer', 'analyst', 'associate']
+LEVELS = ['beginner', 'intermediate', 'advanced', 'expert']
+
+
+@dataclass(frozen=True)
+class Shape:
+    depth: int = 3            # levels of object arrays below the root object
+    fanout: int = 3           # mean children per array
+    ragged: float = 0.0       # children vary in [fanout*(1-ragged), fanout*(1+ragged)]
+    empty: float = 0.0        # chance that a non-leaf node's child array is empty
+    optional: float = 0.0     # chance that each optional field is left out
+
+    @property
+    def name(self) -> str:
+        """Directory-safe id, e.g. d4-f3-r0.5-e0.1-o0.3."""
+        return f"d{self.depth}-f{self.fanout}-r{self.ragged:g}-e{self.empty:g}-o{self.optional:g}"
+
+    def max_nodes(self) -> int:
+        """Upper bound on generated objects below the root, for refusing huge shapes."""
+        widest = max(1, round(self.fanout * (1 + self.ragged)))
+        return sum(widest ** level for level in range(1, self.depth + 1))
+
+
+def level_name(level: int) -> str:
+    return LEVEL_NAMES[level] if level < len(LEVEL_NAMES) else f"level{level}"
+
+
+def _children(shape: Shape, rng: random.Random) -> int:
+    if shape.empty and rng.random() < shape.empty:
+        return 0
+    if not shape.ragged:
+        return shape.fanout
+    low = max(1, round(shape.fanout * (1 - shape.ragged)))
+    return rng.randint(low, max(low, round(shape.fanout * (1 + shape.ragged))))
+
+
+def _node(shape: Shape, rng: random.Random, words: list[str], level: int, counter: list[int]) -> dict:
+    counter[0] += 1
+    node = {
+        'id': counter[0],
+        'name': f"{rng.choice(words)}_{rng.choice(words)}",
+    }
+    optional = {
+        'role': lambda: rng.choice(ROLES),
+        'level': lambda: rng.choice(LEVELS),
+        'score': lambda: rng.randint(1, 100),
+        'active': lambda: rng.random() < 0.7,
+        'tags': lambda: rng.sample(words, rng.randint(1, 3)),
+    }
+    for key, make in optional.items():
+        if not shape.optional or rng.random() >= shape.optional:
+            node[key] = make()
+    if level + 1 < shape.depth:
+        node[level_name(level + 1)] = [
+            _node(shape, rng, words, level + 1, counter) for _ in range(_children(shape, rng))
+        ]
+    return node
+
+
+def generate(shape: Shape, variant: str = 'a', seed: int = 0) -> dict:
+    """One organization document of the given shape; deterministic per (shape, variant, seed)."""
+
+    prefix, words = THEMES[variant]
+    rng = random.Random(f"{shape.name}:{variant}:{seed}")
+    counter = [0]
+    top = [_node(shape, rng, words, 0, counter) for _ in range(_children(shape, rng))] if shape.depth else []
+    return {
+        'organization': {
+            'name': f"{prefix} {rng.choice(words).title()}",
+            'founded': 2000 + rng.randint(0, 24),
+            level_name(0): top,
+        }
+    }
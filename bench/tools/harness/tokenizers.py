@@ -0,0 +1,250 @@
+"""
+Local BPE tokenizers for offline token counting.
+
+Loads a byte-level BPE vocabulary from disk and counts tokens without any
+network access or third-party package:
+
+- GPT-2 style `vocab.json` + `merges.txt` (pass the directory or vocab.json)
+- Hugging Face `tokenizer.json` with a BPE model
+- tiktoken rank files (`*.tiktoken`: base64 token, space, rank per line)
+
+Merges outside the GPT-2 byte alphabet (SentencePiece and other
+non-byte-level vocabularies) raise ValueError rather than count wrongly.
+
+Text is split into pieces before BPE with the pattern its encoding was
+trained with (PATTERNS): GPT-2's for vocab/merges files and r50k/p50k
+rank files, cl100k_base's or o200k_base's for those rank files, and the
+Split regex a tokenizer.json declares. A rank file is matched by its name;
+pass `pattern` for a renamed one. An unknown rank file raises ValueError,
+since the wrong split changes counts most on punctuation-heavy text.
+
+The exact patterns need the third-party `regex` module for \\p{L}/\\p{N};
+without it an equivalent stdlib `re` pattern is used where one exists,
+which can differ on rare scripts. o200k_base has none (it tells upper
+from lower case letters) and raises ValueError.
+
+Usage:
+    tokenizer = load_tokenizer('path/to/tokenizer.json')
+    tokenizer.count("◉hello┃world")
+    load_tokenizer('encoding.tiktoken', pattern='cl100k_base').pattern  # 'cl100k_base'
+"""
+
+import base64
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+_CONTRACTIONS = r"""'s|'t|'re|'ve|'m|'ll|'d"""
+_CASED_CONTRACTIONS = r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)"""
+_UPPER = r"[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]"
+_LOWER = r"[\p{Ll}\p{Lm}\p{Lo}\p{M}]"
+
+# Split pattern name -> (exact `regex` pattern, stdlib `re` equivalent or None).
+PATTERNS = {
+    'gpt2': (
+        _CONTRACTIONS + r"""| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        _CONTRACTIONS + r"""| ?[^\W\d_]+| ?\d+| ?(?:[^\s\w]|_)+|\s+(?!\S)|\s+""",
+    ),
+    'cl100k_base': (
+        _CASED_CONTRACTIONS + r"""|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n]*"""
+        r"""|\s*[\r\n]+|\s+(?!\S)|\s+""",
+        _CASED_CONTRACTIONS + r"""|(?:[^\r\n\w]|_)?[^\W\d_]+|\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*"""
+        r"""|\s*[\r\n]+|\s+(?!\S)|\s+""",
+    ),
+    'o200k_base': (
+        rf"""[^\r\n\p{{L}}\p{{N}}]?{_UPPER}*{_LOWER}+{_CASED_CONTRACTIONS}?"""
+        rf"""|[^\r\n\p{{L}}\p{{N}}]?{_UPPER}+{_LOWER}*{_CASED_CONTRACTIONS}?"""
+        r"""|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n/]*|\s*[\r\n]+|\s+(?!\S)|\s+""",
+        None,
+    ),
+}
+
+# tiktoken rank file stem -> split pattern name.
+RANK_FILE_PATTERNS = {
+    'r50k_base': 'gpt2',
+    'p50k_base': 'gpt2',
+    'p50k_edit': 'gpt2',
+    'cl100k_base': 'cl100k_base',
+    'o200k_base': 'o200k_base',
+}
+
+
+def compile_pattern(name: str):
+    """The compiled split pattern `name` (see PATTERNS)."""
+
+    if name not in PATTERNS:
+        raise ValueError(f"unknown split pattern {name!r} (known: {', '.join(PATTERNS)})")
+    exact, fallback = PATTERNS[name]
+    if regex is not None:
+        return regex.compile(exact)
+    if fallback is None:
+        raise ValueError(f"the {name} split pattern needs the third-party regex module")
+    return re.compile(fallback)
+
+
+def bytes_to_unicode() -> dict[int, str]:
+    """GPT-2's reversible byte -> printable character mapping."""
+    printable = (list(range(ord('!'), ord('~') + 1)) + list(range(ord('¡'), ord('¬') + 1))
+                 + list(range(ord('®'), ord('ÿ') + 1)))
+    chars = printable[:]
+    n = 0
+    for b in range(256):
+        if b not in printable:
+            printable.append(b)
+            chars.append(256 + n)
+            n += 1
+    return dict(zip(printable, map(chr, chars)))
+
+
+class BPETokenizer:
+    """Byte-level BPE over pair merge ranks."""
+
+    def __init__(self, ranks: dict[tuple[bytes, bytes], int], name: str = 'bpe',
+                 pattern: str = 'gpt2', split=None):
+        # `pattern` names a PATTERNS entry, or is the regex text of `split`.
+        self.ranks = ranks
+        self.name = name
+        self.pattern = pattern
+        self.split = split or compile_pattern(pattern)
+        self._merge = lru_cache(maxsize=1 << 16)(self._merge_word)
+
+    def _merge_word(self, word: bytes) -> int:
+        parts = [word[i:i + 1] for i in range(len(word))]
+        ranks = self.ranks
+        while len(parts) > 1:
+            best, best_rank = -1, None
+            for i in range(len(parts) - 1):
+                rank = ranks.get((parts[i], parts[i + 1]))
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best, best_rank = i, rank
+            if best < 0:
+                break
+            parts[best:best + 2] = [parts[best] + parts[best + 1]]
+        return len(parts)
+
+    def count(self, text: str) -> int:
+        """Number of tokens in `text`."""
+        return sum(self._merge(piece.encode('utf-8')) for piece in self.split.findall(text))
+
+
+class RankTokenizer(BPETokenizer):
+    """tiktoken-style BPE: merge the adjacent pair whose concatenation ranks lowest."""
+
+    def __init__(self, token_ranks: dict[bytes, int], name: str = 'tiktoken', pattern: str = 'gpt2'):
+        self.token_ranks = token_ranks
+        super().__init__({}, name, pattern)
+
+    def _merge_word(self, word: bytes) -> int:
+        if word in self.token_ranks:
+            return 1
+        parts = [word[i:i + 1] for i in range(len(word))]
+        ranks = self.token_ranks
+        while len(parts) > 1:
+            best, best_rank = -1, None
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best, best_rank = i, rank
+            if best < 0:
+                break
+            parts[best:best + 2] = [parts[best] + parts[best + 1]]
+        return len(parts)
+
+
+def _decode_symbol(symbol: str, decoder: dict[str, int]) -> bytes:
+    return bytes(decoder[char] for char in symbol)
+
+
+def _from_merges(merges: list, name: str, special: frozenset = frozenset(),
+                 pattern: str = 'gpt2', split=None) -> BPETokenizer:
+    """
+    Ranks from byte-level merges. Merges of `special` (added) tokens are
+    skipped, as they are never produced from text; any other merge outside
+    the byte alphabet means the vocabulary is not byte-level BPE, whose
+    counts would silently be wrong.
+    """
+
+    decoder = {char: byte for byte, char in bytes_to_unicode().items()}
+    ranks = {}
+    for rank, merge in enumerate(merges):
+        left, right = merge.split(' ') if isinstance(merge, str) else merge
+        if left in special or right in special or left + right in special:
+            continue
+        try:
+            ranks[(_decode_symbol(left, decoder), _decode_symbol(right, decoder))] = rank
+        except KeyError:
+            raise ValueError(f"{name}: not a byte-level BPE tokenizer") from None
+    return BPETokenizer(ranks, name, pattern, split)
+
+
+def _declared_split(spec: dict, path: Path) -> tuple[str, object] | None:
+    """
+    The (pattern, compiled) Split regex a tokenizer.json pre-tokenizer
+    declares, or None for plain byte-level (GPT-2) splitting.
+    """
+
+    pre = spec.get('pre_tokenizer') or {}
+    steps = pre.get('pretokenizers', []) if pre.get('type') == 'Sequence' else [pre]
+    for step in steps:
+        if step.get('type') == 'Split' and 'Regex' in (step.get('pattern') or {}):
+            pattern = step['pattern']['Regex']
+            try:
+                return pattern, (regex or re).compile(pattern)
+            except (re.error, ValueError) as e:
+                raise ValueError(f"{path}: cannot compile its split pattern without the regex module: {e}") \
+                    from None
+    return None
+
+
+def load_tokenizer(path, pattern: str | None = None) -> BPETokenizer:
+    """
+    Load a tokenizer from a tokenizer.json, vocab/merges pair or tiktoken
+    file. `pattern` names the split pattern (PATTERNS) instead of the one
+    the file implies.
+    """
+
+    path = Path(path)
+    if path.is_dir():
+        for candidate in ('tokenizer.json', 'merges.txt'):
+            if (path / candidate).exists():
+                return load_tokenizer(path / candidate, pattern)
+        raise ValueError(f"{path}: no tokenizer.json or merges.txt found")
+
+    if path.name == 'vocab.json':
+        path = path.with_name('merges.txt')
+
+    if path.name.endswith('merges.txt'):
+        lines = path.read_text(encoding='utf-8').splitlines()
+        merges = [line for line in lines if line and not line.startswith('#version')]
+        return _from_merges(merges, path.parent.name or path.name, pattern=pattern or 'gpt2')
+
+    if path.suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        model = spec.get('model', {})
+        if model.get('type') != 'BPE' or 'merges' not in model:
+            raise ValueError(f"{path}: only byte-level BPE tokenizer.json files are supported")
+        special = frozenset(token['content'] for token in spec.get('added_tokens') or ())
+        declared = None if pattern else _declared_split(spec, path)
+        pattern, split = declared or (pattern or 'gpt2', None)
+        return _from_merges(model['merges'], path.parent.name or path.stem, special, pattern, split)
+
+    if path.suffix == '.tiktoken':
+        pattern = pattern or RANK_FILE_PATTERNS.get(path.stem)
+        if pattern is None:
+            raise ValueError(f"{path}: unknown rank file, so its split pattern is unknown; "
+                             f"give its split pattern, one of {', '.join(PATTERNS)}")
+        ranks = {}
+        for line in path.read_text(encoding='ascii').splitlines():
+            if line:
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+        return RankTokenizer(ranks, path.stem, pattern)
+
+    raise ValueError(f"{path}: unrecognised tokenizer file")
@@ -0,0 +1,231 @@
+"""
+In-process TOON encoder, the comparison format in the benchmark matrix.
+
+Produces what `npx @toon-format/cli <file.json>` writes with its default
+options, so bench/encoded/**/*.toon can be regenerated offline and without
+starting Node for every file:
+
+- objects are `key: value` lines, nested objects indented under `key:`
+- arrays of primitives are inline: `tags[3]: a,b,c`
+- arrays of objects that share one set of primitive-valued keys are
+  tabular: `users[2]{id,name}:` and one delimited row per element
+- any other array is a list of `- ` items; an object item carries its first
+  field on the hyphen line and the rest indented below it
+- strings are quoted only when they would read back as something else
+  (empty, padded, true/false/null, numeric, or containing a colon, quote,
+  backslash, bracket, brace, control character or the delimiter, or
+  starting with a hyphen)
+
+Object keys come out in JavaScript's property order: integer-like keys
+first in ascending order, then the rest as parsed. Numbers are written in
+plain decimal; -0 becomes 0 and non-finite numbers null. There is no
+trailing newline.
+
+Usage:
+    from harness.toon import encode
+
+    text = encode(json.loads(source))            # as the CLI
+    text = encode(doc, delimiter='|', indent=4)  # --delimiter '|' --indent 4
+"""
+
+import math
+import re
+from decimal import Decimal
+from typing import Any
+
+DELIMITERS = (',', '\t', '|')
+
+_SAFE_KEY = re.compile(r'[A-Za-z_][A-Za-z0-9_.]*')
+_NUMERIC_LIKE = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|0\d+')
+_STRUCTURAL = re.compile(r'[\[\]{}\n\r\t]')
+_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+_ARRAY_INDEX_LIMIT = 2**32 - 1
+
+
+def _is_primitive(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _is_index(key: str) -> bool:
+    """A key JavaScript orders as an array index: canonical decimal below 2**32 - 1."""
+    return key.isdigit() and key.isascii() and (key == '0' or key[0] != '0') and int(key) < _ARRAY_INDEX_LIMIT
+
+
+def _items(obj: dict) -> list[tuple[str, Any]]:
+    """Object entries in JavaScript property order."""
+    indices = sorted((key for key in obj if _is_index(key)), key=int)
+    if not indices:
+        return list(obj.items())
+    return [(key, obj[key]) for key in indices] + [(k, v) for k, v in obj.items() if not _is_index(k)]
+
+
+def _number(value: int | float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if not math.isfinite(value):
+        return 'null'
+    if value.is_integer():
+        return str(int(value))
+    text = repr(value)
+    return format(Decimal(text), 'f') if 'e' in text else text
+
+
+def _safe_unquoted(value: str, delimiter: str) -> bool:
+    return not (
+        not value
+        or value != value.strip()
+        or value in ('true', 'false', 'null')
+        or _NUMERIC_LIKE.fullmatch(value)
+        or ':' in value or '"' in value or '\\' in value
+        or _STRUCTURAL.search(value)
+        or delimiter in value
+        or value.startswith('-')
+    )
+
+
+def _string(value: str, delimiter: str) -> str:
+    return value if _safe_unquoted(value, delimiter) else f'"{value.translate(_ESCAPES)}"'
+
+
+def _primitive(value: Any, delimiter: str) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str):
+        return _string(value, delimiter)
+    return _number(value)
+
+
+def _key(key: str) -> str:
+    return key if _SAFE_KEY.fullmatch(key) else f'"{key.translate(_ESCAPES)}"'
+
+
+class _Writer:
+    """Collects indented lines for one document."""
+
+    def __init__(self, indent: int, delimiter: str):
+        self.indent = ' ' * indent
+        self.delimiter = delimiter
+        self.lines: list[str] = []
+
+    def push(self, depth: int, line: str) -> None:
+        self.lines.append(self.indent * depth + line)
+
+    def item(self, depth: int, line: str) -> None:
+        self.push(depth, f"- {line}")
+
+    def header(self, length: int, key: str | None = None, fields: list[str] | None = None) -> str:
+        marker = self.delimiter if self.delimiter != ',' else ''
+        text = (_key(key) if key is not None else '') + f"[{length}{marker}]"
+        if fields is not None:
+            text += '{' + self.delimiter.join(_key(field) for field in fields) + '}'
+        return text + ':'
+
+    def inline(self, values: list, key: str | None = None) -> str:
+        header = self.header(len(values), key)
+        if not values:
+            return header
+        return f"{header} {self.delimiter.join(_primitive(value, self.delimiter) for value in values)}"
+
+    def rows(self, rows: list[dict], fields: list[str], depth: int) -> None:
+        for row in rows:
+            self.push(depth, self.delimiter.join(_primitive(row[field], self.delimiter) for field in fields))
+
+    def object(self, obj: dict, depth: int) -> None:
+        for key, value in _items(obj):
+            self.field(key, value, depth)
+
+    def field(self, key: str, value: Any, depth: int) -> None:
+        if _is_primitive(value):
+            self.push(depth, f"{_key(key)}: {_primitive(value, self.delimiter)}")
+        elif isinstance(value, list):
+            self.array(key, value, depth)
+        else:
+            self.push(depth, f"{_key(key)}:")
+            self.object(value, depth + 1)
+
+    def array(self, key: str | None, values: list, depth: int) -> None:
+        if all(_is_primitive(value) for value in values):
+            self.push(depth, self.inline(values, key))
+            return
+        fields = _tabular_fields(values)
+        if fields is not None:
+            self.push(depth, self.header(len(values), key, fields))
+            self.rows(values, fields, depth + 1)
+            return
+        self.push(depth, self.header(len(values), key))
+        for value in values:
+            self.list_item(value, depth + 1)
+
+    def list_item(self, value: Any, depth: int) -> None:
+        if _is_primitive(value):
+            self.item(depth, _primitive(value, self.delimiter))
+        elif isinstance(value, list):
+            if all(_is_primitive(item) for item in value):
+                self.item(depth, self.inline(value))
+            else:
+                self.item(depth, self.header(len(value)))
+                for item in value:
+                    self.list_item(item, depth + 1)
+        else:
+            self.object_item(value, depth)
+
+    def object_item(self, obj: dict, depth: int) -> None:
+        """An object as a list item: its first field on the hyphen line, the rest below."""
+
+        items = _items(obj)
+        if not items:
+            self.push(depth, '-')
+            return
+        (key, value), rest = items[0], items[1:]
+        if _is_primitive(value):
+            self.item(depth, f"{_key(key)}: {_primitive(value, self.delimiter)}")
+        elif isinstance(value, list):
+            fields = _tabular_fields(value)
+            if all(_is_primitive(item) for item in value):
+                self.item(depth, self.inline(value, key))
+            elif fields is not None:
+                self.item(depth, self.header(len(value), key, fields))
+                self.rows(value, fields, depth + 1)
+            else:
+                self.item(depth, self.header(len(value), key))
+                for item in value:
+                    self.list_item(item, depth + 1)
+        else:
+            self.item(depth, f"{_key(key)}:")
+            self.object(value, depth + 2)
+        for key, value in rest:
+            self.field(key, value, depth + 1)
+
+
+def _tabular_fields(values: list) -> list[str] | None:
+    """The shared keys of an array of objects with the same primitive-valued keys, else None."""
+
+    if not values or not all(isinstance(value, dict) for value in values):
+        return None
+    fields = [key for key, _ in _items(values[0])]
+    if not fields:
+        return None
+    for value in values:
+        if len(value) != len(fields):
+            return None
+        for field in fields:
+            if field not in value or not _is_primitive(value[field]):
+                return None
+    return fields
+
+
+def encode(value: Any, indent: int = 2, delimiter: str = ',') -> str:
+    """Encode a parsed JSON value as TOON text."""
+
+    if delimiter not in DELIMITERS:
+        raise ValueError(f"unsupported TOON delimiter {delimiter!r}")
+    if _is_primitive(value):
+        return _primitive(value, delimiter)
+    writer = _Writer(indent, delimiter)
+    if isinstance(value, list):
+        writer.array(None, value, 0)
+    else:
+        writer.object(value, 0)
+    return '\n'.join(writer.lines)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Sweep nested document shapes and chart schema bytes against data bytes.
+
+Usage:
+    nested-stress.py                                   # default depth x fan-out sweep
+    nested-stress.py --depth 2,3,4,5 --fanout 1,2,4,8 --ragged 0.5 --empty 0.1
+    nested-stress.py --depth 4 --fanout 3 --optional 0.3 --write   # also save the documents
+    nested-stress.py --arrays auto                     # sub-tables where smaller
+    nested-stress.py --json > curve.json
+
+Every (depth, fan-out) point is generated for each variant (harness/stress.py,
+deterministic per --seed), encoded in-process at --level and split with
+stele.decoder.section_sizes into the schema line, field and value
+dictionaries and rows. Points and variants run on a process pool.
+
+For each point the report gives the flattened column count, schema and
+data bytes (value dictionary plus rows), the schema share of the file and
+the stele size against indented (as benchmarked) and compact JSON and
+TOON (harness/toon.py).
+Because every array element adds its own indexed paths, the schema share
+climbs with element count; the summary names the first point where stele
+comes out larger than the indented JSON. --arrays tables|auto encodes
+arrays of objects as sub-tables instead (see stele/encoder.py), which
+declare each element schema once; the column count then includes the
+sub-tables' columns.
+--write saves the documents under bench/scale/nested/{shape}/ (gitignored).
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import stele
+from harness import toon
+from harness.stress import THEMES, Shape, generate
+from stele.decoder import section_sizes
+from stele.encoder import ARRAY_MODES, schema_columns
+
+BENCH_DIR = Path(__file__).parent.parent
+SCALE_DIR = BENCH_DIR / "scale" / "nested"
+
+DEFAULT_DEPTHS = [1, 2, 3, 4]
+DEFAULT_FANOUTS = [1, 2, 3, 4, 6]
+MAX_NODES = 200_000
+
+
+def measure(shape: Shape, variant: str, seed: int, level: str, write_dir, arrays: str = 'flatten') -> dict:
+    """Generate, optionally save and encode one document; return its byte breakdown."""
+
+    doc = generate(shape, variant, seed)
+    indented = json.dumps(doc, indent=2) + '\n'
+    if write_dir:
+        target = Path(write_dir) / shape.name / f"variant-{variant}.json"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(indented, encoding='utf-8')
+    flat = stele.flatten(doc, 'flatten' if level == 'ascii' else arrays)
+    text = stele.emit(flat, level)
+    sizes = section_sizes(text)
+    return {
+        'shape': shape.name,
+        'variant': variant,
+        'columns': len(schema_columns(flat)),
+        'json_bytes': len(indented.encode('utf-8')),
+        'compact_bytes': len(json.dumps(doc, separators=(',', ':')).encode('utf-8')),
+        'toon_bytes': len(toon.encode(doc).encode('utf-8')),
+        'stele_bytes': len(text.encode('utf-8')),
+        'field_bytes': sizes['fields'],
+        'schema_bytes': sizes['schema'],
+        'data_bytes': sizes['values'] + sizes['rows'],
+    }
+
+
+def summarize(shape: Shape, runs: list[dict]) -> dict:
+    """Mean byte breakdown of one shape over its variants."""
+
+    def avg(key: str) -> float:
+        return sum(run[key] for run in runs) / len(runs)
+
+    point = {
+        'shape': shape.name,
+        'depth': shape.depth,
+        'fanout': shape.fanout,
+        'variants': len(runs),
+    }
+    for key in ('columns', 'json_bytes', 'compact_bytes', 'toon_bytes', 'stele_bytes',
+                'field_bytes', 'schema_bytes', 'data_bytes'):
+        point[key] = avg(key)
+    header = point['field_bytes'] + point['schema_bytes']
+    point['schema_share'] = header / point['stele_bytes'] if point['stele_bytes'] else None
+    point['schema_per_data'] = header / point['data_bytes'] if point['data_bytes'] else None
+    point['vs_json'] = (point['stele_bytes'] - point['json_bytes']) / point['json_bytes'] * 100
+    point['vs_compact'] = (point['stele_bytes'] - point['compact_bytes']) / point['compact_bytes'] * 100
+    point['vs_toon'] = (point['stele_bytes'] - point['toon_bytes']) / point['toon_bytes'] * 100
+    return point
+
+
+def generate_report(points: list[dict], level: str, arrays: str = 'flatten') -> str:
+    title = f"stele-{level}" if arrays == 'flatten' else f"stele-{level}, arrays={arrays}"
+    lines = [
+        f"# Nested Stress Curve ({title})",
+        "",
+        "Schema = field dictionary + schema line. Data = value dictionary + rows.",
+        "JSON is indented as in bench/datasets; compact JSON has no whitespace.",
+        "TOON is encoded as by @toon-format/cli's defaults.",
+        "Byte figures are means over the variants.",
+        "",
+        "| Shape | Columns | Schema bytes | Data bytes | Schema/data | Schema share | Stele "
+        "| vs JSON | vs compact | vs TOON |",
+        "|-------|--------:|-------------:|-----------:|------------:|-------------:|------:"
+        "|--------:|-----------:|--------:|",
+    ]
+    for p in points:
+        ratio = '-' if p['schema_per_data'] is None else f"{p['schema_per_data']:.2f}"
+        share = '-' if p['schema_share'] is None else f"{p['schema_share'] * 100:.1f}%"
+        lines.append(
+            f"| {p['shape']} | {p['columns']:,.0f} | {p['field_bytes'] + p['schema_bytes']:,.0f} "
+            f"| {p['data_bytes']:,.0f} | {ratio} | {share} | {p['stele_bytes']:,.0f} "
+            f"| {p['vs_json']:+.1f}% | {p['vs_compact']:+.1f}% | {p['vs_toon']:+.1f}% |"
+        )
+
+    losing = [p for p in points if p['vs_json'] > 0]
+    lines.append("")
+    if losing:
+        first = min(losing, key=lambda p: p['columns'])
+        lines.append(f"Stele is larger than indented JSON from {first['shape']} "
+                     f"({first['columns']:,.0f} columns) on; {len(losing)} of {len(points)} shapes lose.")
+    else:
+        lines.append("Stele is smaller than indented JSON at every shape in this sweep.")
+    return '\n'.join(lines) + '\n'
+
+
+def int_list(text: str) -> list[int]:
+    return [int(part) for part in text.split(',') if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nested-shape sweep of stele schema bytes vs data bytes.")
+    parser.add_argument('--depth', type=int_list, default=DEFAULT_DEPTHS,
+                        help="comma-separated nesting depths (default: 1,2,3,4)")
+    parser.add_argument('--fanout', type=int_list, default=DEFAULT_FANOUTS,
+                        help="comma-separated mean children per array (default: 1,2,3,4,6)")
+    parser.add_argument('--ragged', type=float, default=0.0, help="relative spread of array lengths (0-1)")
+    parser.add_argument('--empty', type=float, default=0.0, help="chance a child array is empty (0-1)")
+    parser.add_argument('--optional', type=float, default=0.0, help="chance an optional field is omitted (0-1)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--variants', default='abcde', help="variant letters to generate (default: abcde)")
+    parser.add_argument('--level', choices=stele.LEVELS, default='full', help="stele level (default: full)")
+    parser.add_argument('--arrays', choices=ARRAY_MODES, default='flatten',
+                        help="arrays of objects as indexed paths, sub-tables or whichever is smaller")
+    parser.add_argument('--write', nargs='?', type=Path, const=SCALE_DIR, default=None, metavar='DIR',
+                        help="save each document (default dir: %(const)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--json', action='store_true', help="print the curve as JSON")
+    args = parser.parse_args()
+
+    unknown = set(args.variants) - set(THEMES)
+    if unknown:
+        print(f"Error: unknown variants: {', '.join(sorted(unknown))}", file=sys.stderr)
+        sys.exit(1)
+    for name in ('ragged', 'empty', 'optional'):
+        if not 0 <= getattr(args, name) <= 1:
+            print(f"Error: --{name} must be between 0 and 1", file=sys.stderr)
+            sys.exit(1)
+
+    shapes = [Shape(depth, fanout, args.ragged, args.empty, args.optional)
+              for depth in args.depth for fanout in args.fanout]
+    for shape in shapes:
+        if shape.depth < 0 or shape.fanout < 0 or shape.max_nodes() > MAX_NODES:
+            print(f"Error: shape {shape.name} is out of range (at most {MAX_NODES:,} objects)",
+                  file=sys.stderr)
+            sys.exit(1)
+
+    tasks = [(shape, variant) for shape in shapes for variant in args.variants]
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(tasks)))) as pool:
+        futures = [pool.submit(measure, shape, variant, args.seed, args.level, args.write,
+                               args.arrays)
+                   for shape, variant in tasks]
+        runs = [future.result() for future in futures]
+
+    points = [summarize(shape, [run for run in runs if run['shape'] == shape.name]) for shape in shapes]
+    points.sort(key=lambda p: (p['columns'], p['shape']))
+    if args.json:
+        json.dump({'level': args.level, 'arrays': args.arrays, 'seed': args.seed, 'points': points, 'runs': runs},
+                  sys.stdout, indent=2)
+        print()
+    else:
+        print(generate_report(points, args.level, args.arrays), end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Recompute the expected answers in bench/prompts from the data they ask about.
+
+Usage:
+    prompt-answers.py                       # report answers that differ from the data
+    prompt-answers.py --write               # rewrite `a` and the per-variant `answers`
+    prompt-answers.py --template ../prompts/flat/10.json --data ../scale/flat/100000 \\
+        -o ../prompts/flat/100000.json      # a prompt file for a generated size
+
+Every question carrying a `query` (see stele/query.py) is evaluated on
+dictionary-coded columns: `a` against the prompt's own `dataset` file,
+and answers[variant] against each variant's stele-full encoding under
+encoded/, which is the data the graded formats see. Questions without a
+query (the markdown prompts) are left alone.
+
+A variant answer of null means the question names something that is not
+in that variant; the nested questions name the original dataset's teams
+and people. grade-answers.py skips those questions for that variant.
+
+With --data the template's questions are answered for a generated
+dataset: a file, or a directory of variant-*.stele-full, variant-*.json or
+variant-*.ndjson files (generate-variants.py --format ndjson). `a` is then
+the first variant's answer.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+from harness.matrix import BENCH_DIR, ENCODED_DIR, PROMPTS_DIR
+from stele.query import ColumnTable
+
+DATASETS_DIR = BENCH_DIR / "datasets"
+
+
+def format_answer(value: Any) -> Optional[str]:
+    """An answer in the prompts' string form ("42", "true", "a, b, c")."""
+
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ', '.join(format_answer(item) or 'null' for item in value) or None
+    if isinstance(value, dict):
+        return ', '.join(f"{key}: {count}" for key, count in value.items()) or None
+    return str(value)
+
+
+def variant_name(path: Path) -> str:
+    return path.name.split('.', 1)[0]
+
+
+def variant_files(directory: Path) -> list[Path]:
+    """One data file per variant, preferring the stele-full encoding."""
+    files = {}
+    for pattern in ('variant-*.json', 'variant-*.ndjson', 'variant-*.jsonl', 'variant-*.stele-full'):
+        for path in sorted(directory.glob(pattern)):
+            files[variant_name(path)] = path
+    return [files[name] for name in sorted(files)]
+
+
+def answer(questions: list[dict], path: Path) -> list[Optional[str]]:
+    """Each question's answer on one data file (None for questions without a query)."""
+    table = ColumnTable.load(path)
+    return [format_answer(table.query(q['query'])) if 'query' in q else None for q in questions]
+
+
+def answer_prompt(prompt: dict, source: Path, variants: list[Path]) -> tuple[dict, list[str]]:
+    """
+    The prompt with `a` and `answers` recomputed, a note per changed answer
+    and whether anything (including a missing `answers` entry) needs writing.
+    """
+
+    questions = prompt['questions']
+    expected = answer(questions, source)
+    by_variant = {variant_name(path): answer(questions, path) for path in variants}
+    updated, changes, stale = [], [], False
+    for i, question in enumerate(questions):
+        question = dict(question)
+        if 'query' in question:
+            if question.get('a') != expected[i]:
+                changes.append(f"Q{i + 1} a: {question.get('a')!r} -> {expected[i]!r}")
+                stale = True
+            answers = {name: values[i] for name, values in by_variant.items()}
+            previous = question.get('answers')
+            for name, value in answers.items():
+                # Before a question has per-variant answers, every variant was graded on `a`
+                before = previous.get(name) if previous is not None else question.get('a')
+                if previous is None or name not in previous or before != value:
+                    if before != value:
+                        changes.append(f"Q{i + 1} {name}: {before!r} -> {value!r}")
+                    stale = True
+            question['a'] = expected[i]
+            question['answers'] = answers
+        updated.append(question)
+    return {**prompt, 'questions': updated}, changes, stale
+
+
+def render_prompt(prompt: dict) -> str:
+    """The prompt files' layout: one question object per line."""
+    lines = ['{']
+    lines += [f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},"
+              for key, value in prompt.items() if key != 'questions']
+    lines.append('  "questions": [')
+    lines.append(',\n'.join(f"    {json.dumps(q, ensure_ascii=False)}" for q in prompt['questions']))
+    lines += ['  ]', '}']
+    return '\n'.join(lines) + '\n'
+
+
+def write_prompt(prompt: dict, path: Optional[Path]) -> None:
+    text = render_prompt(prompt)
+    if path is None:
+        sys.stdout.write(text)
+    else:
+        path.write_text(text, encoding='utf-8')
+
+
+def relative(path: Path) -> str:
+    """A path as the prompts' `dataset` field gives it: relative to bench/datasets."""
+    path = path.resolve()
+    if not path.is_relative_to(BENCH_DIR.resolve()):
+        return str(path)
+    return os.path.relpath(path, DATASETS_DIR.resolve())
+
+
+def check_committed(write: bool) -> int:
+    """Recompute every committed prompt file; returns how many were out of date."""
+
+    stale_files = 0
+    for prompt_file in sorted(PROMPTS_DIR.glob('*/*.json')):
+        with open(prompt_file, 'r') as f:
+            prompt = json.load(f)
+        if not any('query' in q for q in prompt['questions']):
+            continue
+        name = prompt_file.relative_to(PROMPTS_DIR).with_suffix('')
+        source = DATASETS_DIR / prompt['dataset']
+        if not source.exists():
+            print(f"Error: {source} not found", file=sys.stderr)
+            sys.exit(1)
+        updated, changes, stale = answer_prompt(prompt, source, variant_files(ENCODED_DIR / name))
+        if not stale:
+            status = 'ok'
+        else:
+            status = f"{len(changes)} answers {'updated' if write else 'differ'}"
+            if len(changes) == 0:
+                status = 'variant answers written' if write else 'variant answers missing'
+        print(f"{name}: {status}")
+        for change in changes:
+            print(f"  {change}")
+        if write and stale:
+            write_prompt(updated, prompt_file)
+        stale_files += stale
+    return stale_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute prompt answers from the datasets.")
+    parser.add_argument('--write', action='store_true', help="rewrite stale answers in bench/prompts")
+    parser.add_argument('--template', type=Path, help="prompt file whose questions to answer for --data")
+    parser.add_argument('--data', type=Path, help="generated dataset: a file or a directory of variants")
+    parser.add_argument('-o', '--output', type=Path, help="where --data writes its prompt file (default: stdout)")
+    args = parser.parse_args()
+
+    if bool(args.template) != bool(args.data):
+        print("Error: --template and --data go together", file=sys.stderr)
+        sys.exit(1)
+
+    if args.data:
+        if not args.template.exists() or not args.data.exists():
+            print(f"Error: {args.template if not args.template.exists() else args.data} not found",
+                  file=sys.stderr)
+            sys.exit(1)
+        variants = variant_files(args.data) if args.data.is_dir() else [args.data]
+        if not variants:
+            print(f"Error: No variant-*.json, variant-*.ndjson or variant-*.stele-full files in {args.data}",
+                  file=sys.stderr)
+            sys.exit(1)
+        try:
+            with open(args.template, 'r') as f:
+                template = json.load(f)
+            prompt, _, _ = answer_prompt({**template, 'dataset': relative(args.data)}, variants[0], variants)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        write_prompt(prompt, args.output)
+        return
+
+    stale = check_committed(args.write)
+    if stale and not args.write:
+        print(f"\n{stale} prompt files are out of date; run with --write to update them.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Query and maintain the benchmark results store (results/results.db).
+
+Usage:
+    results-db.py import [files...]               # index results/*.jsonl (idempotent)
+    results-db.py import --variant - results/old-pre-variant/*.jsonl
+    results-db.py add < record.json               # index one result object
+    results-db.py completed FORMAT MODEL DATASET  # exit 0 if the test has a result
+    results-db.py completed                       # list completed tests, one per line
+    results-db.py counts {format,model,dataset}   # completed tests per value
+    results-db.py summary                         # runs and mean usage per cell
+    results-db.py export -o DIR                   # write split JSONL files from the store
+    results-db.py export -o results --force       # overwrite the committed results files
+
+Every command accepts --db PATH to use another database file.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from harness.matrix import FORMAT_VARIANTS, RESULTS_DIR, results_file
+from harness.store import DB_PATH, ResultsStore
+
+
+def cmd_import(store: ResultsStore, args) -> None:
+    paths = args.files or sorted(RESULTS_DIR.glob('*.jsonl'))
+    added, present = store.import_jsonl(paths, args.variant)
+    print(f"Imported {added} results from {len(paths)} files ({present} already present)")
+
+
+def cmd_add(store: ResultsStore, args) -> None:
+    try:
+        record = json.load(sys.stdin)
+    except ValueError as e:
+        print(f"Error: invalid result JSON: {e}", file=sys.stderr)
+        sys.exit(1)
+    store.add(record)
+
+
+def cmd_completed(store: ResultsStore, args) -> None:
+    test = (args.format, args.model, args.dataset)
+    if all(test):
+        sys.exit(0 if store.is_completed(*test) else 1)
+    if any(test):
+        print("Error: give FORMAT, MODEL and DATASET, or none to list every completed test",
+              file=sys.stderr)
+        sys.exit(1)
+    # The same cells is_completed accepts: trial 0 of each format's current variant.
+    for fmt, model, dataset, variant, trial in sorted(store.completed()):
+        if trial == 0 and variant == FORMAT_VARIANTS.get(fmt, '-'):
+            print(fmt, model, dataset)
+
+
+def cmd_counts(store: ResultsStore, args) -> None:
+    for value, count in sorted(store.counts(args.column).items()):
+        print(f"{value}\t{count}")
+
+
+def cmd_summary(store: ResultsStore, args) -> None:
+    print(f"{'Dataset':<16} {'Model':<7} {'Format':<12} {'Runs':>5} {'Input':>9} "
+          f"{'Output':>7} {'Cost $':>8} {'ms':>8} {'API ms':>8}")
+    print("-" * 86)
+    for row in store.summary():
+        print(f"{row['dataset']:<16} {row['model']:<7} {row['format']:<12} {row['runs']:>5} "
+              f"{row['input_tokens'] or 0:>9,.0f} {row['output_tokens'] or 0:>7,.0f} "
+              f"{row['total_cost_usd'] or 0:>8.4f} {row['duration_ms'] or 0:>8,.0f} "
+              f"{row['duration_api_ms'] or 0:>8,.0f}")
+
+
+def cmd_export(store: ResultsStore, args) -> None:
+    # The store may index only part of the results, so rewriting the
+    # committed files from it has to be asked for.
+    if args.output.resolve() == RESULTS_DIR.resolve() and not args.force:
+        print(f"Error: {args.output} holds the committed results files; pass --force to overwrite them",
+              file=sys.stderr)
+        sys.exit(1)
+    grouped = defaultdict(list)
+    for record in store.records():
+        grouped[results_file(record['model'], record['dataset']).name].append(record)
+    args.output.mkdir(parents=True, exist_ok=True)
+    for name, records in sorted(grouped.items()):
+        with open(args.output / name, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        print(f"  Wrote: {name} ({len(records)} entries)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark results store.")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help="database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('import', help="index result JSONL files")
+    p.add_argument('files', nargs='*', type=Path)
+    p.add_argument('--variant', help="record the results under this variant (e.g. '-' for pre-variant runs)")
+    p.set_defaults(run=cmd_import)
+
+    p = commands.add_parser('add', help="index one result object read from stdin")
+    p.set_defaults(run=cmd_add)
+
+    p = commands.add_parser('completed', help="exit 0 if a test has a result, or list completed tests")
+    p.add_argument('format', nargs='?')
+    p.add_argument('model', nargs='?')
+    p.add_argument('dataset', nargs='?')
+    p.set_defaults(run=cmd_completed)
+
+    p = commands.add_parser('counts', help="completed tests per format, model or dataset")
+    p.add_argument('column', choices=['format', 'model', 'dataset'])
+    p.set_defaults(run=cmd_counts)
+
+    p = commands.add_parser('summary', help="runs and mean usage per cell")
+    p.set_defaults(run=cmd_summary)
+
+    p = commands.add_parser('export', help="write split JSONL files from the store")
+    p.add_argument('-o', '--output', type=Path, required=True, help="directory for the JSONL files")
+    p.add_argument('--force', action='store_true', help="allow overwriting the committed results files")
+    p.set_defaults(run=cmd_export)
+
+    args = parser.parse_args()
+    with ResultsStore(args.db) as store:
+        args.run(store, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Run the token efficiency benchmark concurrently.
+
+Same test matrix, variants, prompts and results files as run-benchmark.sh,
+but up to --jobs tests run at once (at most --per-model per model), request
+starts are rate limited with a token bucket, and a failed claude call is
+retried with exponential backoff. Each result is appended to
+results/{model}-{dataset}.jsonl as soon as its test finishes.
+
+Usage:
+    run-benchmark.py --list-remaining
+    run-benchmark.py --all -j 8 --per-model 3 --rate 30
+    run-benchmark.py --model haiku --dataset flat/100
+    run-benchmark.py --batch 10
+    run-benchmark.py --all --repeat 5             # five trials per cell
+    run-benchmark.py --all --claude ./stub-claude.py     # offline dry run
+
+Completed tests are looked up in the results store (harness/store.py) and
+skipped, so an interrupted sweep resumes where it stopped. CLAUDE.md is
+moved aside for the run and restored on exit.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from harness.matrix import DATASETS, FORMATS, MODELS, RESULTS_DIR, all_tests
+from harness.runner import BenchmarkRunner, Outcome, RunnerConfig
+from harness.store import ResultsStore
+
+TOOLS_DIR = Path(__file__).parent
+LOG_FILE = RESULTS_DIR / "benchmark.log"
+CLAUDE_MD = Path.home() / ".claude" / "CLAUDE.md"
+CLAUDE_MD_BACKUP = Path.home() / ".crewu" / "tmp" / "CLAUDE.md.benchmark-backup"
+
+
+def log(level: str, message: str) -> None:
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOG_FILE, 'a') as f:
+        f.write(f"[{timestamp}] [{level}] {message}\n")
+
+
+def backup_claude_md() -> None:
+    if CLAUDE_MD.exists():
+        print("[benchmark] Backing up CLAUDE.md to get raw Claude...")
+        CLAUDE_MD_BACKUP.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(CLAUDE_MD, CLAUDE_MD_BACKUP)
+
+
+def restore_claude_md() -> None:
+    if CLAUDE_MD_BACKUP.exists():
+        print("[benchmark] Restoring CLAUDE.md...")
+        shutil.move(CLAUDE_MD_BACKUP, CLAUDE_MD)
+
+
+def pending_tests(tests: list, store: ResultsStore) -> list:
+    done = store.completed()
+    return [test for test in tests
+            if (test.format, test.model, test.dataset, test.variant, test.trial) not in done]
+
+
+def print_outcome(outcome: Outcome) -> None:
+    test = outcome.test
+    if outcome.ok:
+        usage = outcome.record.get('usage') or {}
+        retries = f", {outcome.attempts - 1} retries" if outcome.attempts > 1 else ""
+        print(f"✓ {test.test_id:<36} {outcome.seconds:6.1f}s  "
+              f"in {usage.get('input_tokens', 0):>7,}  out {usage.get('output_tokens', 0):>6,}{retries}")
+        log('INFO', f"Test {test.test_id} completed successfully in {int(outcome.seconds)}s")
+    else:
+        print(f"✗ {test.test_id:<36} {outcome.error} (after {outcome.attempts} attempts)")
+        log('ERROR', f"Test {test.test_id} failed: {outcome.error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark matrix concurrently.")
+    parser.add_argument('--list', action='store_true', help="list all tests")
+    parser.add_argument('--list-remaining', action='store_true', help="list tests not yet run")
+    parser.add_argument('--all', action='store_true', help="run all remaining tests")
+    parser.add_argument('--batch', type=int, help="run the next N remaining tests")
+    parser.add_argument('--format', choices=FORMATS)
+    parser.add_argument('--model', choices=MODELS)
+    parser.add_argument('--dataset', choices=DATASETS)
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="trials per test, recorded as trial 0..N-1 (default: 1)")
+    parser.add_argument('--encode', action='store_true',
+                        help="re-encode stale inputs first (encode-all.py)")
+    parser.add_argument('-j', '--jobs', type=int, default=4, help="tests in flight (default: 4)")
+    parser.add_argument('--per-model', type=int, default=2,
+                        help="tests in flight per model (default: 2)")
+    parser.add_argument('--rate', type=float, help="max request starts per minute (default: unlimited)")
+    parser.add_argument('--retries', type=int, default=3, help="retries per failed test (default: 3)")
+    parser.add_argument('--backoff', type=float, default=5.0,
+                        help="seconds before the first retry, doubled each time (default: 5)")
+    parser.add_argument('--timeout', type=float, default=600.0,
+                        help="seconds before a claude call is killed (default: 600)")
+    parser.add_argument('--claude', default=os.environ.get('CLAUDE_BIN', 'claude'),
+                        help="claude executable (default: $CLAUDE_BIN or claude)")
+    args = parser.parse_args()
+
+    tests = all_tests(
+        [args.format] if args.format else None,
+        [args.model] if args.model else None,
+        [args.dataset] if args.dataset else None,
+        repeat=max(1, args.repeat),
+    )
+
+    # Pick up results appended by run-benchmark.sh or copied in from elsewhere.
+    store = ResultsStore()
+    store.import_jsonl(sorted(RESULTS_DIR.glob('*.jsonl')))
+
+    if args.list or args.list_remaining:
+        listed = pending_tests(tests, store) if args.list_remaining else tests
+        for n, test in enumerate(listed, 1):
+            trial = f" trial={test.trial}" if args.repeat > 1 else ""
+            print(f"{n:3d}. format={test.format:<12} model={test.model:<6} dataset={test.dataset}{trial}")
+        if args.list_remaining and not listed:
+            print("All tests completed!")
+        return
+
+    if not (args.all or args.batch or args.format or args.model or args.dataset):
+        parser.print_help()
+        return
+
+    remaining = pending_tests(tests, store)
+    skipped = len(tests) - len(remaining)
+    if args.batch:
+        remaining = remaining[:args.batch]
+    if not remaining:
+        print("All selected tests already completed.")
+        return
+
+    if args.encode:
+        targets = [args.dataset] if args.dataset else ['flat', 'nested']
+        if subprocess.run([sys.executable, str(TOOLS_DIR / 'encode-all.py'), *targets]).returncode:
+            log('WARN', "Some encode jobs failed; affected tests will use existing files")
+
+    if shutil.which(args.claude) is None:
+        print(f"Error: claude executable not found: {args.claude}", file=sys.stderr)
+        sys.exit(1)
+
+    config = RunnerConfig(
+        executable=args.claude, jobs=args.jobs, per_model=args.per_model, rate=args.rate,
+        retries=args.retries, backoff=args.backoff, timeout=args.timeout,
+    )
+
+    # SIGTERM should restore CLAUDE.md like Ctrl-C does.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    backup_claude_md()
+    log('INFO', f"Benchmark run started: {len(remaining)} tests, {args.jobs} jobs")
+    print(f"Running {len(remaining)} tests ({skipped} already completed), "
+          f"{args.jobs} at a time, {args.per_model} per model\n")
+    start = time.monotonic()
+    try:
+        outcomes = asyncio.run(BenchmarkRunner(config, print_outcome, store).run(remaining))
+    except KeyboardInterrupt:
+        print("\nInterrupted; completed tests are saved and will be skipped next run.")
+        log('WARN', "Benchmark run interrupted")
+        sys.exit(130)
+    finally:
+        restore_claude_md()
+        store.close()
+    elapsed = time.monotonic() - start
+
+    succeeded = sum(outcome.ok for outcome in outcomes)
+    failed = len(outcomes) - succeeded
+    test_seconds = sum(outcome.seconds for outcome in outcomes)
+    print("\n========================================")
+    print("Benchmark Summary")
+    print("========================================")
+    print(f"Tests completed: {succeeded}")
+    if failed:
+        print(f"Tests failed: {failed}")
+    print(f"Wall clock: {elapsed:.1f}s for {test_seconds:.1f}s of test time")
+    log('INFO', f"Benchmark run completed: {succeeded} successful, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@
 #   ./run-benchmark.sh --dataset flat/100        # Run all tests for one dataset
 #   ./run-benchmark.sh --format stele-ascii --model sonnet --dataset flat/100  # Single test
 #   ./run-benchmark.sh --batch 10                # Run next 10 untested combinations
+#   ./run-benchmark.sh --encode --dataset flat/100  # Refresh stale inputs first (via the encoding cache)
 
 set -euo pipefail
 
@@ -107,21 +108,32 @@ log() {
     echo "[$timestamp] [$level] $message" | tee -a "$LOG_FILE"
 }
 
-# Check if a test has been completed
+# Results store (results/results.db), an index over the split JSONL files
+results_db() {
+    python3 "$TOOLS_DIR/results-db.py" "$@"
+}
+
+# Completed tests, keyed "format model dataset"; filled by sync_results_db
+declare -A COMPLETED=()
+
+# Index any results appended to the JSONL files outside this script, then
+# load every completed test with one query
+sync_results_db() {
+    results_db import > /dev/null
+    COMPLETED=()
+    local format model dataset
+    while read -r format model dataset; do
+        COMPLETED["$format $model $dataset"]=1
+    done < <(results_db completed)
+}
+
+# Check if a test has been completed (as of the last sync_results_db)
 test_completed() {
     local format="$1"
     local model="$2"
     local dataset="$3"
 
-    local results_file
-    results_file=$(get_results_file "$model" "$dataset")
-
-    if [[ ! -f "$results_file" ]]; then
-        return 1
-    fi
-
-    # Check the split file for this model-dataset (handle both compact and pretty JSON)
-    grep -q "\"format\"[[:space:]]*:[[:space:]]*\"$format\"" "$results_file" && return 0 || return 1
+    [[ -n "${COMPLETED["$format $model $dataset"]+set}" ]]
 }
 
 # Generate all test combinations
@@ -147,6 +159,7 @@ list_all() {
 
 # List remaining tests
 list_remaining() {
+    sync_results_db
     echo -e "${BLUE}Remaining test combinations:${NC}"
     local count=0
     generate_all_tests | while read -r format model dataset; do
@@ -278,8 +291,10 @@ $questions"
         local results_file
         results_file=$(get_results_file "$model" "$dataset")
 
-        # Append to split results file (compact JSON, one line)
+        # Append to split results file (compact JSON, one line) and index it
         echo "$result_json" | jq -c '.' >> "$results_file"
+        echo "$result_json" | results_db add
+        COMPLETED["$format $model $dataset"]=1
 
         echo -e "${GREEN}✓ Complete (${duration}s) - Input: $input_tokens, Output: $output_tokens, Cache: $cache_creation${NC}"
         log "INFO" "Test $test_id completed successfully in ${duration}s"
@@ -307,6 +322,8 @@ Usage:
   $0 --model MODEL                               Run all tests for model
   $0 --dataset DATASET                           Run all tests for dataset
   $0 --format F --model M --dataset D            Run single specific test
+  --encode                                       Re-encode stale inputs first (encode-all.py,
+                                                 served from the encoding cache when unchanged)
 
 Formats: ${FORMATS[*]}
 Models:  ${MODELS[*]}
@@ -333,6 +350,7 @@ main() {
     local filter_dataset=""
     local batch_size=""
     local run_all=false
+    local refresh_encoded=false
 
     # Parse arguments
     while [[ $# -gt 0 ]]; do
@@ -353,6 +371,10 @@ main() {
                 run_all=true
                 shift
                 ;;
+            --encode)
+                refresh_encoded=true
+                shift
+                ;;
             --batch)
                 batch_size="$2"
                 shift 2
@@ -383,6 +405,21 @@ main() {
         exit 0
     fi
 
+    # Bring encoded inputs up to date; unchanged sources come from the cache
+    if [[ "$refresh_encoded" == "true" ]]; then
+        local encode_targets=()
+        if [[ -n "$filter_dataset" ]]; then
+            encode_targets=("$filter_dataset")
+        else
+            encode_targets=("flat" "nested")
+        fi
+        if ! python3 "$TOOLS_DIR/encode-all.py" "${encode_targets[@]}"; then
+            log "WARN" "Some encode jobs failed; affected tests will use existing files"
+        fi
+    fi
+
+    sync_results_db
+
     # Backup CLAUDE.md for clean benchmarks
     backup_claude_md
 
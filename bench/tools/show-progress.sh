@@ -11,17 +11,16 @@ NC='\033[0m'
 
 # Paths
 BENCH_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
-RESULTS_FILE="$BENCH_DIR/results/token-counts.jsonl"
+RESULTS_DB="python3 $BENCH_DIR/tools/results-db.py"
 
 # Total tests: 5 formats × 3 models × 7 datasets = 105
 TOTAL_TESTS=105
 
-# Count completed tests
-if [[ -f "$RESULTS_FILE" ]]; then
-    COMPLETED=$(wc -l < "$RESULTS_FILE")
-else
-    COMPLETED=0
-fi
+# Index the split results files, then count completed tests from the store
+$RESULTS_DB import > /dev/null
+FORMAT_COUNTS=$($RESULTS_DB counts format)
+MODEL_COUNTS=$($RESULTS_DB counts model)
+COMPLETED=$(awk -F'\t' '{ n += $2 } END { print n + 0 }' <<< "$FORMAT_COUNTS")
 
 REMAINING=$((TOTAL_TESTS - COMPLETED))
 PERCENT=$((COMPLETED * 100 / TOTAL_TESTS))
@@ -47,18 +46,18 @@ printf "] %d%%\n" "$PERCENT"
 echo ""
 
 # Show breakdown by format if results exist
-if [[ -f "$RESULTS_FILE" && -s "$RESULTS_FILE" ]]; then
+if [[ $COMPLETED -gt 0 ]]; then
     echo -e "${BLUE}Breakdown by format:${NC}"
     for format in json stele-ascii stele-light stele-full toon; do
-        count=$(grep -c "\"format\":\"$format\"" "$RESULTS_FILE" || echo 0)
-        printf "  %-12s: %2d / 21 tests\n" "$format" "$count"
+        count=$(awk -F'\t' -v key="$format" '$1 == key { print $2 }' <<< "$FORMAT_COUNTS")
+        printf "  %-12s: %2d / 21 tests\n" "$format" "${count:-0}"
     done
     echo ""
 
     echo -e "${BLUE}Breakdown by model:${NC}"
     for model in opus sonnet haiku; do
-        count=$(grep -c "\"model\":\"$model\"" "$RESULTS_FILE" || echo 0)
-        printf "  %-6s: %2d / 35 tests\n" "$model" "$count"
+        count=$(awk -F'\t' -v key="$model" '$1 == key { print $2 }' <<< "$MODEL_COUNTS")
+        printf "  %-6s: %2d / 35 tests\n" "$model" "${count:-0}"
     done
 fi
 
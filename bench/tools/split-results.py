@@ -8,38 +8,25 @@ Creates files like:
   results/opus-nested-deep.jsonl
   etc.
 
+and indexes the entries in the results store (results/results.db).
+
 Usage:
   ./split-results.py                     # Split existing data
   ./split-results.py --dry-run           # Show what would be created
 """
 
 import json
-import subprocess
 import sys
 from pathlib import Path
 from collections import defaultdict
 
+from harness.store import ResultsStore, read_jsonl
+
 BENCH_DIR = Path(__file__).parent.parent
 RESULTS_DIR = BENCH_DIR / "results"
 SOURCE_FILE = RESULTS_DIR / "token-counts.jsonl"
 
 
-def parse_jsonl_with_jq(filepath: Path) -> list[dict]:
-    """Use jq to parse the pretty-printed JSONL file into compact objects."""
-    result = subprocess.run(
-        ["jq", "-c", ".", str(filepath)],
-        capture_output=True,
-        text=True,
-        check=True
-    )
-
-    objects = []
-    for line in result.stdout.strip().split("\n"):
-        if line:
-            objects.append(json.loads(line))
-    return objects
-
-
 def get_output_filename(obj: dict) -> str:
     """Generate output filename from model and dataset.
 
@@ -60,7 +47,7 @@ def split_results(dry_run: bool = False) -> dict[str, int]:
         return {}
 
     print(f"Parsing {SOURCE_FILE}...")
-    objects = parse_jsonl_with_jq(SOURCE_FILE)
+    objects = list(read_jsonl(SOURCE_FILE))
     print(f"Found {len(objects)} entries")
 
     # Group by output filename
@@ -84,6 +71,11 @@ def split_results(dry_run: bool = False) -> dict[str, int]:
                     f.write(json.dumps(entry) + "\n")
             print(f"  Created: {filename} ({len(entries)} entries)")
 
+    if not dry_run:
+        with ResultsStore() as store:
+            added, present = store.import_jsonl([SOURCE_FILE])
+        print(f"  Indexed: {added} new results ({present} already in the store)")
+
     return counts
 
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Append records to an existing stele file without re-encoding it.
+
+Usage:
+    stele-append.py <file.stele-full> <records.json>       # JSON array (or one object)
+    stele-append.py <file.stele-full> <records.ndjson>     # one record per line
+    cat batch.ndjson | stele-append.py <file.stele-full> -
+    stele-append.py <file.stele-full> --compact            # rebuild the dictionaries
+    stele-append.py <file.stele-full> <records.json> --compact   # add records that widen the schema
+
+Rows are written after the last row using the file's schema, field tokens
+and value dictionary; values that keep recurring are promoted through a
+dictionary-extension line (stele/append.py). Only the header and the new
+records are read, so a batch costs the same however large the file is.
+
+Records must fit the existing schema. --compact rewrites the whole file
+with dictionaries chosen from every row (and any given records), folding
+the extension lines back into the header.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from stele.append import SteleAppender, compact
+
+
+def read_records(source: str) -> list[dict]:
+    """Records from a JSON array or object, or from NDJSON (.ndjson/.jsonl or stdin)."""
+
+    if source == '-':
+        text, ndjson = sys.stdin.read(), True
+    else:
+        path = Path(source)
+        text, ndjson = path.read_text(encoding='utf-8'), path.suffix in ('.ndjson', '.jsonl')
+
+    if ndjson:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data if isinstance(data, list) else [data]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append records to a stele file.")
+    parser.add_argument('target', type=Path, help="light or full stele file to append to")
+    parser.add_argument('records', nargs='?', help="JSON or NDJSON records ('-' for NDJSON on stdin)")
+    parser.add_argument('--compact', action='store_true',
+                        help="rewrite the file with dictionaries rebuilt from every row")
+    parser.add_argument('--no-promote', action='store_true',
+                        help="never add value tokens; recurring values stay inline")
+    parser.add_argument('--state', type=Path, help="appender state file (default: under bench/.cache/append/)")
+    args = parser.parse_args()
+
+    if not args.target.exists():
+        print(f"Error: File not found: {args.target}", file=sys.stderr)
+        sys.exit(1)
+    if args.records is None and not args.compact:
+        print("Error: give records to append, or --compact", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        records = read_records(args.records) if args.records else []
+        before = args.target.stat().st_size
+        if args.compact:
+            compact(args.target, records, state_path=args.state)
+            print(f"Compacted {args.target}: {before:,} -> {args.target.stat().st_size:,} bytes")
+            return
+        appender = SteleAppender.open(args.target, promote=False if args.no_promote else None,
+                                      state_path=args.state)
+        tokens = len(appender.header.value_tokens)
+        written = appender.append(records)
+        promoted = len(appender.header.value_tokens) - tokens
+        print(f"Appended {written:,} rows to {args.target} "
+              f"(+{args.target.stat().st_size - before:,} bytes, {promoted} values promoted)")
+    except (ValueError, OSError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Split a JSON document into standalone stele chunks under a size budget.
+
+Usage:
+    stele-chunk.py <source.json> --budget 8000                  # bytes per chunk
+    stele-chunk.py <source.json> --budget 2000 --tokenizer ~/models/gpt2
+    stele-chunk.py <source.json> --budget 8000 -o chunks/users  # write users.part-001.stele-full, ...
+    stele-chunk.py <source.json> --budget 8000 --json           # machine-readable report
+
+Rows are packed greedily into chunks (stele/chunking.py). Each chunk is a
+complete stele document with its own header, so it can go in a prompt by
+itself. Its field and value dictionaries hold only the entries its own
+rows use. With --tokenizer the budget is in tokens of that local
+tokenizer (see count-tokens.py), and the value dictionary is chosen by
+tokens too.
+
+The report lists each chunk's rows, size, fill ratio (size / budget) and
+header overhead (dictionaries, schema and metadata as a share of the
+chunk). It also compares the total with the whole document encoded once
+and with the same row split sent as JSON.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from harness.tokenizers import PATTERNS, load_tokenizer
+from stele import LEVELS
+from stele.chunking import _document, pack
+from stele.dictionary import utf8_bytes
+from stele.encoder import ARRAY_MODES, encode, split_document
+
+
+def write_chunks(chunks: list, output_base: Path, level: str) -> list[Path]:
+    """Write chunk k to <output-base>.part-<k>.stele-<level>, numbered from 1."""
+
+    output_base.parent.mkdir(parents=True, exist_ok=True)
+    written = []
+    for number, chunk in enumerate(chunks, 1):
+        target = output_base.with_name(f"{output_base.name}.part-{number:03d}.stele-{level}")
+        target.write_text(chunk.text, encoding='utf-8')
+        written.append(target)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a JSON document into stele chunks under a budget.")
+    parser.add_argument('source', type=Path, help="source JSON file")
+    parser.add_argument('--budget', type=float, required=True,
+                        help="largest chunk, in bytes (or tokens with --tokenizer)")
+    parser.add_argument('--tokenizer',
+                        help="measure in tokens: tokenizer.json, merges.txt, *.tiktoken or a directory")
+    parser.add_argument('--pattern', choices=PATTERNS,
+                        help="tokenizer split pattern, instead of the one its file implies")
+    parser.add_argument('--level', choices=LEVELS, default='full', help="stele level of every chunk")
+    parser.add_argument('-m', '--multiline', action='store_true',
+                        help="one line per header and row instead of ▓-minified")
+    parser.add_argument('--arrays', choices=ARRAY_MODES, default='flatten',
+                        help="arrays of objects as indexed paths, sub-tables, or whichever is smaller")
+    parser.add_argument('-o', '--output-base', type=Path,
+                        help="write <output-base>.part-NNN.stele-<level> for each chunk")
+    parser.add_argument('--json', action='store_true', help="machine-readable report")
+    args = parser.parse_args()
+
+    if not args.source.exists():
+        print(f"Error: File not found: {args.source}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        measure = load_tokenizer(args.tokenizer, args.pattern).count if args.tokenizer else utf8_bytes
+        with open(args.source, 'r') as f:
+            doc = json.load(f)
+        chunks = pack(doc, args.budget, args.level, args.multiline, measure, args.arrays)
+        whole = measure(encode(doc, args.level, args.multiline, arrays=args.arrays))
+        root, meta, records = split_document(doc)
+        as_json = sum(measure(json.dumps(_document(root, meta, records[c.start:c.stop]), ensure_ascii=False))
+                      for c in chunks)
+        written = write_chunks(chunks, args.output_base, args.level) if args.output_base else []
+    except (ValueError, OSError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    unit = 'tokens' if args.tokenizer else 'bytes'
+    total = sum(c.cost for c in chunks)
+    headers = sum(c.header_cost for c in chunks)
+    if args.json:
+        print(json.dumps({
+            'source': str(args.source),
+            'level': args.level,
+            'unit': unit,
+            'budget': args.budget,
+            'chunks': [{
+                'start': c.start, 'stop': c.stop, 'cost': c.cost, 'header_cost': c.header_cost,
+                'fill': round(c.fill(args.budget), 4), 'header_share': round(c.header_share, 4),
+                'over_budget': c.over,
+            } for c in chunks],
+            'total': total,
+            'header_total': headers,
+            'whole_document': whole,
+            'json_chunks': as_json,
+            'files': [str(path) for path in written],
+        }, indent=2))
+        return
+
+    print(f"{args.source}: {len(records):,} rows -> {len(chunks)} chunks "
+          f"(budget {args.budget:,.0f} {unit}, {args.level})")
+    print()
+    print(f"{'#':>4} {'Rows':>15} {unit.capitalize():>10} {'Fill':>7} {'Header':>8} {'Share':>7}")
+    print("-" * 56)
+    for number, c in enumerate(chunks, 1):
+        rows = f"{c.start}-{c.stop - 1}" if c.rows > 1 else str(c.start)
+        flag = '  over budget' if c.over else ''
+        print(f"{number:>4} {rows:>15} {c.cost:>10,.0f} {c.fill(args.budget):>6.1%} "
+              f"{c.header_cost:>8,.0f} {c.header_share:>6.1%}{flag}")
+    print("-" * 56)
+    print(f"Total {total:,.0f} {unit}; headers {headers:,.0f} ({headers / total:.1%}); "
+          f"mean fill {total / (len(chunks) * args.budget):.1%}")
+    print(f"Whole document as one stele: {whole:,.0f} {unit} "
+          f"(chunking adds {(total - whole) / whole:+.1%})")
+    print(f"Same chunks as JSON: {as_json:,.0f} {unit} ({(total - as_json) / as_json:+.1%} as stele)")
+    for path in written:
+        print(f"Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
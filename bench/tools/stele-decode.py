@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Decode stele files back to JSON, streaming one row at a time.
+
+Reads .stele-ascii, .stele-light and .stele-full files in either the
+minified (▓) or multi-line layout.
+
+Usage:
+    stele-decode.py <file.stele-full>                 # whole document as JSON
+    stele-decode.py <file.stele-full> --rows          # one nested record per line
+    stele-decode.py <file.stele-full> --rows --flat   # one path -> value map per line
+    stele-decode.py <file.stele-full> --header        # root, metadata and schema only
+    stele-decode.py <file.stele-full> --row 41        # one record, via the row index
+    stele-decode.py <file.stele-full> --range 100:200 --flat
+    stele-decode.py <file.stele-full> --columns       # columnar storage of each column
+
+--row and --range go through a row offset index (stele/index.py), built on
+first use and kept in bench/.cache/rowindex/, so they seek straight to the
+requested rows instead of decoding everything before them. The index is
+rebuilt automatically when the file's hash changes.
+
+--columns decodes into typed, dictionary-coded arrays (stele/columnar.py)
+and prints how each column is stored and the bytes it holds.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from stele import ColumnarTable, RowIndex, SteleReader
+
+
+def parse_range(text: str) -> tuple:
+    start, sep, stop = text.partition(':')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected START:STOP, got {text!r}")
+    try:
+        return int(start) if start else 0, int(stop) if stop else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:STOP, got {text!r}") from None
+
+
+def print_indexed(args) -> None:
+    """Print the rows selected by --row or --range through the row index."""
+
+    start, stop = args.range if args.range else (args.row, None)
+    with RowIndex.open(args.source, args.index, verify=args.verify) as index:
+        if args.row is not None:
+            if not -len(index) <= args.row < len(index):
+                print(f"Error: row {args.row} out of range ({len(index)} rows)", file=sys.stderr)
+                sys.exit(1)
+            start, stop = args.row % len(index), args.row % len(index) + 1
+        rows = index.flat_records(start, stop) if args.flat else index.records(start, stop)
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+
+
+def print_columns(reader: SteleReader) -> None:
+    """Decode into a ColumnarTable and print each column's storage and size."""
+
+    table = ColumnarTable.from_reader(reader)
+    print(f"{table.length:,} rows, {len(table.strings):,} distinct coded strings, "
+          f"{table.nbytes():,} bytes held")
+    for column, storage in zip(table.header.columns, table.columns):
+        if storage is None:
+            continue
+        path = '.'.join(str(s) for s in column.path)
+        print(f"  {path}: {storage.storage}, {storage.nulls.count:,} nulls, {storage.nbytes():,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode stele files back to JSON.")
+    parser.add_argument('source', type=Path, help="stele file to decode")
+    parser.add_argument('--rows', action='store_true',
+                        help="stream rows as JSON lines instead of one document")
+    parser.add_argument('--flat', action='store_true',
+                        help="with --rows, emit flattened path -> value rows")
+    parser.add_argument('--header', action='store_true',
+                        help="print the decoded header and exit")
+    parser.add_argument('--columns', action='store_true',
+                        help="print the columnar storage of each column and exit")
+    parser.add_argument('--row', type=int, help="print one record (0-based, negative from the end)")
+    parser.add_argument('--range', type=parse_range, metavar='START:STOP',
+                        help="print records START..STOP-1, as a Python slice")
+    parser.add_argument('--index', type=Path, help="row index file (default: under bench/.cache/rowindex/)")
+    parser.add_argument('--verify', action='store_true',
+                        help="re-hash the file before trusting its row index")
+    args = parser.parse_args()
+
+    if not args.source.exists():
+        print(f"Error: File not found: {args.source}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.row is not None or args.range:
+            print_indexed(args)
+            return
+        with open(args.source, 'r', encoding='utf-8', newline='') as f:
+            reader = SteleReader(f)
+            header = reader.header
+
+            if args.header:
+                print(json.dumps({
+                    'level': header.level,
+                    'root': header.root,
+                    'meta': header.meta,
+                    'columns': [
+                        {'path': list(c.path), 'kind': c.kind, 'type': c.type}
+                        for c in header.columns
+                    ],
+                    'value_tokens': len(header.value_tokens),
+                }, indent=2, ensure_ascii=False))
+            elif args.columns:
+                print_columns(reader)
+            elif args.rows:
+                rows = reader.flat_rows() if args.flat else reader.records()
+                for row in rows:
+                    print(json.dumps(row, ensure_ascii=False))
+            else:
+                print(json.dumps(reader.document(), indent=2, ensure_ascii=False))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
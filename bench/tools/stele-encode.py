@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Encode JSON files to stele in-process.
+
+Each source is parsed once and every requested level is emitted from the
+same flattened form.
+
+Usage:
+    stele-encode.py <source.json> [--level full]            # print to stdout
+    stele-encode.py <source.json> -o <output-base>          # write all levels
+    stele-encode.py <source.json> -o <base> --level ascii --level light
+    stele-encode.py <source.json> --dictionary-report       # bytes saved per entry
+    stele-encode.py <source.json> --arrays auto             # sub-tables where smaller
+    stele-encode.py <export.ndjson> -o <base>               # streamed, constant memory
+    stele-encode.py <huge.json> --stream --level light      # stream a top-level array
+    zcat logs.ndjson.gz | stele-encode.py - -o <base>       # NDJSON on stdin
+
+With -o, each level is written to <output-base>.stele-<level>.
+
+The full-level value dictionary admits a value only when its token saves
+more than the dictionary entry costs. --token-costs takes a JSON object of
+per-token costs (same unit as bytes); --min-count N restores the spec's
+fixed "N+ occurrences" rule used for the committed fixtures.
+
+--arrays tables emits arrays of objects as sub-tables (element schema
+declared once, one row per element linked by parent row) instead of
+indexed paths; --arrays auto does so per array where it is smaller. The
+ascii level always flattens.
+
+--stream encodes without loading the document (stele/stream.py). It is on
+by default for .ndjson/.jsonl sources and stdin (read as NDJSON). Records
+are read twice, once for the schema and dictionary counts and once to
+write rows in batches, and a pipe is spooled to a temporary file first.
+A top-level array of objects, or an object holding one next to scalar
+fields, is parsed one element at a time. Memory stays at the dictionaries
+plus one batch of rows. The output matches the in-memory encoder.
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from stele import LEVELS, emit, flatten
+from stele.encoder import ARRAY_MODES
+from stele.dictionary import CostModel, report
+from stele.encoder import build_value_dictionary, plan_value_dictionary
+from stele.stream import SPOOL_MEMORY, encode_stream
+
+
+def encode_file(source: Path, levels: tuple, multiline: bool = False,
+                cost_model: CostModel | None = None, min_count: int | None = None,
+                arrays: str = 'flatten') -> dict[str, str]:
+    """Flatten one source file once (twice for ascii next to sub-tables) and emit every requested level."""
+
+    with open(source, 'r') as f:
+        doc = json.load(f)
+    flat = flatten(doc, arrays)
+
+    values = build_value_dictionary(flat, min_count=min_count) if min_count else None
+    outputs = {}
+    for level in levels:
+        if level == 'ascii' and flat.tables:
+            outputs[level] = emit(flatten(doc), level, multiline)
+        else:
+            outputs[level] = emit(flat, level, multiline, values, cost_model)
+    return outputs
+
+
+def write_levels(source: Path, output_base: Path, levels: tuple, multiline: bool = False,
+                 cost_model: CostModel | None = None, min_count: int | None = None,
+                 arrays: str = 'flatten') -> list[Path]:
+    """Encode one source file and write one output file per level."""
+
+    written = []
+    for level, text in encode_file(source, levels, multiline, cost_model, min_count, arrays).items():
+        target = output_base.with_name(f"{output_base.name}.stele-{level}")
+        target.write_text(text, encoding='utf-8')
+        written.append(target)
+    return written
+
+
+def stream_levels(source: Path, output_base: Path | None, levels: tuple, multiline: bool = False,
+                  cost_model: CostModel | None = None) -> list[Path]:
+    """
+    Stream one source at every level, to <output-base>.stele-<level> or
+    stdout. stdin is read as NDJSON and spooled once for all levels.
+    """
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY) as spool:
+        stdin = str(source) == '-'
+        if stdin:
+            shutil.copyfileobj(sys.stdin.buffer, spool)
+        written = []
+        for level in levels:
+            if stdin:
+                spool.seek(0)
+            input_, ndjson = (spool, True) if stdin else (source, None)
+            if output_base is None:
+                encode_stream(input_, sys.stdout, level, multiline, cost_model, ndjson)
+                sys.stdout.write('\n')
+                continue
+            target = output_base.with_name(f"{output_base.name}.stele-{level}")
+            with open(target, 'w', encoding='utf-8') as out:
+                encode_stream(input_, out, level, multiline, cost_model, ndjson)
+            written.append(target)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode JSON files to stele in-process.")
+    parser.add_argument('source', type=Path, help="source JSON or NDJSON file, or - for NDJSON on stdin")
+    parser.add_argument('-o', '--output-base', type=Path,
+                        help="write <output-base>.stele-<level> for each level")
+    parser.add_argument('--level', action='append', choices=LEVELS,
+                        help="level to emit (repeatable; default: full to stdout, all with -o)")
+    parser.add_argument('-m', '--multiline', action='store_true',
+                        help="one line per header and row instead of ▓-minified")
+    parser.add_argument('--token-costs', type=Path,
+                        help="JSON object of per-token costs for the value dictionary")
+    parser.add_argument('--min-count', type=int,
+                        help="use the fixed threshold rule instead of the cost model")
+    parser.add_argument('--arrays', choices=ARRAY_MODES, default='flatten',
+                        help="arrays of objects as indexed paths, sub-tables, or whichever is smaller")
+    parser.add_argument('--dictionary-report', action='store_true',
+                        help="print the value dictionary and bytes saved per entry")
+    parser.add_argument('--stream', action='store_true',
+                        help="encode in two bounded-memory passes (default for .ndjson/.jsonl and -)")
+    args = parser.parse_args()
+
+    stream = args.stream or str(args.source) == '-' or args.source.suffix in ('.ndjson', '.jsonl')
+    if str(args.source) != '-' and not args.source.exists():
+        print(f"Error: File not found: {args.source}", file=sys.stderr)
+        sys.exit(1)
+    if stream and (args.dictionary_report or args.min_count or args.arrays != 'flatten'):
+        print("Error: --stream does not support --dictionary-report, --min-count or --arrays",
+              file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        cost_model = CostModel.from_file(args.token_costs) if args.token_costs else None
+        if args.multiline and cost_model:
+            cost_model.line_separator = '\n'
+
+        if stream:
+            levels = tuple(args.level) if args.level else (LEVELS if args.output_base else ('full',))
+            if args.output_base:
+                args.output_base.parent.mkdir(parents=True, exist_ok=True)
+            for path in stream_levels(args.source, args.output_base, levels, args.multiline, cost_model):
+                print(f"Wrote {path}")
+        elif args.dictionary_report:
+            with open(args.source, 'r') as f:
+                flat = flatten(json.load(f), args.arrays)
+            print(report(plan_value_dictionary(flat, cost_model)))
+        elif args.output_base:
+            levels = tuple(args.level) if args.level else LEVELS
+            args.output_base.parent.mkdir(parents=True, exist_ok=True)
+            for path in write_levels(args.source, args.output_base, levels, args.multiline,
+                                     cost_model, args.min_count, args.arrays):
+                print(f"Wrote {path}")
+        else:
+            levels = tuple(args.level) if args.level else ('full',)
+            for text in encode_file(args.source, levels, args.multiline,
+                                    cost_model, args.min_count, args.arrays).values():
+                print(text)
+    except (ValueError, OSError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Time every stage of stele encoding and decoding, offline.
+
+Usage:
+    stele-profile.py                                  # all datasets + generated inputs
+    stele-profile.py --rows 1000000 --no-datasets     # one large generated run
+    stele-profile.py --only flat/500 --stages         # per-stage table for each input
+    stele-profile.py --profile-dir /tmp/prof          # also dump a cProfile file per stage
+    stele-profile.py --compare ../.cache/profile/profile-20260101-120000.json
+
+Each input is encoded and decoded stage by stage (harness/profiling.py):
+flatten, schema (type inference), dictionary, fields (field tokens) and
+emit, then header, split, convert and build. Inputs are every JSON file
+in bench/datasets plus generated ones: --rows seeded log rows and one
+wide nested document. For each stage the run records the best and median
+of --repeats timings, rows/s, MB/s (of the input JSON for encoding, of
+the stele text for decoding), the tracemalloc peak and allocations per
+row.
+
+Every run is written as JSON to bench/.cache/profile/ (or -o) along with
+the Python version, platform and commit. --compare prints each stage's
+best time against an earlier run of the same inputs.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from harness.profiling import dataset_inputs, generated_inputs, profile
+
+BENCH_DIR = Path(__file__).parent.parent
+PROFILE_DIR = BENCH_DIR / ".cache" / "profile"
+
+
+def commit() -> str | None:
+    """Short HEAD commit, with -dirty when the tree has changes."""
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def stage_key(result: dict, stage: dict) -> tuple:
+    return result['input'], stage['pipeline'], stage['stage']
+
+
+def totals(results: list[dict]) -> dict:
+    """Per (pipeline, stage): summed best time and rows, largest peak, allocations per row."""
+
+    table = defaultdict(lambda: {'seconds': 0.0, 'rows': 0, 'peak': 0, 'allocs': 0.0})
+    for result in results:
+        for stage in result['stages']:
+            entry = table[stage['pipeline'], stage['stage']]
+            entry['seconds'] += stage['best_s']
+            entry['rows'] += result['rows']
+            entry['peak'] = max(entry['peak'], stage['peak_bytes'])
+            entry['allocs'] += (stage['allocs_per_row'] or 0) * result['rows']
+    return table
+
+
+def print_stages(result: dict) -> None:
+    print(f"{result['input']}: {result['rows']:,} rows, {result['json_bytes']:,} JSON bytes, "
+          f"{result['stele_bytes']:,} stele bytes")
+    print(f"  {'Stage':<18} {'Best ms':>10} {'Median ms':>10} {'Rows/s':>12} {'MB/s':>8} "
+          f"{'Peak KB':>9} {'Allocs/row':>11}")
+    for stage in result['stages']:
+        print(f"  {stage['pipeline'] + ' ' + stage['stage']:<18} {stage['best_s'] * 1000:>10.2f} "
+              f"{stage['median_s'] * 1000:>10.2f} {stage['rows_per_s'] or 0:>12,.0f} "
+              f"{stage['mb_per_s'] or 0:>8.1f} {stage['peak_bytes'] / 1024:>9,.0f} "
+              f"{stage['allocs_per_row'] or 0:>11.2f}")
+    print()
+
+
+def print_summary(results: list[dict]) -> None:
+    print(f"{'Input':<44} {'Rows':>9} {'Encode ms':>10} {'Decode ms':>10} {'Enc rows/s':>11} {'Dec rows/s':>11}")
+    print("-" * 100)
+    for result in results:
+        encode = sum(s['best_s'] for s in result['stages'] if s['pipeline'] == 'encode')
+        decode = sum(s['best_s'] for s in result['stages'] if s['pipeline'] == 'decode')
+        print(f"{result['input']:<44} {result['rows']:>9,} {encode * 1000:>10.2f} {decode * 1000:>10.2f} "
+              f"{result['rows'] / encode:>11,.0f} {result['rows'] / decode:>11,.0f}")
+
+    print()
+    print(f"{'Stage (all inputs)':<22} {'Total ms':>10} {'Share':>7} {'Rows/s':>12} {'Max peak KB':>12} "
+          f"{'Allocs/row':>11}")
+    print("-" * 78)
+    table = totals(results)
+    for pipeline in ('encode', 'decode'):
+        whole = sum(e['seconds'] for (p, _), e in table.items() if p == pipeline)
+        for (p, stage), entry in table.items():
+            if p != pipeline:
+                continue
+            print(f"{pipeline + ' ' + stage:<22} {entry['seconds'] * 1000:>10.1f} "
+                  f"{entry['seconds'] / whole:>6.1%} {entry['rows'] / entry['seconds']:>12,.0f} "
+                  f"{entry['peak'] / 1024:>12,.0f} {entry['allocs'] / entry['rows']:>11.2f}")
+
+
+def print_comparison(results: list[dict], previous: dict) -> None:
+    """Best-time ratio (this run / previous) per stage over the inputs both runs share."""
+
+    before = {stage_key(r, s): s['best_s'] for r in previous['results'] for s in r['stages']}
+    shared = defaultdict(lambda: [0.0, 0.0])
+    for result in results:
+        for stage in result['stages']:
+            old = before.get(stage_key(result, stage))
+            if old is not None:
+                entry = shared[stage['pipeline'], stage['stage']]
+                entry[0] += old
+                entry[1] += stage['best_s']
+    print()
+    print(f"Against {previous.get('created')} ({previous.get('commit') or 'unknown commit'})")
+    if not shared:
+        print("  no inputs in common")
+        return
+    for (pipeline, stage), (old, new) in shared.items():
+        print(f"  {pipeline + ' ' + stage:<20} {old * 1000:>10.1f} ms -> {new * 1000:>10.1f} ms  "
+              f"{new / old:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every stage of stele encoding and decoding.")
+    parser.add_argument('--datasets', type=Path, default=BENCH_DIR / "datasets",
+                        help="datasets directory (default: bench/datasets)")
+    parser.add_argument('--rows', type=int, default=100_000, help="rows in the generated log input")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the generated inputs")
+    parser.add_argument('--no-datasets', action='store_true', help="skip bench/datasets")
+    parser.add_argument('--no-generated', action='store_true', help="skip the generated inputs")
+    parser.add_argument('--only', action='append', help="profile inputs whose name contains this (repeatable)")
+    parser.add_argument('--repeats', type=int, default=5, help="timed passes per stage (best and median kept)")
+    parser.add_argument('--level', choices=('light', 'full'), default='full', help="stele level to encode")
+    parser.add_argument('-m', '--multiline', action='store_true', help="one line per header and row")
+    parser.add_argument('--profile-dir', type=Path, help="write <input>.<pipeline>.<stage>.prof files here")
+    parser.add_argument('--stages', action='store_true', help="print every input's stage table")
+    parser.add_argument('-o', '--output', type=Path,
+                        help="results file (default: bench/.cache/profile/profile-<time>.json)")
+    parser.add_argument('--compare', type=Path, help="earlier results file to compare against")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON instead of tables")
+    args = parser.parse_args()
+
+    if args.repeats < 1:
+        print("Error: --repeats must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    previous = None
+    if args.compare:
+        try:
+            previous = json.loads(args.compare.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    inputs = [] if args.no_datasets else dataset_inputs(args.datasets)
+    if not args.no_generated:
+        inputs += generated_inputs(args.rows, args.seed)
+    if args.only:
+        inputs = [item for item in inputs if any(part in item.name for part in args.only)]
+    if not inputs:
+        print("Error: no inputs to profile", file=sys.stderr)
+        sys.exit(1)
+
+    results = []
+    for item in inputs:
+        print(f"Profiling {item.name}...", file=sys.stderr)
+        results.append(profile(item, args.repeats, args.level, args.multiline, args.profile_dir))
+
+    now = datetime.now(timezone.utc)
+    run = {
+        'created': now.isoformat(timespec='seconds'),
+        'commit': commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'level': args.level,
+        'multiline': args.multiline,
+        'repeats': args.repeats,
+        'results': results,
+    }
+    output = args.output or PROFILE_DIR / f"profile-{now:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(run, indent=2))
+
+    if args.json:
+        print(json.dumps(run, indent=2))
+        return
+    if args.stages:
+        for result in results:
+            print_stages(result)
+    print_summary(results)
+    if previous:
+        print_comparison(results, previous)
+    print(f"\nWrote {output}")
+
+
+if __name__ == '__main__':
+    main()
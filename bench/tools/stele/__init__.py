@@ -0,0 +1,20 @@
+"""
+Python implementation of the stele format for the benchmark tooling.
+
+See docs/stele.md for the format itself.
+"""
+
+from .append import SteleAppender
+from .columnar import ColumnarTable
+from .decoder import Header, SteleReader, decode, iter_records, load
+from .dictionary import CostModel
+from .encoder import LEVELS, Column, Flattened, emit, encode, encode_levels, flatten
+from .index import RowIndex
+from .markdown import encode_markdown
+from .query import ColumnTable
+
+__all__ = [
+    'LEVELS', 'Column', 'Flattened', 'emit', 'encode', 'encode_levels', 'flatten',
+    'CostModel', 'Header', 'SteleReader', 'decode', 'iter_records', 'load',
+    'RowIndex', 'ColumnarTable', 'ColumnTable', 'SteleAppender', 'encode_markdown',
+]
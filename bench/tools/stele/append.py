@@ -0,0 +1,329 @@
+"""
+Append-only writer for stele files that keep growing.
+
+An appender reads only the header of an existing light/full file, then
+writes ◉ rows for new records after the last row, reusing the schema,
+field tokens and value dictionary. Nothing already in the file is
+rewritten, so the cost of a batch depends on the batch, not on the file.
+
+Values that keep recurring in appended rows get tokens through a
+dictionary-extension line, written just before the batch that first uses
+them:
+
+    ...▓◉error┃𓀁┃1700000123▓@𓀃=Connection▓reset,𓀄=cache-2▓◉𓀀┃𓀃┃1700000124
+
+An extension line has the form of the header's value dictionary line and
+may follow any row (or the schema line of a file with no rows yet). Its
+tokens apply to every row after it; tokens are never redefined. A value is
+promoted by the same cost model as the encoder's dictionary (see
+stele.dictionary), counting its occurrences in this batch plus those
+already appended raw. The raw counts are kept in a state file under
+bench/.cache/append/ with the size and mtime of the file after the last
+append. If the file changed some other way, the state is rebuilt from the
+file's extension lines and the counts start over.
+
+compact() rewrites the whole file with dictionaries chosen from all of
+its rows, which also folds the extension lines back into the header.
+
+Usage:
+    from stele.append import SteleAppender, compact
+
+    appender = SteleAppender.open('service-logs.stele-full')
+    appender.append(records)            # one batch of record dicts
+    compact('service-logs.stele-full')  # rebuild the dictionaries from every row
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from . import symbols as sym
+from .decoder import (
+    CHUNK_SIZE, Header, SteleReader, _detect_layout, extension_tokens, parse_header, split_extension,
+)
+from .dictionary import CostModel, count_values, plan
+from .encoder import (
+    _describe, _dictionary_safe, _light_formatter, _text, encode, flatten_record, stated_lengths,
+    value_tokens,
+)
+from .index import _EXTENSION, _ROW
+
+STATE_VERSION = 1
+STATE_DIR = Path(__file__).parent.parent.parent / ".cache" / "append"
+
+# Raw counts kept between batches; past this, values seen once are dropped.
+MAX_PENDING = 50_000
+
+
+def default_state_path(path) -> Path:
+    """State file for a stele file, keyed by its resolved path (as the row index sidecars are)."""
+    resolved = str(Path(path).resolve())
+    digest = hashlib.sha256(resolved.encode('utf-8')).hexdigest()[:16]
+    return STATE_DIR / f"{Path(path).name}-{digest}.json"
+
+
+def _read_head(path: Path) -> tuple[str, bool]:
+    """Text before the first ◉ and whether any row follows."""
+    marker = sym.ROW.encode('utf-8')
+    head = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            head += chunk
+            found = head.find(marker)
+            if found >= 0:
+                return head[:found].decode('utf-8'), True
+            if not chunk:
+                return head.decode('utf-8'), False
+
+
+def _scan_extensions(path: Path) -> dict:
+    """Value tokens declared by extension lines after the rows, in one pass."""
+    tokens = {}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        first = _ROW.search(data)
+        for match in _EXTENSION.finditer(data, first.start() if first else len(data)):
+            end = _ROW.search(data, match.end())
+            line = data[match.start():end.start() if end else len(data)].decode('utf-8')
+            line = line[:-1] if end else line.rstrip('\n')
+            tokens.update(extension_tokens(split_extension(line)[1]))
+    return tokens
+
+
+def _separator(head: str, has_rows: bool) -> str:
+    """The line separator a file uses: the one before its first ◉, else the header's."""
+    if has_rows:
+        return head[-1:]
+    return '\n' if '\n' + sym.SCHEMA in head else sym.SPACE
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with open(path, 'rb') as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def _fits(value: Any, type_: str) -> bool:
+    if value is None:
+        return True
+    if type_ == 'b':
+        return isinstance(value, bool)
+    if isinstance(value, bool):
+        return False
+    if type_ == 'i':
+        return isinstance(value, int)
+    if type_ == 'f':
+        return isinstance(value, (int, float))
+    return isinstance(value, str)
+
+
+class SteleAppender:
+    """Append batches of records to one light/full stele file."""
+
+    def __init__(self, path, header: Header, separator: str, has_rows: bool,
+                 state_path: Path, pending: Counter, promote: bool,
+                 cost_model: Optional[CostModel] = None):
+        self.path = Path(path)
+        self.header = header
+        self.separator = separator
+        self.has_rows = has_rows
+        self.state_path = state_path
+        self.pending = pending
+        self.promote = promote
+        self.cost_model = cost_model or CostModel(line_separator=separator)
+        self.positions = {column.path: i for i, column in enumerate(header.columns)}
+
+    @classmethod
+    def open(cls, path, promote: Optional[bool] = None, cost_model: Optional[CostModel] = None,
+             state_path: Optional[Path] = None) -> 'SteleAppender':
+        """
+        Read the header of `path` and the appender state.
+
+        `promote` (default: whether the file is at the full level) decides
+        whether recurring values get extension tokens.
+        """
+
+        path = Path(path)
+        state_path = Path(state_path) if state_path else default_state_path(path)
+        head, has_rows = _read_head(path)
+        layout, _ = _detect_layout(iter([head + sym.ROW]))
+        if layout == 'ascii':
+            raise ValueError(f"{path}: appending needs the light or full layout")
+        header = parse_header(head)
+        if header.tables:
+            raise ValueError(f"{path}: sub-table rows are numbered from the top; compact instead")
+        separator = _separator(head, has_rows)
+        if separator not in (sym.SPACE, '\n'):
+            raise ValueError(f"{path}: the first row is not preceded by a ▓ or newline separator")
+
+        state = cls._load_state(path, state_path)
+        if state is None:
+            header.value_tokens.update(_scan_extensions(path))
+            pending = Counter()
+        else:
+            header.value_tokens.update(state['tokens'])
+            pending = Counter(state['pending'])
+        if promote is None:
+            promote = bool(header.value_tokens) or path.suffix == '.stele-full'
+        return cls(path, header, separator, has_rows, state_path, pending, promote, cost_model)
+
+    @staticmethod
+    def _load_state(path: Path, state_path: Path) -> Optional[dict]:
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        stat = path.stat()
+        if state.get('version') != STATE_VERSION or state.get('source') != str(path.resolve()) \
+                or state.get('size') != stat.st_size or state.get('mtime_ns') != stat.st_mtime_ns:
+            return None
+        return state
+
+    def _save_state(self) -> None:
+        stat = self.path.stat()
+        state = {
+            'version': STATE_VERSION,
+            'source': str(self.path.resolve()),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'tokens': self.header.value_tokens,
+            'pending': dict(self.pending),
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(self.state_path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.state_path)
+
+    def row(self, record: dict, number: int = 0) -> list:
+        """One record as a row of the file's schema; ValueError if it does not fit."""
+
+        if not isinstance(record, dict):
+            raise ValueError(f"record {number}: expected an object")
+        values, markers = flatten_record(record)
+        columns = self.header.columns
+        row = [None] * len(columns)
+        inline = set()
+        for path, count in markers.items():
+            i = self.positions.get(path)
+            if i is not None and columns[i].kind == 'array' and not count:
+                row[i] = []
+                inline.add(path)
+            elif i is None or columns[i].kind != 'marker':
+                raise ValueError(f"record {number}: array {_describe(path)} is not in the schema")
+        for path, value in values.items():
+            i = self.positions.get(path)
+            if i is None:
+                raise ValueError(f"record {number}: {_describe(path)} is not in the schema; "
+                                 "compact with these records to widen it")
+            column = columns[i]
+            items = value if isinstance(value, list) else [value]
+            if value is not None and ((column.kind == 'array') != isinstance(value, list)
+                                      or not all(_fits(item, column.type) for item in items)):
+                raise ValueError(f"record {number}: {_describe(path)} does not fit column type "
+                                 f"{column.type}{'[]' if column.kind == 'array' else ''}")
+            row[i] = value
+        for path, count in stated_lengths(values, markers, inline).items():
+            row[self.positions[path]] = count
+        return row
+
+    def _promote(self, rows: list[list]) -> dict:
+        """Extension entries for this batch (token -> value), updating the raw counts."""
+
+        columns = self.header.columns
+        indexes = [i for i, col in enumerate(columns) if col.kind == 'value' and col.type in ('s', 'b')]
+        known = set(self.header.value_tokens.values())
+        counts = Counter({value: n for value, n in count_values(rows, indexes, _dictionary_safe).items()
+                          if value not in known})
+        counts.update({value: n for value, n in self.pending.items() if value in counts})
+
+        used = set(self.header.value_tokens) | set(self.header.field_tokens.values())
+        free = [token for token in value_tokens() if token not in used]
+        entries = plan(counts, _text, free, self.cost_model)
+
+        promoted = {entry.value for entry in entries}
+        for value, n in counts.items():
+            if value in promoted:
+                self.pending.pop(value, None)
+            else:
+                self.pending[value] = n
+        if len(self.pending) > MAX_PENDING:
+            self.pending = Counter(dict(self.pending.most_common(MAX_PENDING // 2)))
+        return {entry.token: entry.value for entry in entries}
+
+    def append(self, records: Iterable[dict]) -> int:
+        """Write one batch of records after the last row; returns how many were written."""
+
+        rows = [self.row(record, number) for number, record in enumerate(records)]
+        if not rows:
+            return 0
+
+        added = self._promote(rows) if self.promote else {}
+        self.header.value_tokens.update(added)
+        tokens = {value: token for token, value in self.header.value_tokens.items()}
+        formatters = [_light_formatter(column, tokens) for column in self.header.columns]
+
+        lines = []
+        if added:
+            lines.append(sym.SCHEMA + ','.join(f"{t}={_text(v)}" for t, v in added.items()))
+        for row in rows:
+            lines.append(sym.ROW + sym.FIELD.join(f(v) for f, v in zip(formatters, row)))
+        text = ''.join(self.separator + line for line in lines)
+
+        # A trailing newline stays the last byte of the file.
+        newline = _ends_with_newline(self.path)
+        with open(self.path, 'r+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            if newline:
+                f.truncate(end - 1)
+                f.seek(end - 1)
+            f.write((text + ('\n' if newline else '')).encode('utf-8'))
+
+        self.has_rows = True
+        self._save_state()
+        return len(rows)
+
+
+def compact(path, records: Iterable[dict] = (), cost_model: Optional[CostModel] = None,
+            state_path: Optional[Path] = None) -> Path:
+    """
+    Rewrite `path` in full, optionally with more records appended, choosing
+    the schema and dictionaries from every row. Keeps the file's level
+    and line layout; the appender state starts over.
+    """
+
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = SteleReader(f)
+        header = reader.header
+        rows = list(reader.records())
+    rows.extend(records)
+
+    root = header.root
+    if root == sym.LIST_ROOT or (not root and len(rows) != 1):
+        doc: Any = rows
+    elif not root:
+        doc = rows[0]
+    else:
+        doc = {**header.meta, root: rows}
+
+    level = header.level
+    if level == 'light' and path.suffix == '.stele-full':
+        level = 'full'
+    multiline = header.layout == 'unicode' and _separator(*_read_head(path)) == '\n'
+    if cost_model is None and multiline:
+        cost_model = CostModel(line_separator='\n')
+    text = encode(doc, level, multiline, cost_model, 'auto' if header.tables else 'flatten')
+
+    newline = _ends_with_newline(path)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(text + ('\n' if newline else ''), encoding='utf-8')
+    os.replace(tmp, path)
+    (Path(state_path) if state_path else default_state_path(path)).unlink(missing_ok=True)
+    return path
@@ -0,0 +1,149 @@
+"""
+Budget-bounded chunking for sending a document over several prompts.
+
+pack() splits a document's rows into consecutive chunks, each encoded as
+its own standalone stele document no larger than a budget. Each chunk is
+a plain encode() of its rows with the document's metadata, so its field
+and value dictionaries cover only the paths and values those rows use.
+Nothing is shared between chunks, and any one of them decodes alone.
+
+Rows are packed greedily: each chunk takes as many rows as fit. The size
+is measured on the encoded text, in UTF-8 bytes by default or with any
+`measure` callable such as a local tokenizer's count. The same measure
+drives the value dictionary's cost model, so a token budget also picks
+dictionary entries by tokens. The fitting row count is found by galloping
+outward from the previous chunk's count and then bisecting, so a chunk
+costs a few encodes when its neighbours are alike (about 2 log k for the
+first chunk of k rows). A row that does not fit even alone becomes a
+chunk of its own, marked over budget.
+
+Usage:
+    from stele.chunking import pack
+
+    chunks = pack(doc, budget=8000)                       # bytes
+    chunks = pack(doc, budget=2000, measure=tokenizer.count)
+    for chunk in chunks:
+        chunk.text, chunk.cost, chunk.fill(2000), chunk.header_share
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from . import symbols as sym
+from .dictionary import CostModel, utf8_bytes
+from .encoder import encode, split_document
+
+
+@dataclass
+class Chunk:
+    """One standalone stele document holding rows start..stop-1 of the source."""
+
+    start: int
+    stop: int
+    text: str
+    cost: float             # size of text under the pack's measure
+    header_cost: float      # size of the dictionaries, schema and metadata
+    over: bool = False      # a single row that exceeds the budget on its own
+
+    @property
+    def rows(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def header_share(self) -> float:
+        return self.header_cost / self.cost if self.cost else 0.0
+
+    def fill(self, budget: float) -> float:
+        return self.cost / budget
+
+
+def header_text(text: str, rows: int, level: str) -> str:
+    """The part of an encoded chunk before its first row."""
+
+    if level == 'ascii':
+        # Escaped values never contain ';', so the last `rows` segments are the rows.
+        segments = text.split(sym.ASCII_ROW)
+        return sym.ASCII_ROW.join(segments[:len(segments) - rows])
+    first = text.find(sym.ROW)
+    return text if first < 0 else text[:first]
+
+
+def _document(root: str, meta: list, records: list[dict]) -> Any:
+    """A document with the given rows that splits back into the same root and metadata."""
+    if root == sym.LIST_ROOT:
+        return records
+    if not root:
+        return records[0]
+    return {**dict(meta), root: records}
+
+
+def pack(doc: Any, budget: float, level: str = 'full', multiline: bool = False,
+         measure: Optional[Callable[[str], float]] = None, arrays: str = 'flatten',
+         cost_model: Optional[CostModel] = None) -> list[Chunk]:
+    """
+    Split `doc` into standalone stele documents of at most `budget` each.
+
+    `measure` sizes a piece of text (default: UTF-8 bytes). `cost_model`
+    defaults to one that uses the same measure.
+    """
+
+    if budget <= 0:
+        raise ValueError("budget must be positive")
+    measure = measure or utf8_bytes
+    if cost_model is None:
+        cost_model = CostModel(text_cost=measure, line_separator='\n' if multiline else sym.SPACE)
+    root, meta, records = split_document(doc)
+
+    def render(start: int, stop: int) -> tuple[str, float]:
+        text = encode(_document(root, meta, records[start:stop]), level, multiline, cost_model, arrays)
+        return text, measure(text)
+
+    chunks = []
+    start, guess = 0, 1
+    while start < len(records):
+        remaining = len(records) - start
+        tried = {}
+
+        def fits(n: int) -> bool:
+            if n not in tried:
+                tried[n] = render(start, start + n)
+            return tried[n][1] <= budget
+
+        # Gallop outward from the last chunk's row count to bracket the
+        # largest fit; neighbouring chunks usually differ by a few rows...
+        n, step = min(guess, remaining), 1
+        if fits(n):
+            low, high = n, None
+            while low < remaining:
+                n = min(low + step, remaining)
+                if not fits(n):
+                    high = n
+                    break
+                low, step = n, step * 2
+            high = high or low + 1
+        else:
+            low, high = 0, n
+            while high - step > 0:
+                n = high - step
+                if fits(n):
+                    low = n
+                    break
+                high, step = n, step * 2
+        # ...then bisect: `low` rows fit and `high` rows don't.
+        while high - low > 1:
+            middle = (low + high) // 2
+            if fits(middle):
+                low = middle
+            else:
+                high = middle
+
+        over = low == 0
+        if over:
+            low = 1
+            fits(1)
+        text, cost = tried[low]
+        chunks.append(Chunk(start, start + low, text, cost,
+                            measure(header_text(text, low, level)), over))
+        start += low
+        guess = low
+    return chunks
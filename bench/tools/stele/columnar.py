@@ -0,0 +1,497 @@
+"""
+Array-backed columnar decode target for stele documents.
+
+A list of dicts repeats every key and boxes every value, even though the
+stele schema already names each column once and the value dictionary
+already numbers the repeated strings. ColumnarTable keeps one compact
+column per schema column:
+
+- ⁱ, ᶠ and ᵇ columns are typed arrays ('q', 'd' and 'B' typecodes)
+- ˢ columns hold integer codes into a string table shared by the whole
+  document. The table opens with the value dictionary in header order,
+  so a token such as 𓀁 becomes a code without being expanded
+- an ˢ column whose distinct values pass LOW_CARDINALITY and half its
+  rows spills to UTF-8 bytes plus an offsets array
+- inline primitive arrays keep an offsets array over one element column
+- ∅ is a bit in a per-column null bitmap, allocated at the first null
+
+Every column reads back as plain Python values, as typed rows or as the
+flat path -> value view of SteleReader.flat_rows(), and
+ColumnarTable.from_flat_rows() builds a table from that view. When NumPy is
+installed, numpy() returns zero-copy views of the value or code
+buffers, for vectorized scans.
+
+Usage:
+    table = ColumnarTable.load('variant-a.stele-full')
+    role = table.column('role')
+    role.codes, role.table.strings        # array('H', [1, 0, ...]), ['user', 'admin', ...]
+    for flat in table.flat_rows():
+        ...
+    table.nbytes()                        # bytes held by the column buffers
+"""
+
+import io
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from . import symbols as sym
+from .decoder import Header, RecordBuilder, SteleReader, column_decoder
+from .encoder import Column, encode
+from .stream import encode_stream
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LOW_CARDINALITY = 1024
+SPILL_CHECK_ROWS = 4096
+
+_NUMBER_TYPECODES = {'i': 'q', 'f': 'd', 'b': 'B'}
+
+
+class NullBitmap:
+    """One bit per row, set where the row holds ∅. Allocated at the first null."""
+
+    def __init__(self):
+        self.bits: Optional[bytearray] = None
+        self.count = 0
+
+    def mark(self, row: int) -> None:
+        if self.bits is None:
+            self.bits = bytearray()
+        byte = row >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        self.bits[byte] |= 1 << (row & 7)
+        self.count += 1
+
+    def __getitem__(self, row: int) -> bool:
+        bits = self.bits
+        return bits is not None and (row >> 3) < len(bits) and bool(bits[row >> 3] >> (row & 7) & 1)
+
+    def nbytes(self) -> int:
+        return len(self.bits) if self.bits is not None else 0
+
+
+class StringTable:
+    """Strings by code; the first code given to a string wins."""
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self.strings: list[str] = []
+        self.codes: dict[str, int] = {}
+        for string in strings:
+            self.intern(string)
+
+    def intern(self, string: str) -> int:
+        code = self.codes.get(string)
+        if code is None:
+            code = self.codes[string] = len(self.strings)
+            self.strings.append(string)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def nbytes(self) -> int:
+        return sum(len(string.encode('utf-8')) for string in self.strings)
+
+
+class _Column:
+    """Shared null handling; subclasses store the non-null values."""
+
+    storage = ''
+
+    def __init__(self):
+        self.nulls = NullBitmap()
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def is_null(self, row: int) -> bool:
+        return self.nulls[row]
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.nulls.mark(self.length)
+            self._append_null()
+        else:
+            self._append(value)
+        self.length += 1
+
+    def __getitem__(self, row: int) -> Any:
+        if row < 0:
+            row += self.length
+        if not 0 <= row < self.length:
+            raise IndexError(f"row {row} out of range ({self.length} rows)")
+        return None if self.nulls[row] else self._get(row)
+
+    def __iter__(self) -> Iterator:
+        for row in range(self.length):
+            yield None if self.nulls[row] else self._get(row)
+
+    def spill(self) -> '_Column':
+        """This column, or a cheaper representation of it."""
+        return self
+
+    def nbytes(self) -> int:
+        return self.nulls.nbytes()
+
+    def _append(self, value: Any) -> None:
+        raise NotImplementedError
+
+    def _append_null(self) -> None:
+        raise NotImplementedError
+
+    def _get(self, row: int) -> Any:
+        raise NotImplementedError
+
+
+def _buffer_bytes(values) -> int:
+    if isinstance(values, array):
+        return len(values) * values.itemsize
+    return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+
+def _push_offset(offsets: array, offset: int) -> array:
+    """Append an end offset, widening 32-bit offsets to 64 bits when needed."""
+    if offset > 0xFFFFFFFF and offsets.typecode == 'I':
+        offsets = array('Q', offsets)
+    offsets.append(offset)
+    return offsets
+
+
+def _numpy(values):
+    if np is None:
+        raise RuntimeError("NumPy is not installed")
+    if not isinstance(values, array):
+        return np.asarray(values, dtype=object)
+    return np.frombuffer(values, dtype=values.typecode)
+
+
+class NumberColumn(_Column):
+    """ⁱ, ᶠ or ᵇ values in a typed array; ints past 64 bits fall back to a list."""
+
+    def __init__(self, type_: str):
+        super().__init__()
+        self.type = type_
+        self.values = array(_NUMBER_TYPECODES[type_])
+
+    @property
+    def storage(self) -> str:
+        return f"array('{self.values.typecode}')" if isinstance(self.values, array) else 'list'
+
+    def _append(self, value) -> None:
+        try:
+            self.values.append(value)
+        except OverflowError:
+            self.values = list(self.values)
+            self.values.append(value)
+
+    def _append_null(self) -> None:
+        self.values.append(0)
+
+    def _get(self, row: int):
+        value = self.values[row]
+        return bool(value) if self.type == 'b' else value
+
+    def numpy(self):
+        """The values as a NumPy array sharing this column's buffer (nulls read as 0)."""
+        return _numpy(self.values)
+
+    def nbytes(self) -> int:
+        return super().nbytes() + _buffer_bytes(self.values)
+
+
+class CodeColumn(_Column):
+    """ˢ values as codes into a shared StringTable; 16-bit codes until a code needs more."""
+
+    def __init__(self, table: StringTable):
+        super().__init__()
+        self.type = 's'
+        self.table = table
+        self.codes = array('H')
+        self._distinct: Optional[set] = set()
+
+    @property
+    def storage(self) -> str:
+        return f"codes array('{self.codes.typecode}')"
+
+    def append_code(self, code: int) -> None:
+        """Append a value by its code, e.g. straight from a value token."""
+        self._push(code)
+        self.length += 1
+
+    def _push(self, code: int) -> None:
+        if code > 0xFFFF and self.codes.typecode == 'H':
+            self.codes = array('I', self.codes)
+        self.codes.append(code)
+        if self._distinct is not None:
+            self._distinct.add(code)
+
+    def _append(self, value: str) -> None:
+        self._push(self.table.intern(value))
+
+    def _append_null(self) -> None:
+        self.codes.append(0)
+
+    def _get(self, row: int) -> str:
+        return self.table.strings[self.codes[row]]
+
+    def code(self, row: int) -> Optional[int]:
+        return None if self.nulls[row] else self.codes[row]
+
+    def spill(self) -> _Column:
+        """A TextColumn copy once the column turns out to be high-cardinality, else self."""
+        if self._distinct is None or len(self._distinct) <= max(LOW_CARDINALITY, self.length // 2):
+            return self
+        text = TextColumn()
+        for value in self:
+            text.append(value)
+        return text
+
+    def freeze(self) -> None:
+        """Stop tracking distinct codes; the column stays coded from here on."""
+        self._distinct = None
+
+    def numpy(self):
+        """The codes as a NumPy array sharing this column's buffer (nulls read as 0)."""
+        return _numpy(self.codes)
+
+    def nbytes(self) -> int:
+        return super().nbytes() + _buffer_bytes(self.codes)
+
+
+class TextColumn(_Column):
+    """High-cardinality ˢ values as one UTF-8 buffer with 32-bit (later 64-bit) end offsets."""
+
+    storage = 'utf-8 bytes + offsets'
+
+    def __init__(self):
+        super().__init__()
+        self.type = 's'
+        self.data = bytearray()
+        self.offsets = array('I', [0])
+
+    def _append(self, value: str) -> None:
+        self.data += value.encode('utf-8')
+        self.offsets = _push_offset(self.offsets, len(self.data))
+
+    def _append_null(self) -> None:
+        self.offsets = _push_offset(self.offsets, len(self.data))
+
+    def _get(self, row: int) -> str:
+        return self.data[self.offsets[row]:self.offsets[row + 1]].decode('utf-8')
+
+    def nbytes(self) -> int:
+        return super().nbytes() + len(self.data) + _buffer_bytes(self.offsets)
+
+
+class ListColumn(_Column):
+    """Inline primitive arrays: end offsets into one column of elements."""
+
+    def __init__(self, element: _Column):
+        super().__init__()
+        self.type = element.type
+        self.element = element
+        self.offsets = array('I', [0])
+
+    @property
+    def storage(self) -> str:
+        return f"offsets + {self.element.storage}"
+
+    def _append(self, items: list) -> None:
+        for item in items:
+            self.element.append(item)
+        self.offsets = _push_offset(self.offsets, len(self.element))
+
+    def _append_null(self) -> None:
+        self.offsets = _push_offset(self.offsets, len(self.element))
+
+    def _get(self, row: int) -> list:
+        return [self.element[i] for i in range(self.offsets[row], self.offsets[row + 1])]
+
+    def spill(self) -> _Column:
+        self.element = self.element.spill()
+        return self
+
+    def nbytes(self) -> int:
+        return super().nbytes() + _buffer_bytes(self.offsets) + self.element.nbytes()
+
+
+def new_column(column: Column, table: StringTable) -> Optional[_Column]:
+    """An empty storage column for a schema column (None for object-array markers)."""
+
+    if column.kind == 'marker':
+        return None
+    element = CodeColumn(table) if column.type == 's' else NumberColumn(column.type)
+    return ListColumn(element) if column.kind == 'array' else element
+
+
+def _spill(columns: list) -> list:
+    return [column.spill() if column is not None else None for column in columns]
+
+
+def _finish(columns: list) -> list:
+    columns = _spill(columns)
+    for column in columns:
+        for part in (column, getattr(column, 'element', None)):
+            if isinstance(part, CodeColumn):
+                part.freeze()
+    return columns
+
+
+class ColumnarTable:
+    """A decoded stele document held as typed, dictionary-coded columns."""
+
+    def __init__(self, header: Header, columns: list, strings: StringTable, length: int,
+                 lengths: Optional[dict] = None):
+        self.header = header
+        self.columns = columns          # aligned with header.columns; None for markers
+        self.strings = strings
+        self.length = length
+        self.lengths = lengths or {}    # marker column -> {row: stated element count}
+        self.paths = {c.path: i for i, c in enumerate(header.columns)}
+        self._flat_keys = [(i, sym.PATH.join(str(s) for s in c.path))
+                           for i, c in enumerate(header.columns) if c.kind != 'marker']
+
+    @classmethod
+    def from_reader(cls, reader: SteleReader) -> 'ColumnarTable':
+        """Read the remaining rows of a reader; value tokens become codes unexpanded."""
+
+        header = reader.header
+        if header.tables:
+            raise ValueError("documents with sub-tables have no flat columns; encode with arrays='flatten'")
+        strings = StringTable(header.value_tokens.values())
+        token_codes = {token: strings.codes[value] for token, value in header.value_tokens.items()}
+        columns = [new_column(column, strings) for column in header.columns]
+        decoders = [column_decoder(header, column) for column in header.columns]
+        lengths = {i: {} for i, column in enumerate(header.columns) if column.kind == 'marker'}
+        length = 0
+
+        def appender(i: int):
+            storage, decode = columns[i], decoders[i]
+            if storage is None:
+                # Marker cells are ∅ but for the rare stated element count.
+                counts = lengths[i]
+
+                def count(raw):
+                    value = decode(raw)
+                    if value is not None:
+                        counts[length] = value
+                return count
+            if isinstance(storage, CodeColumn) and token_codes:
+                def append(raw):
+                    code = token_codes.get(raw)
+                    if code is None:
+                        storage.append(decode(raw))
+                    else:
+                        storage.append_code(code)
+                return append
+            return lambda raw: storage.append(decode(raw))
+
+        appenders = [appender(i) for i in range(len(columns))]
+        for fields in reader.fields():
+            for append, raw in zip(appenders, fields):
+                append(raw)
+            length += 1
+            if length % SPILL_CHECK_ROWS == 0:
+                spilled = _spill(columns)
+                for i, (old, new) in enumerate(zip(columns, spilled)):
+                    if new is not old:
+                        columns[i] = new
+                        appenders[i] = appender(i)
+        return cls(header, _finish(columns), strings, length,
+                   {i: counts for i, counts in lengths.items() if counts})
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ColumnarTable':
+        return cls.from_reader(SteleReader(io.StringIO(text)))
+
+    @classmethod
+    def from_document(cls, doc: Any) -> 'ColumnarTable':
+        """Encode a parsed JSON document at the full level and read it back as columns."""
+        return cls.from_text(encode(doc, 'full'))
+
+    @classmethod
+    def load(cls, path) -> 'ColumnarTable':
+        """
+        Read a stele file, or a .json file encoded in memory first. A
+        .ndjson/.jsonl file goes through the streaming encoder, so its
+        records are never all parsed at once.
+        """
+        path = Path(path)
+        if path.suffix == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_document(json.load(f))
+        if path.suffix in ('.ndjson', '.jsonl'):
+            text = io.StringIO()
+            encode_stream(path, text)
+            return cls.from_text(text.getvalue())
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return cls.from_reader(SteleReader(f))
+
+    @classmethod
+    def from_flat_rows(cls, columns: list[Column], rows: Iterable[dict], root: str = '',
+                       meta: Optional[dict] = None) -> 'ColumnarTable':
+        """Build a table from path -> value rows keyed as in SteleReader.flat_rows()."""
+
+        header = Header('unicode', root, meta or {}, list(columns))
+        strings = StringTable()
+        storage = [new_column(column, strings) for column in header.columns]
+        keys = [(i, sym.PATH.join(str(s) for s in column.path))
+                for i, column in enumerate(header.columns) if storage[i] is not None]
+        length = 0
+        for row in rows:
+            for i, key in keys:
+                storage[i].append(row.get(key))
+            length += 1
+            if length % SPILL_CHECK_ROWS == 0:
+                storage = _spill(storage)
+        return cls(header, _finish(storage), strings, length)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def column(self, path):
+        """The storage column for a path, given as a tuple or a ჻- or dot-joined string."""
+        if isinstance(path, str):
+            sep = sym.PATH if sym.PATH in path else '.'
+            path = tuple(int(s) if s.isdigit() else s for s in path.split(sep))
+        index = self.paths.get(path)
+        if index is None or self.columns[index] is None:
+            raise KeyError(f"no value column {path!r}")
+        return self.columns[index]
+
+    def row(self, n: int) -> list:
+        """Row n as typed values in schema order, as SteleReader.rows() gives it."""
+        row = [None if column is None else column[n] for column in self.columns]
+        for i, counts in self.lengths.items():
+            row[i] = counts.get(n)
+        return row
+
+    def rows(self) -> Iterator[list]:
+        for n in range(self.length):
+            yield self.row(n)
+
+    def flat_row(self, n: int) -> dict:
+        return {key: self.columns[i][n] for i, key in self._flat_keys}
+
+    def flat_rows(self) -> Iterator[dict]:
+        """Each row as a path -> value mapping, as SteleReader.flat_rows() gives it."""
+        for n in range(self.length):
+            yield self.flat_row(n)
+
+    def records(self) -> Iterator[dict]:
+        """Each row rebuilt as a nested dict."""
+        builder = RecordBuilder(self.header.columns)
+        for row in self.rows():
+            yield builder.build(row)
+
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers, null bitmaps and string table."""
+        return self.strings.nbytes() + sum(c.nbytes() for c in self.columns if c is not None)
@@ -0,0 +1,682 @@
+"""
+Streaming stele decoder.
+
+Reads the `@` dictionary lines and the schema line once, then yields rows
+lazily as the input is split on ◉ and ┃ (or ; and , for the ascii level).
+Input is consumed in fixed-size chunks, so memory stays bounded by one row
+plus the dictionaries even for a multi-hundred-MB document minified onto a
+single line.
+
+Usage:
+    from stele.decoder import SteleReader, load
+
+    with open('variant-a.stele-full', encoding='utf-8') as f:
+        reader = SteleReader(f)
+        for record in reader.records():      # nested dicts
+            ...
+
+    doc = load('variant-a.stele-full')       # whole document
+
+Documents encoded with sub-tables (encoder arrays='tables' or 'auto')
+declare each sub-table in the header and carry its rows ahead of the
+top-level rows. Those rows are decoded with the header and held in
+memory, grouped by parent row; the top-level rows still stream.
+"""
+
+import io
+import re
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, Iterable, Iterator, TextIO
+
+from . import symbols as sym
+from .encoder import ABSENT, Column
+
+CHUNK_SIZE = 1 << 16
+
+_ASCII_TOKEN = re.compile(r'V\d+=')
+_STOP_CHARS = frozenset((sym.ASCII_ROW, sym.FIELD, sym.ROW, sym.SPACE, '\n'))
+_LINE_BOUNDARY = re.compile('[\n' + sym.SPACE + ']' + sym.SCHEMA)
+_SEPARATOR_END = re.compile('[\n' + sym.SPACE + r']\Z')
+_EXTENSION = re.compile('[\n' + sym.SPACE + ']' + sym.SCHEMA + '(?=[' + chr(sym.HIEROGLYPHS[0])
+                        + '-' + chr(sum(sym.HIEROGLYPHS) - 1) + ']=)')
+_TABLE = re.compile('(.+)' + sym.ARRAY[0] + r'(\d+)' + sym.ARRAY[1])
+
+
+@dataclass
+class TableHeader:
+    """A sub-table declaration: one row per element of an object array."""
+
+    path: tuple                          # array path from the record root
+    count: int                           # rows the table holds
+    columns: list[Column]                # element schema, after the parent row column
+
+
+@dataclass
+class Header:
+    """Everything declared before the first row."""
+
+    layout: str                          # 'unicode' (light/full) or 'ascii'
+    root: str
+    meta: dict
+    columns: list[Column]
+    field_tokens: dict = field(default_factory=dict)
+    value_tokens: dict = field(default_factory=dict)
+    tables: list[TableHeader] = field(default_factory=list)
+
+    @property
+    def level(self) -> str:
+        """Best guess at the encoding level that produced this header."""
+        if self.layout == 'ascii':
+            return 'ascii'
+        return 'full' if self.value_tokens else 'light'
+
+
+def _read_chunks(stream: TextIO, chunk_size: int) -> Iterator[str]:
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _pieces(chunks: Iterable[str], sep: str) -> Iterator[str]:
+    """Split a chunked text stream on a separator without joining it whole."""
+    pending: list[str] = []
+    for chunk in chunks:
+        parts = chunk.split(sep)
+        if len(parts) == 1:
+            pending.append(chunk)
+            continue
+        pending.append(parts[0])
+        yield ''.join(pending)
+        yield from parts[1:-1]
+        pending = [parts[-1]]
+    yield ''.join(pending)
+
+
+def _with_last(pieces: Iterator[str]) -> Iterator[tuple[str, bool]]:
+    previous = next(pieces, None)
+    for piece in pieces:
+        yield previous, False
+        previous = piece
+    if previous is not None:
+        yield previous, True
+
+
+def _detect_layout(chunks: Iterator[str]) -> tuple[str, Iterator[str]]:
+    """Peek far enough to tell the ascii layout from the light/full one."""
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        for char in chunk:
+            if char in _STOP_CHARS:
+                layout = 'ascii' if char == sym.ASCII_ROW else 'unicode'
+                return layout, chain(seen, chunks)
+    return 'unicode', iter(seen)
+
+
+def _strip_newline(text: str) -> str:
+    return text[:-1] if text.endswith('\n') else text
+
+
+def _resolve_paths(raw: list[tuple[list[str], str, str]]) -> list[Column]:
+    """Turn raw path segments into typed paths, using markers to spot indices."""
+    markers = {tuple(segments) for segments, kind, _ in raw if kind == 'marker'}
+    columns = []
+    for segments, kind, type_ in raw:
+        path = []
+        for k, segment in enumerate(segments):
+            if segment.isdigit() and tuple(segments[:k]) in markers:
+                path.append(int(segment))
+            else:
+                path.append(segment)
+        columns.append(Column(tuple(path), kind, type_))
+    return columns
+
+
+def _parse_column(spec: str) -> tuple[list[str], str, str]:
+    if spec.endswith(sym.ARRAY):
+        spec = spec[:-len(sym.ARRAY)]
+        type_ = sym.MARKER_TYPES.get(spec[-1:]) if spec else None
+        if type_ is None:
+            return spec.split(sym.PATH), 'marker', 's'
+        return spec[:-1].split(sym.PATH), 'array', type_
+    type_ = sym.MARKER_TYPES.get(spec[-1:])
+    if type_ is None:
+        raise ValueError(f"schema field {spec!r} has no type marker")
+    return spec[:-1].split(sym.PATH), 'value', type_
+
+
+def _split_entries(text: str) -> list[tuple[str, str]]:
+    entries = []
+    for entry in text.split(','):
+        key, sep, value = entry.partition('=')
+        if not sep:
+            raise ValueError(f"malformed dictionary entry {entry!r}")
+        entries.append((key, value))
+    return entries
+
+
+def _meta_value(key: str, raw: str, ascii_layout: bool) -> tuple[str, Any]:
+    type_ = 's'
+    if ascii_layout and len(key) > 2 and key[-2] == ':' and key[-1] in 'ifb':
+        key, type_ = key[:-2], key[-1]
+    elif not ascii_layout and key[-1:] in sym.MARKER_TYPES:
+        key, type_ = key[:-1], sym.MARKER_TYPES[key[-1]]
+    if raw == sym.NULL:
+        return key, None
+    if sym.is_escaped(raw):
+        return key, sym.unescape(raw)
+    if type_ == 's' and not ascii_layout:
+        raw = raw.replace(sym.SPACE, ' ')
+    return key, _convert(raw, type_)
+
+
+def _split_root(text: str, ascii_layout: bool) -> tuple[str, dict]:
+    """Parse `root[k=v,...]` into the root key and its metadata."""
+    if '[' not in text:
+        return text, {}
+    if not text.endswith(']'):
+        raise ValueError(f"unterminated header metadata in {text!r}")
+    root, _, body = text[:-1].partition('[')
+    meta = dict(_meta_value(k, v, ascii_layout) for k, v in _split_entries(body)) if body else {}
+    return root, meta
+
+
+def _convert(raw: str, type_: str) -> Any:
+    if type_ == 'i':
+        return int(raw)
+    if type_ == 'f':
+        return float(raw)
+    if type_ == 'b':
+        if raw not in ('true', 'false'):
+            raise ValueError(f"invalid boolean {raw!r}")
+        return raw == 'true'
+    return raw
+
+
+def parse_header(text: str) -> Header:
+    """Parse the light/full header: everything before the first ◉."""
+
+    text = _SEPARATOR_END.sub('', text, count=1)
+    if not text.startswith(sym.SCHEMA):
+        raise ValueError("stele header must start with @")
+
+    # Dictionary lines come first and are recognised by a leading `token=`;
+    # whatever follows the last of them is the schema line.
+    rest = text[1:]
+    field_tokens: dict = {}
+    value_tokens: dict = {}
+    while len(rest) > 1 and rest[1] == '=':
+        boundary = _LINE_BOUNDARY.search(rest)
+        if boundary is None:
+            break
+        line, rest = rest[:boundary.start()], rest[boundary.end():]
+        if sym.in_block(line[0], sym.RUNIC):
+            field_tokens.update(_split_entries(line))
+        elif sym.in_block(line[0], sym.HIEROGLYPHS):
+            value_tokens.update(_value_entries(line))
+        else:
+            raise ValueError(f"unrecognised header line starting {line[:8]!r}")
+
+    # Sub-table declarations, `@path⟦rows⟧┃columns`, sit between the
+    # dictionaries and the schema line, whose root cannot contain ⟦.
+    tables = []
+    while True:
+        boundary = _LINE_BOUNDARY.search(rest)
+        table = _parse_table(rest[:boundary.start()], field_tokens) if boundary else None
+        if table is None:
+            break
+        tables.append(table)
+        rest = rest[boundary.end():]
+    schema, extension = split_extension(rest)
+    value_tokens.update(extension_tokens(extension))
+
+    head, _, body = schema.partition(sym.FIELD)
+    root, meta = _split_root(head, ascii_layout=False)
+    columns = _parse_columns(body, field_tokens) if body or schema.endswith(sym.FIELD) else []
+    return Header('unicode', root, meta, columns, field_tokens, value_tokens, tables)
+
+
+def _value_entries(line: str) -> dict:
+    return {token: sym.unescape(value) if sym.is_escaped(value) else value.replace(sym.SPACE, ' ')
+            for token, value in _split_entries(line)}
+
+
+def split_extension(line: str) -> tuple[str, str]:
+    """
+    Split a row (or the schema line) from the dictionary-extension lines
+    an appender wrote after it (see stele/append.py). Values never contain
+    a line boundary followed by @, so the first one found starts them.
+    """
+
+    if sym.SPACE + sym.SCHEMA not in line and '\n' + sym.SCHEMA not in line:
+        return line, ''
+    match = _EXTENSION.search(line)
+    if match is None:
+        return line, ''
+    return line[:match.start()], line[match.end():]
+
+
+def extension_tokens(text: str) -> dict:
+    """Value tokens declared by dictionary-extension lines (split_extension's second half)."""
+    tokens = {}
+    if text:
+        for line in _LINE_BOUNDARY.split(text):
+            tokens.update(_value_entries(line))
+    return tokens
+
+
+def _expand(spec: str, field_tokens: dict) -> str:
+    return ''.join(field_tokens.get(char, char) for char in spec) if field_tokens else spec
+
+
+def _parse_columns(body: str, field_tokens: dict) -> list[Column]:
+    return _resolve_paths([_parse_column(_expand(spec, field_tokens)) for spec in body.split(sym.FIELD)])
+
+
+def _parse_table(line: str, field_tokens: dict) -> TableHeader | None:
+    """A sub-table declaration line, or None if `line` is not one."""
+    head, sep, body = line.partition(sym.FIELD)
+    match = _TABLE.fullmatch(_expand(head, field_tokens))
+    if match is None or '[' in match.group(1):
+        return None
+    columns = _parse_columns(body, field_tokens) if sep else []
+    return TableHeader(tuple(match.group(1).split(sym.PATH)), int(match.group(2)), columns)
+
+
+def _parse_ascii_columns(text: str) -> list[Column]:
+    raw = []
+    for spec in text.split(sym.ASCII_FIELD) if text else []:
+        if spec.endswith(sym.ARRAY):
+            raw.append((spec[:-len(sym.ARRAY)].split(sym.PATH), 'marker', 's'))
+            continue
+        path, sep, type_ = spec.rpartition(':')
+        if not sep:
+            raise ValueError(f"schema field {spec!r} has no type")
+        if type_.startswith('a'):
+            raw.append((path.split(sym.PATH), 'array', type_[1:] or 's'))
+        elif type_ in ('s', 'i', 'f', 'b'):
+            raw.append((path.split(sym.PATH), 'value', type_))
+        else:
+            raise ValueError(f"unknown ascii type {type_!r} in {spec!r}")
+    return _resolve_paths(raw)
+
+
+def _is_ascii_root(segment: str) -> bool:
+    if not segment.startswith(sym.SCHEMA):
+        return False
+    outside = segment.split('[', 1)[0]
+    return ':' not in outside and sym.ASCII_FIELD not in outside
+
+
+def section_sizes(text: str) -> dict[str, int]:
+    """
+    UTF-8 bytes spent on each part of an encoded document.
+
+    Returns the field dictionary, value dictionary, schema line (root,
+    metadata and columns) and row payload, separators included with the
+    part they end. Works on the light/full and ascii layouts.
+    """
+
+    def size(part: str) -> int:
+        return len(part.encode('utf-8'))
+
+    sections = {'fields': 0, 'values': 0, 'schema': 0, 'rows': 0}
+    layout, _ = _detect_layout(iter([text]))
+
+    if layout == 'ascii':
+        segments = text.split(sym.ASCII_ROW)
+        k = 0
+        if len(segments) > 1 and _is_ascii_root(segments[0]):
+            sections['schema'] += size(segments[0]) + 1
+            k = 1
+        sections['schema'] += size(segments[k]) + (1 if k + 1 < len(segments) else 0)
+        k += 1
+        if k < len(segments) and _ASCII_TOKEN.match(segments[k]):
+            sections['values'] = size(segments[k]) + (1 if k + 1 < len(segments) else 0)
+            k += 1
+        sections['rows'] = size(sym.ASCII_ROW.join(segments[k:]))
+        return sections
+
+    start = text.find(sym.ROW)
+    head, rows = (text, '') if start < 0 else (text[:start], text[start:])
+    sections['rows'] = size(rows)
+    rest = head[1:] if head.startswith(sym.SCHEMA) else head
+    spent = size(head) - size(rest)
+    while len(rest) > 1 and rest[1] == '=':
+        boundary = _LINE_BOUNDARY.search(rest)
+        if boundary is None:
+            break
+        line, rest = rest[:boundary.end()], rest[boundary.end():]
+        key = 'fields' if sym.in_block(line[0], sym.RUNIC) else 'values'
+        sections[key] += size(line) + spent
+        spent = 0
+    sections['schema'] = size(rest) + spent
+    return sections
+
+
+def table_decoder(header: Header, column: Column):
+    """
+    column_decoder for a sub-table cell, where an empty field is a key the
+    element lacks (ABSENT) and a lone ◈ is an empty array.
+    """
+
+    decode = column_decoder(header, column)
+    empty_array = column.kind == 'array'
+
+    def cell(raw):
+        if not raw:
+            return ABSENT
+        if empty_array and raw == sym.ELEMENT:
+            return []
+        return decode(raw)
+    return cell
+
+
+def column_decoder(header: Header, column: Column):
+    """A function turning one raw field of `column` into its typed value."""
+
+    ascii_layout = header.layout == 'ascii'
+    tokens = header.value_tokens
+    type_ = column.type
+    null = '' if ascii_layout else sym.NULL
+    element_sep = sym.ASCII_ELEMENT if ascii_layout else sym.ELEMENT
+
+    def scalar(raw):
+        if raw == null:
+            return None
+        if sym.is_escaped(raw):
+            return sym.unescape(raw)
+        if not ascii_layout and type_ == 's':
+            raw = raw.replace(sym.SPACE, ' ')
+        return _convert(raw, type_)
+
+    if column.kind == 'marker':
+        # ∅ (empty in the ascii layout), or the element count when the
+        # array ends in all-null elements (encoder.stated_lengths).
+        return lambda raw: None if raw == null or not raw else int(raw)
+
+    if column.kind == 'array':
+        def array(raw):
+            if raw == null:
+                return None
+            if not raw or (ascii_layout and raw == sym.ASCII_ELEMENT):
+                return []
+            return [scalar(item) for item in raw.split(element_sep)]
+        return array
+
+    # Light/full string and boolean columns look tokens up even when the
+    # header has none: an appended dictionary-extension line may add some.
+    if tokens or (not ascii_layout and type_ in ('s', 'b')):
+        def tokenized(raw):
+            value = tokens.get(raw)
+            if value is None:
+                return scalar(raw)
+            return _convert(value, type_)
+        return tokenized
+    return scalar
+
+
+class SteleReader:
+    """
+    Lazily decode one stele document from a text stream.
+
+    The header is parsed on construction; rows(), flat_rows() and records()
+    each consume the remaining stream once. Sub-table rows are read with
+    the header: rows() and flat_rows() cover the top-level table only, and
+    records() attaches each row's elements.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE):
+        layout, chunks = _detect_layout(_read_chunks(stream, chunk_size))
+        if layout == 'ascii':
+            self._pieces = _with_last(_pieces(chunks, sym.ASCII_ROW))
+            self.header = self._read_ascii_header()
+        else:
+            self._pieces = _with_last(_pieces(chunks, sym.ROW))
+            piece, last = next(self._pieces, ('', True))
+            self.header = parse_header(_strip_newline(piece) if last else piece)
+        self._decoders = [column_decoder(self.header, column) for column in self.header.columns]
+        self.tables = self._read_tables()
+
+    def _read_ascii_header(self) -> Header:
+        self._first_row = None
+        piece, last = next(self._pieces, ('', True))
+        root, meta = '', {}
+        if _is_ascii_root(piece) and not last:
+            root, meta = _split_root(piece[1:], ascii_layout=True)
+            piece, last = next(self._pieces)
+        columns = _parse_ascii_columns(_strip_newline(piece) if last else piece)
+
+        value_tokens = {}
+        if not last:
+            piece, last = next(self._pieces)
+            text = _strip_newline(piece) if last else piece
+            if _ASCII_TOKEN.match(text):
+                for token, value in _split_entries(text):
+                    value_tokens[token] = sym.unescape(value) if sym.is_escaped(value) else value
+            else:
+                self._first_row = (piece, last)
+        return Header('ascii', root, meta, columns, {}, value_tokens)
+
+    def _raw_rows(self) -> Iterator[str]:
+        if self.header.layout == 'ascii':
+            if self._first_row is not None:
+                piece, last = self._first_row
+                self._first_row = None
+                yield _strip_newline(piece) if last else piece
+            for piece, last in self._pieces:
+                yield _strip_newline(piece) if last else piece
+        else:
+            tokens = self.header.value_tokens
+            for piece, last in self._pieces:
+                if last:
+                    row = _strip_newline(piece)
+                elif piece[-1:] in (sym.SPACE, '\n'):
+                    row = piece[:-1]
+                else:
+                    raise ValueError("row is not followed by a ▓ or newline separator")
+                row, extension = split_extension(row)
+                if extension:
+                    # The decoders share this dict, so later rows see the new tokens.
+                    tokens.update(extension_tokens(extension))
+                yield row
+
+    def _read_tables(self) -> list[dict]:
+        """Decode every sub-table's rows, per table as parent row -> [(row number, values)]."""
+
+        raw_rows = self._raw_rows()
+        tables = []
+        for table in self.header.tables:
+            name = sym.PATH.join(table.path)
+            decoders = [table_decoder(self.header, column) for column in table.columns]
+            groups: dict = {}
+            for number in range(table.count):
+                raw = next(raw_rows, None)
+                if raw is None:
+                    raise ValueError(f"sub-table {name} declares {table.count} rows, found {number}")
+                values = raw.split(sym.FIELD)
+                if len(values) != len(decoders) + 1 or not values[0].isdigit():
+                    raise ValueError(f"sub-table {name} row {number + 1} does not match its declaration")
+                try:
+                    row = [decode(value) for decode, value in zip(decoders, values[1:])]
+                except ValueError as e:
+                    raise ValueError(f"sub-table {name} row {number + 1}: {e}") from None
+                groups.setdefault(int(values[0]), []).append((number, row))
+            tables.append(groups)
+        return tables
+
+    def fields(self) -> Iterator[list[str]]:
+        """Yield each row as its still-encoded fields (value tokens unexpanded)."""
+        sep = sym.ASCII_FIELD if self.header.layout == 'ascii' else sym.FIELD
+        width = len(self._decoders)
+        for number, raw in enumerate(self._raw_rows(), 1):
+            values = raw.split(sep) if width else ([] if raw == '' else [raw])
+            if len(values) != width:
+                raise ValueError(f"row {number} has {len(values)} fields, schema declares {width}")
+            yield values
+
+    def rows(self) -> Iterator[list]:
+        """Yield each row as a list of typed values in schema order."""
+        decoders = self._decoders
+        for number, values in enumerate(self.fields(), 1):
+            try:
+                yield [decode(value) for decode, value in zip(decoders, values)]
+            except ValueError as e:
+                raise ValueError(f"row {number}: {e}") from None
+
+    def flat_rows(self) -> Iterator[dict]:
+        """Yield each row as a path -> value mapping (array markers omitted)."""
+        keys = [(i, sym.PATH.join(str(s) for s in column.path))
+                for i, column in enumerate(self.header.columns) if column.kind != 'marker']
+        for row in self.rows():
+            yield {key: row[i] for i, key in keys}
+
+    def records(self) -> Iterator[dict]:
+        """Yield each row reconstructed as a nested dict."""
+        builder = RecordBuilder(self.header.columns)
+        builder.attach_tables(self.header.tables, self.tables)
+        for number, row in enumerate(self.rows()):
+            yield builder.build(row, number)
+
+    def document(self) -> Any:
+        """Materialize the whole document as the original JSON shape."""
+        records = list(self.records())
+        root = self.header.root
+        if root == sym.LIST_ROOT:
+            return records
+        if not root:
+            # The ascii level omits the root, so several rootless rows can
+            # only have come from a top-level array.
+            return records[0] if len(records) == 1 else records
+        doc = dict(self.header.meta)
+        doc[root] = records
+        return doc
+
+
+class RecordBuilder:
+    """Rebuild nested records from flat rows of one schema."""
+
+    def __init__(self, columns: list[Column]):
+        self.tables = []            # (relative path, builder, parent row -> elements)
+        self.values = []
+        self.markers = []
+        for i, column in enumerate(columns):
+            # Array indices along the path, as (array path, index).
+            elements = tuple((column.path[:k], s) for k, s in enumerate(column.path)
+                             if isinstance(s, int))
+            if column.kind == 'marker':
+                self.markers.append((i, column.path, elements))
+            else:
+                self.values.append((i, column.path, elements))
+        self.arrays = {path for _, path, _ in self.markers}
+        self.by_depth = sorted(self.values, key=lambda value: len(value[1]))
+
+    def attach_tables(self, headers: list[TableHeader], tables: list[dict]) -> None:
+        """
+        Fill sub-table arrays from decoded sub-tables (see SteleReader.tables).
+
+        Each table hangs off the nearest declared table whose path is a
+        prefix of its own, or off this builder's rows.
+        """
+
+        builders = []
+        for k, (header, groups) in enumerate(zip(headers, tables)):
+            owner, depth = self, 0
+            for j in range(k):
+                path = headers[j].path
+                if depth < len(path) < len(header.path) and header.path[:len(path)] == path:
+                    owner, depth = builders[j], len(path)
+            builder = RecordBuilder(header.columns)
+            owner.tables.append((header.path[depth:], builder, groups))
+            builders.append(builder)
+
+    def build(self, row: list, number: int | None = None) -> dict:
+        # An object array runs up to its last element with a non-null value
+        # beneath it, unless its marker cell states the element count.
+        lengths: dict = {}
+        for i, _, elements in self.values:
+            value = row[i]
+            if elements and value is not None and value is not ABSENT:
+                for array, index in elements:
+                    if lengths.get(array, 0) <= index:
+                        lengths[array] = index + 1
+        for i, path, _ in self.markers:
+            if isinstance(row[i], int):
+                lengths[path] = row[i]
+
+        root: dict = {}
+        for i, path, elements in self.markers:
+            if row[i] is not ABSENT and all(index < lengths.get(array, 0) for array, index in elements):
+                node = self._container(root, path, len(path)).setdefault(path[-1], {})
+                for index in range(lengths.get(path, 0)):
+                    node.setdefault(index, {})
+        for i, path, elements in self.values:
+            value = row[i]
+            if value is not None and value is not ABSENT \
+                    and all(index < lengths.get(array, 0) for array, index in elements):
+                self._container(root, path, len(path) - 1)[path[-1]] = value
+        # Nulls go last, shallowest first, so a null never replaces an
+        # element with values nor has nulls written beneath it. The encoder
+        # rejects a path that is null in one row and an object in another,
+        # but a hand-written document may still have both.
+        for i, path, elements in self.by_depth:
+            if row[i] is None and all(index < lengths.get(array, 0) for array, index in elements):
+                self._null(root, path)
+        record = self._finish(root, ())
+
+        # Sub-table elements exist when they have a row; their array is
+        # there when its marker column put it there.
+        for path, builder, groups in self.tables:
+            node = record
+            for key in path[:-1]:
+                node = node.get(key)
+                if not isinstance(node, dict):
+                    break
+            else:
+                if isinstance(node.get(path[-1]), list):
+                    node[path[-1]] = [builder.build(values, child)
+                                      for child, values in groups.get(number, ())]
+        return record
+
+    def _container(self, root: dict, path: tuple, depth: int) -> dict:
+        node = root
+        for k in range(depth - (1 if depth == len(path) else 0)):
+            node = node.setdefault(path[k], {})
+        return node
+
+    def _null(self, root: dict, path: tuple) -> None:
+        node = root
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+            if not isinstance(node, dict):
+                return
+        if not node.get(path[-1]):
+            node[path[-1]] = None
+
+    def _finish(self, node: Any, path: tuple) -> Any:
+        if not isinstance(node, dict):
+            return node
+        if path in self.arrays:
+            return [self._finish(node[index], path + (index,)) for index in sorted(node)]
+        return {key: self._finish(value, path + (key,)) for key, value in node.items()}
+
+
+def decode(text: str) -> Any:
+    """Decode a complete stele document held in memory."""
+    return SteleReader(io.StringIO(text)).document()
+
+
+def load(path, chunk_size: int = CHUNK_SIZE) -> Any:
+    """Decode a stele file into the original JSON shape."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return SteleReader(f, chunk_size).document()
+
+
+def iter_records(path, nested: bool = True, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Stream the rows of a stele file as nested or flat dicts."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = SteleReader(f, chunk_size)
+        yield from reader.records() if nested else reader.flat_rows()
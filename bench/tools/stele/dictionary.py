@@ -0,0 +1,120 @@
+"""
+Cost-model value dictionary planning (full level).
+
+The spec's rule of thumb tokenizes every value seen 2+ times, but a
+hieroglyph token is 4 UTF-8 bytes and each entry adds `𓀀=value,` to the
+header, so short values can make the output larger. Here a value is
+admitted only when its estimated saving is positive:
+
+    saving = count * (cost(value) - cost(token))
+             - (cost(token) + cost('=') + cost(value) + cost(','))
+
+Costs are UTF-8 bytes by default. A per-token cost table (for example
+measured model tokens per hieroglyph) overrides the cost of individual
+tokens; its values must be in the same unit as the text cost.
+"""
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+
+def utf8_bytes(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+
+@dataclass
+class CostModel:
+    """What a piece of emitted stele text costs."""
+
+    text_cost: Callable[[str], float] = utf8_bytes
+    token_costs: dict = field(default_factory=dict)
+    line_separator: str = '▓'   # ▓ ends the dictionary line when minified
+
+    def text(self, text: str) -> float:
+        return self.text_cost(text)
+
+    def token(self, token: str) -> float:
+        cost = self.token_costs.get(token)
+        return self.text_cost(token) if cost is None else cost
+
+    def entry(self, token: str, rendered: str) -> float:
+        """Header cost of one `token=value,` entry."""
+        return self.token(token) + self.text('=') + self.text(rendered) + self.text(',')
+
+    def saving(self, count: int, token: str, rendered: str) -> float:
+        return count * (self.text(rendered) - self.token(token)) - self.entry(token, rendered)
+
+    @classmethod
+    def from_file(cls, path) -> 'CostModel':
+        """Load a JSON object mapping token characters to their cost."""
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+        if not isinstance(table, dict):
+            raise ValueError(f"{path}: token cost table must be a JSON object")
+        return cls(token_costs={token: float(cost) for token, cost in table.items()})
+
+
+@dataclass
+class DictionaryEntry:
+    """One admitted value and what it is expected to save."""
+
+    value: str
+    token: str
+    count: int
+    saving: float
+
+
+def plan(counts: Counter, render: Callable[[str], str], tokens: list[str],
+         model: Optional[CostModel] = None) -> list[DictionaryEntry]:
+    """
+    Pick the dictionary entries with a positive saving.
+
+    Candidates are visited by frequency (ties alphabetically) and tokens by
+    cost, so the most frequent values get the cheapest tokens. A candidate
+    that would not pay for its entry is skipped without using up a token.
+    The whole dictionary is dropped if it cannot pay for its own line.
+    """
+
+    model = model or CostModel()
+    available = sorted(tokens, key=model.token)   # stable: spec order among equals
+    candidates = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+    entries = []
+    for value, count in candidates:
+        if len(entries) == len(available):
+            break
+        token = available[len(entries)]
+        saving = model.saving(count, token, render(value))
+        if saving > 0:
+            entries.append(DictionaryEntry(value, token, count, saving))
+
+    overhead = model.text('@') + model.text(model.line_separator)
+    if sum(entry.saving for entry in entries) <= overhead:
+        return []
+    return entries
+
+
+def count_values(rows: Iterable[list], indexes: list[int], accept: Callable[[str], bool]) -> Counter:
+    """Count dictionary candidates in one streaming pass over the rows."""
+    counts: Counter = Counter()
+    for row in rows:
+        for i in indexes:
+            value = row[i]
+            if isinstance(value, bool):
+                counts['true' if value else 'false'] += 1
+            elif isinstance(value, str) and accept(value):
+                counts[value] += 1
+    return counts
+
+
+def report(entries: list[DictionaryEntry]) -> str:
+    """Format a per-entry savings table."""
+
+    lines = [f"{'Token':<6} {'Count':>6} {'Saved':>8}  Value", "-" * 40]
+    for entry in entries:
+        lines.append(f"{entry.token:<6} {entry.count:>6} {entry.saving:>8.0f}  {entry.value}")
+    lines.append("-" * 40)
+    lines.append(f"{len(entries)} entries, {sum(e.saving for e in entries):.0f} saved")
+    return "\n".join(lines)
@@ -0,0 +1,904 @@
+"""
+In-process stele encoder.
+
+Flattens a JSON document once and emits any of the ascii, light and full
+levels from that single flattened form:
+
+- ascii: untokenized paths, ASCII type letters and `V<n>` value tokens
+  (the layout of the committed bench/encoded/*.stele-ascii files)
+- light: runic field tokens, superscript type markers, ▓-minified rows
+- full:  light plus the hieroglyph value dictionary (v1.8)
+
+Arrays of objects are flattened into indexed paths by default. With
+arrays='tables' they are emitted as sub-tables instead: the element schema
+is declared once in the header and each element becomes a row linked to
+its parent row by index. arrays='auto' picks sub-tables per array path
+when they come out smaller (see _table_saves). The ascii level always
+flattens.
+
+Usage:
+    from stele import encode, encode_levels
+
+    text = encode(doc, level='full')
+    text = encode(doc, level='full', arrays='auto')
+    outputs = encode_levels(doc)   # {'ascii': ..., 'light': ..., 'full': ...}
+"""
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, Iterable, Iterator
+
+from . import symbols as sym
+from .dictionary import CostModel, DictionaryEntry, count_values, plan
+
+LEVELS = ('ascii', 'light', 'full')
+ARRAY_MODES = ('flatten', 'tables', 'auto')
+
+# Raw ascii values that a decoder would read as a value token or dictionary.
+_ASCII_TOKEN = re.compile(r'V\d+(=|$)')
+
+
+@dataclass
+class Column:
+    """One schema column of a flattened document."""
+
+    path: tuple          # field names (str) and array indices (int)
+    kind: str            # 'value', 'array' (inline primitives) or 'marker'
+    type: str = 's'      # s, i, f or b; element type for 'array' columns
+
+
+class _Absent:
+    """A key an element does not have (as opposed to one holding null)."""
+
+    def __repr__(self) -> str:
+        return 'ABSENT'
+
+
+ABSENT = _Absent()
+
+
+@dataclass
+class SubTable:
+    """The elements of one object array, emitted as a child table."""
+
+    path: tuple          # array path from the record root; field names only
+    columns: list[Column]
+    parents: list[int]   # row of the enclosing table holding each element
+    rows: list[list[Any]]     # ABSENT where an element lacks a column's key
+
+
+@dataclass
+class Flattened:
+    """A document flattened into a schema plus value rows."""
+
+    root: str
+    meta: list[tuple[str, Any]]
+    columns: list[Column]
+    rows: list[list[Any]]
+    tables: list[SubTable] = field(default_factory=list)   # enclosing tables first
+
+
+def _is_record_array(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(v, dict) for v in value)
+
+
+def split_document(doc: Any) -> tuple[str, list[tuple[str, Any]], list[dict]]:
+    """
+    Split a document into (root key, header metadata, records).
+
+    An object holding exactly one array of objects next to scalar fields
+    becomes one row per element, with the scalars as header metadata. A
+    top-level array of objects becomes one row per element under the list
+    root. Anything else is encoded as a single row.
+    """
+
+    if isinstance(doc, list):
+        if all(isinstance(item, dict) for item in doc):
+            return sym.LIST_ROOT, [], doc
+        raise ValueError("top-level array must contain only objects")
+
+    if not isinstance(doc, dict):
+        raise ValueError("top-level value must be an object or an array of objects")
+
+    tables = [key for key, value in doc.items() if _is_record_array(value)]
+    if len(tables) == 1:
+        key = tables[0]
+        others = [(k, v) for k, v in doc.items() if k != key]
+        if all(not isinstance(v, (dict, list)) for _, v in others):
+            _check_name(key)
+            for k, _ in others:
+                _check_name(k)
+            return key, sorted(others), doc[key]
+
+    return '', [], [doc]
+
+
+def _check_name(name: str) -> None:
+    if not name or not sym.NAME_RESERVED.isdisjoint(name):
+        raise ValueError(f"field name {name!r} is empty or contains a stele delimiter")
+
+
+def flatten_record(record: dict) -> tuple[dict, dict]:
+    """
+    Flatten one record into (path -> value, array marker path -> element count).
+
+    Keys are visited in sorted order. Arrays of primitives stay inline as
+    Python lists; any other array gets a marker and indexed child paths.
+    """
+
+    values: dict = {}
+    markers: dict = {}
+    _flatten_into(record, (), values, markers)
+    return values, markers
+
+
+def _flatten_into(value: Any, prefix: tuple, values: dict, markers: dict) -> None:
+    if isinstance(value, dict):
+        # An empty array element still counts towards its array's length,
+        # but an empty object under a key leaves no path to rebuild it from.
+        if not value and prefix and isinstance(prefix[-1], str):
+            raise ValueError(f"path {_describe(prefix)} is an empty object; stele has no column for it")
+        for key in sorted(value):
+            _check_name(key)
+            _flatten_into(value[key], prefix + (key,), values, markers)
+    elif isinstance(value, list):
+        if value and all(not isinstance(item, (dict, list)) for item in value):
+            values[prefix] = value
+        else:
+            markers[prefix] = len(value)
+            for index, item in enumerate(value):
+                _flatten_into(item, prefix + (index,), values, markers)
+    else:
+        values[prefix] = value
+
+
+def _resolve_type(path: tuple, seen: set) -> str:
+    """A column's type from the Python types of its values; ValueError if they mix."""
+
+    seen.discard(type(None))
+    if not seen or seen == {str}:
+        return 's'
+    if seen == {bool}:
+        return 'b'
+    if seen == {int}:
+        return 'i'
+    if seen <= {int, float}:
+        return 'f'
+    names = ', '.join(sorted(t.__name__ for t in seen))
+    raise ValueError(f"path {_describe(path)} mixes value types ({names}); a column holds one type")
+
+
+class SchemaUnion:
+    """
+    The union schema of flattened records, built a batch at a time.
+
+    add() every batch of (values, markers) records first, then close() to
+    fix the columns; rows() then aligns records to them. build_schema does
+    both over one list, the streaming encoder (stele/stream.py) over two
+    passes of a source.
+    """
+
+    def __init__(self):
+        self.kinds: dict = {}
+        self.seen: dict = {}
+        self.markers: dict = {}
+        self.columns: list[Column] = []
+
+    def add(self, flat_records: Iterable[tuple[dict, dict]]) -> None:
+        kinds, seen, markers = self.kinds, self.seen, self.markers
+        for values, record_markers in flat_records:
+            for path, value in values.items():
+                # A null fits any kind of column; the path's kind comes
+                # from its non-null values (None until one turns up).
+                kind = None if value is None else 'array' if isinstance(value, list) else 'value'
+                known = kinds.setdefault(path, kind)
+                if known is None:
+                    kinds[path] = kind
+                elif kind is not None and known != kind:
+                    raise ValueError(f"path {_describe(path)} mixes arrays and scalars")
+                types = seen.setdefault(path, set())
+                if kind == 'array':
+                    types.update(type(item) for item in value)
+                else:
+                    types.add(type(value))
+            for path, count in record_markers.items():
+                markers[path] = markers.get(path, True) and not count
+
+    def close(self) -> list[Column]:
+        """Resolve the column kinds and types; returns the columns in schema order."""
+
+        # An empty list looks like an object-array marker; when the same path
+        # holds inline primitives elsewhere, it is just an empty inline array.
+        widened = []
+        for path, only_empty in list(self.markers.items()):
+            if path in self.kinds:
+                if self.kinds[path] is None and not only_empty:
+                    raise ValueError(f"path {_describe(path)} holds both null and an array of objects")
+                if self.kinds[path] not in ('array', None) or not only_empty:
+                    raise ValueError(f"path {_describe(path)} mixes arrays and scalars")
+                self.kinds[path] = 'array'
+                del self.markers[path]
+                widened.append(path)
+        self.widened = widened
+
+        # A row rebuilds an object from the paths beneath it, so a path
+        # that also holds a value elsewhere cannot say which one it had.
+        for path in chain(self.kinds, self.markers):
+            for k in range(1, len(path)):
+                if path[:k] in self.kinds:
+                    held = 'null' if self.kinds[path[:k]] is None else 'a value'
+                    raise ValueError(f"path {_describe(path[:k])} holds both {held} and an object")
+
+        self.columns = [Column(path, kind or 'value', _resolve_type(path, self.seen[path]))
+                        for path, kind in self.kinds.items()]
+        self.columns.extend(Column(path, 'marker') for path in self.markers)
+        return self.columns
+
+    def rows(self, flat_records: Iterable[tuple[dict, dict]], missing: Any = None) -> list[list]:
+        """Records' values in column order; `missing` fills the paths a record lacks."""
+
+        paths = list(self.kinds)
+        widened = [(path, paths.index(path)) for path in self.widened]
+        inline = set(self.widened)
+        markers = list(self.markers)
+        positions = {path: len(paths) + k for k, path in enumerate(markers)}
+        tail = [None] * len(markers)
+        rows = []
+        for values, record_markers in flat_records:
+            row = [values.get(path, missing) for path in paths]
+            for path, i in widened:
+                if path in record_markers:
+                    row[i] = []
+            if missing is None:
+                row.extend(tail)
+            else:
+                row.extend(None if path in record_markers else missing for path in markers)
+            if record_markers:
+                for path, count in stated_lengths(values, record_markers, inline).items():
+                    row[positions[path]] = count
+            rows.append(row)
+        return rows
+
+
+def stated_lengths(values: dict, markers: dict,
+                   inline: set | frozenset = frozenset()) -> dict[tuple, int]:
+    """
+    Element counts a row writes into its array marker cells.
+
+    A decoder takes an object array to run up to its last element with a
+    non-null value beneath it (RecordBuilder.build). Only arrays that end
+    in elements holding nothing but nulls, empty objects or empty object
+    arrays need their count stated; every other marker cell stays ∅.
+    `inline` names marker paths that are really empty inline arrays,
+    which count as values.
+    """
+
+    inferred: dict = {}
+    filled = chain((path for path, value in values.items() if value is not None),
+                   (path for path in markers if path in inline))
+    for path in filled:
+        for k, segment in enumerate(path):
+            if isinstance(segment, int) and inferred.get(path[:k], 0) <= segment:
+                inferred[path[:k]] = segment + 1
+    return {path: count for path, count in markers.items()
+            if path not in inline and inferred.get(path, 0) != count}
+
+
+def build_schema(root: str, meta: list, flat_records: list[tuple[dict, dict]],
+                 missing: Any = None) -> Flattened:
+    """
+    Union the flattened records into one schema and align their rows.
+
+    `missing` fills the columns a record has no path for.
+    """
+
+    union = SchemaUnion()
+    union.add(flat_records)
+    columns = union.close()
+    return Flattened(root, meta, columns, union.rows(flat_records, missing))
+
+
+def _describe(path: tuple) -> str:
+    return sym.PATH.join(str(segment) for segment in path)
+
+
+def flatten(doc: Any, arrays: str = 'flatten') -> Flattened:
+    """
+    Flatten a parsed JSON document into schema columns and rows.
+
+    `arrays` is one of ARRAY_MODES: 'flatten' turns every array of objects
+    into indexed paths, 'tables' moves each one reachable through objects
+    into a sub-table, and 'auto' does so only where _table_saves says the
+    sub-table is smaller.
+    """
+
+    if arrays not in ARRAY_MODES:
+        raise ValueError(f"unknown array mode: {arrays}")
+    root, meta, records = split_document(doc)
+    if arrays == 'flatten':
+        return build_schema(root, meta, [flatten_record(record) for record in records])
+    tables: list[SubTable] = []
+    flat = _build_table(root, meta, records, (), arrays, tables)
+    flat.tables = tables
+    return flat
+
+
+def _build_table(root: str, meta: list, records: list[dict], prefix: tuple,
+                 arrays: str, tables: list[SubTable]) -> Flattened:
+    """
+    Flatten one table's records, moving the chosen object arrays into `tables`.
+
+    Elements of one array often differ in which keys they have, so
+    sub-table rows mark a key an element lacks as ABSENT rather than null.
+    """
+
+    chosen = [path for path in _object_arrays(records)
+              if (arrays == 'tables' or _table_saves(records, path)) and _uniform(records, path)]
+    children = {path: ([], []) for path in chosen}
+    flat_records = []
+    for number, record in enumerate(records):
+        for path in chosen:
+            record, elements = _detach(record, path)
+            parents, rows = children[path]
+            parents.extend(number for _ in elements)
+            rows.extend(elements)
+        flat_records.append(flatten_record(record))
+    flat = build_schema(root, meta, flat_records, ABSENT if prefix else None)
+
+    for path in chosen:
+        parents, elements = children[path]
+        table = SubTable(prefix + path, [], parents, [])
+        tables.append(table)
+        child = _build_table('', [], elements, prefix + path, arrays, tables)
+        table.columns, table.rows = child.columns, child.rows
+    return flat
+
+
+def _object_arrays(records: list[dict]) -> list[tuple]:
+    """
+    Paths, reached through objects only, that hold an array of objects in
+    every record that has them and a non-empty one in at least one.
+    """
+
+    kinds: dict = {}
+
+    def walk(node: dict, prefix: tuple) -> None:
+        for key in sorted(node):
+            path, value = prefix + (key,), node[key]
+            if isinstance(value, dict):
+                kinds.setdefault(path, set()).add('object')
+                walk(value, path)
+            elif isinstance(value, list) and all(isinstance(item, dict) for item in value):
+                kinds.setdefault(path, set()).add('elements' if value else 'empty')
+            else:
+                kinds.setdefault(path, set()).add('other')
+
+    for record in records:
+        walk(record, ())
+    return [path for path, seen in kinds.items() if 'elements' in seen and seen <= {'elements', 'empty'}]
+
+
+def _uniform(records: list[dict], path: tuple) -> bool:
+    """
+    Whether the elements at `path` share one schema. Flattened, each index
+    gets its own columns, so only a sub-table can put an array and a
+    scalar, an array and an object, or a string and a number under one key.
+    """
+
+    elements = [item for record in records for item in _detach(record, path)[1]]
+    try:
+        flat = build_schema('', [], [flatten_record(item) for item in elements], ABSENT)
+    except ValueError:
+        return False
+    arrays = {column.path for column in flat.columns if column.kind == 'marker'}
+    for column in flat.columns:
+        if any(column.path[:k] in arrays and isinstance(column.path[k], str)
+               for k in range(1, len(column.path))):
+            return False
+    return True
+
+
+def _detach(record: dict, path: tuple) -> tuple[dict, list]:
+    """A copy of `record` with the array at `path` emptied, and its elements."""
+
+    value = record.get(path[0])
+    if len(path) == 1:
+        if not isinstance(value, list):
+            return record, []
+        return {**record, path[0]: []}, value
+    if not isinstance(value, dict):
+        return record, []
+    inner, elements = _detach(value, path[1:])
+    return {**record, path[0]: inner}, elements
+
+
+# UTF-8 bytes of the light/full structure, for _table_saves: a runic field
+# token, a separator (┃ ჻ ◉ ▓ ∅) and a type marker or ⟦⟧ are each about 3.
+_NAME_BYTES = 3
+_SEPARATOR_BYTES = 3
+
+
+def _spec_bytes(path: tuple) -> int:
+    names = sum(_NAME_BYTES if isinstance(s, str) else len(str(s)) for s in path)
+    return names + _SEPARATOR_BYTES * len(path)
+
+
+def _table_saves(records: list[dict], path: tuple) -> bool:
+    """
+    Size rule for arrays='auto': whether the array at `path` costs fewer
+    bytes as a sub-table than as indexed paths.
+
+    Flattened, the schema holds every (index, element column) pair and
+    every row pays a separator, and a ∅ where it has no such element, for
+    each of them. As a sub-table the element columns are declared once and
+    each element pays a row marker, its parent index and one field per
+    element column. Values cost the same either way and are left out.
+    """
+
+    indexed, element_columns = set(), set()
+    filled = elements = parent_digits = 0
+    for number, record in enumerate(records):
+        _, items = _detach(record, path)
+        for index, item in enumerate(items):
+            values, markers = flatten_record(item)
+            for column in chain(values, markers):
+                element_columns.add(column)
+                indexed.add((index,) + column)
+            filled += sum(value is not None for value in values.values())
+        elements += len(items)
+        parent_digits += len(items) * len(str(number))
+
+    flattened = (sum(_spec_bytes(path + column) for column in indexed)
+                 + (2 * len(records) * len(indexed) - filled) * _SEPARATOR_BYTES)
+    table = (_spec_bytes(path) + len(str(elements)) + 3 * _SEPARATOR_BYTES
+             + sum(_spec_bytes(column) for column in element_columns)
+             + parent_digits + elements * 3 * _SEPARATOR_BYTES
+             + (2 * elements * len(element_columns) - filled) * _SEPARATOR_BYTES)
+    return table < flattened
+
+
+def field_references(columns: list[Column]) -> Counter:
+    """How often each field name occurs across all schema paths, first-seen order."""
+    counts: Counter = Counter()
+    for column in columns:
+        for segment in column.path:
+            if isinstance(segment, str):
+                counts[segment] += 1
+    return counts
+
+
+def field_token_pool(reserved=(), model: CostModel | None = None) -> list[str]:
+    """
+    Tokens available to field names, cheapest first.
+
+    Runic comes first (3 UTF-8 bytes), then cuneiform and hieroglyphs (4
+    bytes). Cuneiform is used before hieroglyphs so wide schemas overflow
+    away from the value dictionary's block, and `reserved` tokens (those the
+    value dictionary took) are never handed out.
+    """
+
+    model = model or CostModel()
+    reserved = set(reserved) | {sym.ESCAPE_OPEN, sym.ESCAPE_CLOSE}
+    pool = (sym.alphabet(*sym.RUNIC) + sym.alphabet(*sym.CUNEIFORM)
+            + sym.alphabet(*sym.HIEROGLYPHS))
+    return sorted((token for token in pool if token not in reserved), key=model.token)
+
+
+def assign_field_tokens(names: list[str] | Counter, reserved=(),
+                        model: CostModel | None = None) -> dict[str, str]:
+    """
+    Map field names to tokens, giving the cheapest code points to the
+    most-referenced names.
+
+    `names` is a reference Counter (see field_references) or a plain list,
+    which counts each name once. Ties keep first-seen order.
+    """
+
+    counts = names if isinstance(names, Counter) else Counter(dict.fromkeys(names, 1))
+    ordered = sorted(counts, key=lambda name: -counts[name])
+    tokens = field_token_pool(reserved, model)
+    if len(ordered) > len(tokens):
+        raise ValueError(f"{len(ordered)} field names exceed the {len(tokens)} available tokens")
+    return dict(zip(ordered, tokens))
+
+
+def value_tokens() -> list[str]:
+    """Hieroglyph tokens available to the value dictionary."""
+    reserved = (sym.ESCAPE_OPEN, sym.ESCAPE_CLOSE)
+    return [token for token in sym.alphabet(*sym.HIEROGLYPHS) if token not in reserved]
+
+
+def _rank(counts: Counter, min_count: int, limit: int) -> list[str]:
+    ranked = sorted((item for item in counts.items() if item[1] >= min_count),
+                    key=lambda item: (-item[1], item[0]))
+    return [value for value, _ in ranked[:limit]]
+
+
+def _tables(flat: Flattened):
+    """(columns, rows) of the top-level table and then of every sub-table."""
+    yield flat.columns, flat.rows
+    for table in flat.tables:
+        yield table.columns, table.rows
+
+
+def schema_columns(flat: Flattened) -> list[Column]:
+    """Every column the header declares, sub-table paths and columns included."""
+    columns = list(flat.columns)
+    for table in flat.tables:
+        columns.append(Column(table.path, 'marker'))
+        columns.extend(table.columns)
+    return columns
+
+
+def plan_value_dictionary(flat: Flattened, model: CostModel | None = None) -> list[DictionaryEntry]:
+    """
+    Choose full-level dictionary entries by estimated saving.
+
+    String and boolean columns are counted in one pass; see
+    stele.dictionary for the cost model.
+    """
+
+    counts: Counter = Counter()
+    for columns, rows in _tables(flat):
+        indexes = [i for i, col in enumerate(columns)
+                   if col.kind == 'value' and col.type in ('s', 'b')]
+        counts.update(count_values(rows, indexes, _dictionary_safe))
+    return plan(counts, _text, value_tokens(), model)
+
+
+def build_value_dictionary(flat: Flattened, model: CostModel | None = None,
+                           min_count: int | None = None) -> dict[str, str]:
+    """
+    Map repeated values to hieroglyph tokens (full level).
+
+    By default only values whose token saves more than its dictionary entry
+    costs are admitted. With `min_count`, the spec's fixed threshold is used
+    instead: string values appearing at least that often, ranked by
+    frequency then alphabetically (the rule behind the committed fixtures).
+    """
+
+    if min_count is None:
+        return {entry.value: entry.token for entry in plan_value_dictionary(flat, model)}
+
+    counts: Counter = Counter()
+    for columns, rows in _tables(flat):
+        indexes = [i for i, col in enumerate(columns) if col.kind == 'value' and col.type == 's']
+        for row in rows:
+            for i in indexes:
+                value = row[i]
+                if isinstance(value, str) and _dictionary_safe(value):
+                    counts[value] += 1
+
+    tokens = value_tokens()
+    return dict(zip(_rank(counts, min_count, len(tokens)), tokens))
+
+
+def _dictionary_safe(value: str) -> bool:
+    # A dictionary line ends at the next `▓@` or newline, so entries must
+    # not contain either.
+    if not value or ',' in value or '\n' in value or ' @' in value:
+        return False
+    return not _needs_escape(value)
+
+
+def _needs_escape(text: str) -> bool:
+    if not sym.RESERVED.isdisjoint(text) or text.endswith('\n'):
+        return True
+    # A line boundary followed by @ would read as a dictionary line.
+    if ' @' in text or '\n@' in text:
+        return True
+    return len(text) == 1 and sym.in_block(text, sym.HIEROGLYPHS)
+
+
+def _text(value: str) -> str:
+    if _needs_escape(value):
+        return sym.escape(value)
+    return value.replace(' ', sym.SPACE)
+
+
+def _scalar(value: Any, type_: str) -> str:
+    if value is None:
+        return sym.NULL
+    if type_ == 'b':
+        return 'true' if value else 'false'
+    if type_ in ('i', 'f'):
+        return repr(value) if isinstance(value, float) else str(value)
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return _text(value)
+
+
+def _element(value: Any, type_: str) -> str:
+    if value == '':
+        return sym.escape('')
+    return _scalar(value, type_)
+
+
+def _path_spec(path: tuple, tokens: dict[str, str]) -> str:
+    return sym.PATH.join(tokens.get(s, s) if isinstance(s, str) else str(s) for s in path)
+
+
+def _column_spec(column: Column, tokens: dict[str, str]) -> str:
+    path = _path_spec(column.path, tokens)
+    if column.kind == 'marker':
+        return path + sym.ARRAY
+    marker = sym.TYPE_MARKERS[column.type]
+    return path + marker + (sym.ARRAY if column.kind == 'array' else '')
+
+
+def _meta_entry(key: str, value: Any, ascii_types: bool) -> str:
+    if value is None:
+        return f"{key}={sym.NULL}"
+    if isinstance(value, bool):
+        type_, text = 'b', 'true' if value else 'false'
+    elif isinstance(value, int):
+        type_, text = 'i', str(value)
+    elif isinstance(value, float):
+        type_, text = 'f', repr(value)
+    else:
+        type_ = 's'
+        text = str(value)
+        if _needs_escape(text) or not sym.ASCII_RESERVED.isdisjoint(text) or ']' in text \
+                or '\n' in text or '\r' in text:
+            text = sym.escape(text)
+        elif not ascii_types:
+            text = text.replace(' ', sym.SPACE)
+    if type_ != 's':
+        key += f":{type_}" if ascii_types else sym.TYPE_MARKERS[type_]
+    return f"{key}={text}"
+
+
+def _meta_block(meta: list, ascii_types: bool = False) -> str:
+    if not meta:
+        return ''
+    return '[' + ','.join(_meta_entry(k, v, ascii_types) for k, v in meta) + ']'
+
+
+def emit(flat: Flattened, level: str = 'full', multiline: bool = False,
+         value_dictionary: dict[str, str] | None = None,
+         cost_model: CostModel | None = None,
+         field_tokens: dict[str, str] | None = None) -> str:
+    """
+    Render a flattened document at one level.
+
+    `value_dictionary` overrides the full-level dictionary builder; pass an
+    empty dict to disable value tokenization. `cost_model` is handed to the
+    builder otherwise. `field_tokens` likewise overrides the field token
+    assignment (name -> token).
+    """
+
+    if level == 'ascii':
+        if flat.tables:
+            raise ValueError("the ascii level has no sub-tables; flatten with arrays='flatten'")
+        return _emit_ascii(flat)
+    if level not in ('light', 'full'):
+        raise ValueError(f"unknown stele level: {level}")
+
+    if level == 'light':
+        values = {}
+    elif value_dictionary is None:
+        if cost_model is None:
+            cost_model = CostModel(line_separator='\n' if multiline else sym.SPACE)
+        values = build_value_dictionary(flat, cost_model)
+    else:
+        values = value_dictionary
+    tokens = field_tokens
+    if tokens is None:
+        tokens = assign_field_tokens(field_references(schema_columns(flat)), values.values(), cost_model)
+
+    lines = header_lines(flat, tokens, values)
+    lines.extend(row_lines(flat, values))
+    return ('\n' if multiline else sym.SPACE).join(lines)
+
+
+def header_lines(flat: Flattened, tokens: dict[str, str], values: dict[str, str]) -> list[str]:
+    """The light/full header: dictionaries, sub-table declarations and the schema line."""
+
+    lines = []
+    if tokens:
+        lines.append(sym.SCHEMA + ','.join(f"{t}={name}" for name, t in tokens.items()))
+    if values:
+        lines.append(sym.SCHEMA + ','.join(f"{t}={_text(v)}" for v, t in values.items()))
+
+    # Sub-tables are declared between the dictionaries and the schema line
+    # as `@path⟦rows⟧┃columns`; their rows, each led by the parent row
+    # number, come before the top-level rows in declaration order.
+    for table in flat.tables:
+        count = sym.ARRAY[0] + str(len(table.rows)) + sym.ARRAY[1]
+        lines.append(sym.SCHEMA + _path_spec(table.path, tokens) + count
+                     + ''.join(sym.FIELD + _column_spec(c, tokens) for c in table.columns))
+
+    schema = sym.SCHEMA + flat.root + _meta_block(flat.meta)
+    if flat.columns:
+        schema += sym.FIELD + sym.FIELD.join(_column_spec(c, tokens) for c in flat.columns)
+    lines.append(schema)
+    return lines
+
+
+def row_lines(flat: Flattened, values: dict[str, str], rows: Iterable[list] | None = None) -> Iterator[str]:
+    """
+    The light/full ◉ lines: sub-table rows, then `rows` (default: the
+    document's own) against its top-level columns.
+    """
+
+    for table in flat.tables:
+        formatters = [_table_formatter(column, values) for column in table.columns]
+        for parent, row in zip(table.parents, table.rows):
+            yield (sym.ROW + str(parent)
+                   + ''.join(sym.FIELD + f(v) for f, v in zip(formatters, row)))
+
+    formatters = [_light_formatter(column, values) for column in flat.columns]
+    for row in flat.rows if rows is None else rows:
+        yield sym.ROW + sym.FIELD.join(f(v) for f, v in zip(formatters, row))
+
+
+def _light_formatter(column: Column, values: dict[str, str]):
+    type_ = column.type
+    if column.kind == 'marker':
+        return lambda value: sym.NULL if value is None else str(value)
+    if column.kind == 'array':
+        def array(value):
+            if value is None:
+                return sym.NULL
+            return sym.ELEMENT.join(_element(item, type_) for item in value)
+        return array
+    if type_ in ('s', 'b') and values:
+        def tokenized(value):
+            if isinstance(value, bool):
+                token = values.get('true' if value else 'false')
+            else:
+                token = values.get(value) if isinstance(value, str) else None
+            return token if token is not None else _scalar(value, type_)
+        return tokenized
+    return lambda value: _scalar(value, type_)
+
+
+def _table_formatter(column: Column, values: dict[str, str]):
+    """
+    Sub-table cells: an ABSENT key is an empty field, so an empty string
+    is escaped and an empty array is a lone ◈ (as `|` in the ascii layout).
+    """
+
+    light = _light_formatter(column, values)
+
+    def cell(value):
+        if value is ABSENT:
+            return ''
+        if isinstance(value, str) and not value:
+            return sym.escape('')
+        if column.kind == 'array' and value == []:
+            return sym.ELEMENT
+        return light(value)
+    return cell
+
+
+def build_ascii_dictionary(flat: Flattened, min_count: int = 2) -> dict[str, str]:
+    """Map repeated string and boolean values to `V<n>` tokens (ascii level)."""
+
+    indexes = [i for i, col in enumerate(flat.columns)
+               if col.kind == 'value' and col.type in ('s', 'b')]
+    counts: Counter = Counter()
+    for row in flat.rows:
+        for i in indexes:
+            value = row[i]
+            if isinstance(value, bool):
+                counts['true' if value else 'false'] += 1
+            elif isinstance(value, str) and _ascii_safe(value):
+                counts[value] += 1
+
+    ranked = _rank(counts, min_count, len(counts))
+    return {value: f"{sym.ASCII_TOKEN_PREFIX}{n}" for n, value in enumerate(ranked, 1)}
+
+
+def _ascii_needs_escape(text: str) -> bool:
+    if not text or not sym.ASCII_RESERVED.isdisjoint(text) or text.endswith('\n'):
+        return True
+    return _ASCII_TOKEN.match(text) is not None
+
+
+def _ascii_safe(value: str) -> bool:
+    return not _ascii_needs_escape(value)
+
+
+def _ascii_text(value: str) -> str:
+    return sym.escape(value) if _ascii_needs_escape(value) else value
+
+
+def _ascii_scalar(value: Any, type_: str) -> str:
+    if value is None:
+        return ''
+    if type_ == 'b':
+        return 'true' if value else 'false'
+    if type_ in ('i', 'f'):
+        return repr(value) if isinstance(value, float) else str(value)
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return _ascii_text(value)
+
+
+def _ascii_column(column: Column) -> str:
+    path = _describe(column.path)
+    if column.kind == 'marker':
+        return path + sym.ARRAY
+    if column.kind == 'array':
+        return f"{path}:a" + ('' if column.type == 's' else column.type)
+    return f"{path}:{column.type}"
+
+
+def _ascii_formatter(column: Column, values: dict[str, str]):
+    type_ = column.type
+    if column.kind == 'marker':
+        return lambda value: '' if value is None else str(value)
+    if column.kind == 'array':
+        def array(value):
+            if value is None:
+                return ''
+            if not value:
+                return sym.ASCII_ELEMENT
+            return sym.ASCII_ELEMENT.join(_ascii_scalar(item, type_) if item != ''
+                                          else sym.escape('') for item in value)
+        return array
+
+    def scalar(value):
+        if isinstance(value, bool) and type_ == 'b':
+            key = 'true' if value else 'false'
+        else:
+            key = value if isinstance(value, str) and type_ == 's' else None
+        token = values.get(key) if key is not None else None
+        return token if token is not None else _ascii_scalar(value, type_)
+    return scalar
+
+
+def _emit_ascii(flat: Flattened) -> str:
+    values = build_ascii_dictionary(flat)
+    segments = ascii_header_segments(flat, values)
+    segments.extend(ascii_row_segments(flat, values))
+    return sym.ASCII_ROW.join(segments)
+
+
+def ascii_header_segments(flat: Flattened, values: dict[str, str]) -> list[str]:
+    """The ascii header: root and metadata, columns and the `V<n>` dictionary."""
+
+    segments = []
+    if flat.root or flat.meta:
+        segments.append(sym.SCHEMA + flat.root + _meta_block(flat.meta, ascii_types=True))
+    segments.append(sym.ASCII_FIELD.join(_ascii_column(c) for c in flat.columns))
+    if values:
+        entries = sorted((token, value) for value, token in values.items())
+        segments.append(sym.ASCII_FIELD.join(f"{t}={v}" for t, v in entries))
+    return segments
+
+
+def ascii_row_segments(flat: Flattened, values: dict[str, str],
+                       rows: Iterable[list] | None = None) -> Iterator[str]:
+    """The ascii rows, `rows` defaulting to the document's own."""
+    formatters = [_ascii_formatter(column, values) for column in flat.columns]
+    for row in flat.rows if rows is None else rows:
+        yield sym.ASCII_FIELD.join(f(v) for f, v in zip(formatters, row))
+
+
+def encode(doc: Any, level: str = 'full', multiline: bool = False,
+           cost_model: CostModel | None = None, arrays: str = 'flatten') -> str:
+    """Encode a parsed JSON document at one stele level."""
+    flat = flatten(doc, 'flatten' if level == 'ascii' else arrays)
+    return emit(flat, level, multiline, cost_model=cost_model)
+
+
+def encode_levels(doc: Any, levels: tuple = LEVELS, multiline: bool = False,
+                  cost_model: CostModel | None = None, arrays: str = 'flatten') -> dict[str, str]:
+    """
+    Flatten a document once and encode it at every requested level.
+
+    The ascii level gets its own flattened form when the others use
+    sub-tables.
+    """
+
+    flat = flatten(doc, arrays)
+    outputs = {}
+    for level in levels:
+        form = flatten(doc) if level == 'ascii' and flat.tables else flat
+        outputs[level] = emit(form, level, multiline, cost_model=cost_model)
+    return outputs
@@ -0,0 +1,300 @@
+"""
+Row offset index for random access into encoded stele files.
+
+One pass over a memory-mapped file records the byte offset of every row
+start (each ◉ in the light/full layouts, whether rows are separated by ▓
+or by newlines; each row after the header's `;` segments in the ascii
+layout) together with the decoded header. The index is kept in a sidecar
+file, so a reader can later fetch row N or a range of rows with a couple
+of slices of the mapped file, without reading anything before them.
+
+The sidecar records the source's sha256. On open, a matching size and
+mtime are trusted; otherwise the file is hashed again and the index is
+rebuilt if the hash changed.
+
+Usage:
+    from stele.index import RowIndex
+
+    with RowIndex.open('variant-a.stele-full') as index:   # builds the sidecar if needed
+        index.header.columns
+        index.record(4)                 # fifth row as a nested dict
+        for row in index.rows(100, 200):
+            ...
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterator, Optional
+
+from . import symbols as sym
+from .decoder import (
+    _ASCII_TOKEN, _STOP_CHARS, Header, RecordBuilder, _is_ascii_root, _parse_ascii_columns,
+    _split_entries, _split_root, _strip_newline, column_decoder, extension_tokens, parse_header,
+    split_extension,
+)
+from .encoder import Column
+
+INDEX_VERSION = 1
+INDEX_DIR = Path(__file__).parent.parent.parent / ".cache" / "rowindex"
+
+_ROW = re.compile(re.escape(sym.ROW.encode('utf-8')))
+_ASCII_ROW = re.compile(re.escape(sym.ASCII_ROW.encode('ascii')))
+_STOP = re.compile(b'|'.join(re.escape(char.encode('utf-8')) for char in sorted(_STOP_CHARS)))
+_OFFSET = struct.Struct('<Q')
+# A dictionary-extension line: a line boundary, @ and a hieroglyph token (U+13000-U+1342F).
+_EXTENSION = re.compile(b'(?:\n|' + re.escape(sym.SPACE.encode('utf-8')) + b')@'
+                        + b'(?=\xf0\x93[\x80-\x90][\x80-\xbf]=)')
+
+
+def default_index_path(path) -> Path:
+    """
+    Sidecar location for a stele file: bench/.cache/rowindex/, keyed by the
+    file's resolved path. Keeping sidecars out of the encoded tree stops
+    them from matching the *.stele-* globs of the other tools.
+    """
+    resolved = str(Path(path).resolve())
+    digest = hashlib.sha256(resolved.encode('utf-8')).hexdigest()[:16]
+    return INDEX_DIR / f"{Path(path).name}-{digest}.idx"
+
+
+def _header_to_json(header: Header) -> dict:
+    return {
+        'layout': header.layout,
+        'root': header.root,
+        'meta': header.meta,
+        'columns': [[list(c.path), c.kind, c.type] for c in header.columns],
+        'field_tokens': header.field_tokens,
+        'value_tokens': header.value_tokens,
+    }
+
+
+def _header_from_json(data: dict) -> Header:
+    columns = [Column(tuple(path), kind, type_) for path, kind, type_ in data['columns']]
+    return Header(data['layout'], data['root'], data['meta'], columns,
+                  data['field_tokens'], data['value_tokens'])
+
+
+def _ascii_header(data: mmap.mmap) -> tuple[Header, int]:
+    """Parse the ascii header segments; returns it and the offset of the first row."""
+
+    def segment(start: int) -> tuple[str, int, bool]:
+        match = _ASCII_ROW.search(data, start)
+        end = match.start() if match else len(data)
+        return data[start:end].decode('utf-8'), end + 1, match is None
+
+    text, position, last = segment(0)
+    root, meta = '', {}
+    if _is_ascii_root(text) and not last:
+        root, meta = _split_root(text[1:], ascii_layout=True)
+        text, position, last = segment(position)
+    columns = _parse_ascii_columns(_strip_newline(text) if last else text)
+
+    value_tokens = {}
+    if not last:
+        text, after, last_values = segment(position)
+        text = _strip_newline(text) if last_values else text
+        if _ASCII_TOKEN.match(text):
+            for token, value in _split_entries(text):
+                value_tokens[token] = sym.unescape(value) if sym.is_escaped(value) else value
+            position = after
+    else:
+        position = len(data)
+    return Header('ascii', root, meta, columns, {}, value_tokens), position
+
+
+def _scan(data: mmap.mmap) -> tuple[Header, array]:
+    """Decode the header and collect every row start offset in one pass."""
+
+    stop = _STOP.search(data)
+    if stop is not None and _ASCII_ROW.fullmatch(stop.group()):
+        header, start = _ascii_header(data)
+        starts = array('Q', [start] if start < len(data) else [])
+        if starts:
+            starts.extend(m.end() for m in _ASCII_ROW.finditer(data, start))
+        return header, starts
+
+    first = _ROW.search(data)
+    header = parse_header(data[:first.start() if first else len(data)].decode('utf-8'))
+    if first:
+        # Tokens are never redefined, so extension lines after any row can
+        # be merged into the header for every row.
+        for match in _EXTENSION.finditer(data, first.start()):
+            end = _ROW.search(data, match.end())
+            line = data[match.start():end.start() if end else len(data)].decode('utf-8')
+            line = line[:-1] if end else _strip_newline(line)
+            header.value_tokens.update(extension_tokens(split_extension(line)[1]))
+    return header, array('Q', (m.start() for m in _ROW.finditer(data)))
+
+
+class RowIndex:
+    """Random access to the rows of one stele file through its offset index."""
+
+    def __init__(self, path, index_path: Path, header: Header, rows: int, offsets: memoryview,
+                 data: mmap.mmap, closers: list):
+        self.path = Path(path)
+        self.index_path = Path(index_path)
+        self.header = header
+        self._rows = rows
+        self._offsets = offsets
+        self._data = data
+        self._closers = closers
+        self._decoders = [column_decoder(header, column) for column in header.columns]
+        self._builder = RecordBuilder(header.columns)
+        self._flat_keys = [(i, sym.PATH.join(str(s) for s in column.path))
+                           for i, column in enumerate(header.columns) if column.kind != 'marker']
+        self._ascii = header.layout == 'ascii'
+
+    @classmethod
+    def build(cls, path, index_path: Optional[Path] = None) -> Path:
+        """Scan `path` once and write its sidecar index. Returns the sidecar path."""
+
+        path = Path(path)
+        index_path = Path(index_path) if index_path else default_index_path(path)
+        stat = path.stat()
+        with open(path, 'rb') as f:
+            if stat.st_size == 0:
+                raise ValueError(f"{path} is empty")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                digest = hashlib.sha256(data).hexdigest()
+                header, starts = _scan(data)
+        if header.tables:
+            raise ValueError(f"{path} has sub-tables, whose rows are not indexed; decode it with SteleReader")
+
+        meta = {
+            'version': INDEX_VERSION,
+            'source': str(path.resolve()),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest,
+            'rows': len(starts),
+            'header': _header_to_json(header),
+        }
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(index_path.name + f".{os.getpid()}.tmp")
+        with open(tmp, 'wb') as out:
+            out.write(json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+            starts.append(stat.st_size)   # end sentinel
+            if sys.byteorder == 'big':
+                starts.byteswap()
+            starts.tofile(out)
+        os.replace(tmp, index_path)
+        return index_path
+
+    @classmethod
+    def open(cls, path, index_path: Optional[Path] = None, rebuild: bool = True,
+             verify: bool = False) -> 'RowIndex':
+        """
+        Open a file through its index, building or rebuilding the sidecar when
+        it is missing or stale. `verify` re-hashes the file even when its size
+        and mtime match. With rebuild=False a stale index raises ValueError.
+        """
+
+        path = Path(path)
+        index_path = Path(index_path) if index_path else default_index_path(path)
+        meta = cls._read_meta(index_path)
+        stat = path.stat()
+        fresh = meta is not None and meta['size'] == stat.st_size
+        if fresh and (verify or meta['mtime_ns'] != stat.st_mtime_ns):
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                fresh = hashlib.sha256(data).hexdigest() == meta['sha256']
+        if not fresh:
+            if not rebuild:
+                raise ValueError(f"row index for {path} is missing or out of date")
+            cls.build(path, index_path)
+            meta = cls._read_meta(index_path)
+
+        source = open(path, 'rb')
+        sidecar = open(index_path, 'rb')
+        data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        table = mmap.mmap(sidecar.fileno(), 0, access=mmap.ACCESS_READ)
+        start = table.find(b'\n') + 1
+        offsets = memoryview(table)[start:start + _OFFSET.size * (meta['rows'] + 1)]
+        return cls(path, index_path, _header_from_json(meta['header']), meta['rows'], offsets, data,
+                   [offsets, data, table, source, sidecar])
+
+    @staticmethod
+    def _read_meta(index_path: Path) -> Optional[dict]:
+        try:
+            with open(index_path, 'rb') as f:
+                meta = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == INDEX_VERSION else None
+
+    def close(self) -> None:
+        for closer in self._closers:
+            if isinstance(closer, memoryview):
+                closer.release()
+            else:
+                closer.close()
+        self._closers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def offset(self, n: int) -> int:
+        """Byte offset of row n in the source file (n == len(self) gives the end)."""
+        return _OFFSET.unpack_from(self._offsets, n * _OFFSET.size)[0]
+
+    def _check(self, n: int) -> int:
+        if n < 0:
+            n += self._rows
+        if not 0 <= n < self._rows:
+            raise IndexError(f"row {n} out of range ({self._rows} rows)")
+        return n
+
+    def raw_row(self, n: int) -> str:
+        """Row n as its encoded text, without the ◉ and trailing separator."""
+
+        n = self._check(n)
+        text = self._data[self.offset(n):self.offset(n + 1)].decode('utf-8')
+        if self._ascii:
+            return text[:-1] if text.endswith(sym.ASCII_ROW) else _strip_newline(text)
+        text = text[len(sym.ROW):]
+        if n + 1 == self._rows:
+            return split_extension(_strip_newline(text))[0]
+        if text[-1:] not in (sym.SPACE, '\n'):
+            raise ValueError(f"row {n} is not followed by a ▓ or newline separator")
+        return split_extension(text[:-1])[0]
+
+    def row(self, n: int) -> list:
+        """Row n as typed values in schema order."""
+        raw = self.raw_row(n)
+        sep = sym.ASCII_FIELD if self._ascii else sym.FIELD
+        width = len(self._decoders)
+        values = raw.split(sep) if width else ([] if raw == '' else [raw])
+        if len(values) != width:
+            raise ValueError(f"row {n} has {len(values)} fields, schema declares {width}")
+        return [decode(value) for decode, value in zip(self._decoders, values)]
+
+    def record(self, n: int) -> dict:
+        """Row n rebuilt as a nested dict."""
+        return self._builder.build(self.row(n))
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[list]:
+        """Typed rows start..stop-1 (slice semantics)."""
+        for n in range(*slice(start, stop).indices(self._rows)):
+            yield self.row(n)
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        """Nested records start..stop-1 (slice semantics)."""
+        for n in range(*slice(start, stop).indices(self._rows)):
+            yield self.record(n)
+
+    def flat_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        """Rows start..stop-1 as path -> value mappings (array markers omitted)."""
+        for row in self.rows(start, stop):
+            yield {key: row[i] for i, key in self._flat_keys}
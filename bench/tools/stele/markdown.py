@@ -0,0 +1,116 @@
+"""
+Markdown documents as stele rows.
+
+A document becomes one row per block with the fields type, content and
+meta, under an empty root (the layout of the committed
+bench/encoded/markdown fixtures):
+
+- headings: h1-h6, meta ∅
+- paragraphs: p, wrapped lines joined with a space
+- fenced code: code, content verbatim, meta is the info string (or ∅)
+- lists: ul / ol, items joined with `;`
+- tables: table, rows joined with `;` and cells with `,`, meta `<rows>x<cols>`
+  counting the header row
+"""
+
+import re
+from typing import Any
+
+from .encoder import Column, Flattened, emit
+
+FIELDS = ('type', 'content', 'meta')
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_BULLET = re.compile(r'^\s*[-*+]\s+(.*)$')
+_ORDERED = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+_TABLE_RULE = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$')
+
+
+def _cells(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split('|')]
+
+
+def parse(text: str) -> list[dict[str, Any]]:
+    """Split a markdown document into type/content/meta blocks."""
+
+    blocks = []
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        if not stripped:
+            i += 1
+            continue
+
+        if stripped.startswith('```'):
+            fence = stripped[:len(stripped) - len(stripped.lstrip('`'))]
+            info = stripped[len(fence):].strip() or None
+            body = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(fence):
+                body.append(lines[i])
+                i += 1
+            blocks.append({'type': 'code', 'content': '\n'.join(body), 'meta': info})
+            i += 1
+            continue
+
+        heading = _HEADING.match(stripped)
+        if heading:
+            blocks.append({'type': f"h{len(heading.group(1))}",
+                           'content': heading.group(2), 'meta': None})
+            i += 1
+            continue
+
+        if stripped.startswith('|'):
+            rows = []
+            while i < len(lines) and lines[i].strip().startswith('|'):
+                if not _TABLE_RULE.match(lines[i].strip()):
+                    rows.append(_cells(lines[i]))
+                i += 1
+            columns = max(len(row) for row in rows)
+            blocks.append({'type': 'table',
+                           'content': ';'.join(','.join(row) for row in rows),
+                           'meta': f"{len(rows)}x{columns}"})
+            continue
+
+        for kind, pattern in (('ul', _BULLET), ('ol', _ORDERED)):
+            if pattern.match(line):
+                items = []
+                while i < len(lines) and pattern.match(lines[i]):
+                    items.append(pattern.match(lines[i]).group(1).strip())
+                    i += 1
+                blocks.append({'type': kind, 'content': ';'.join(items), 'meta': None})
+                break
+        else:
+            paragraph = []
+            while i < len(lines) and lines[i].strip() and not _starts_block(lines[i]):
+                paragraph.append(lines[i].strip())
+                i += 1
+            blocks.append({'type': 'p', 'content': ' '.join(paragraph), 'meta': None})
+
+    return blocks
+
+
+def _starts_block(line: str) -> bool:
+    stripped = line.strip()
+    return (stripped.startswith(('```', '|')) or _HEADING.match(stripped) is not None
+            or _BULLET.match(line) is not None or _ORDERED.match(line) is not None)
+
+
+def flatten_markdown(text: str) -> Flattened:
+    """Parse markdown into a three-column flattened document."""
+    columns = [Column((name,), 'value', 's') for name in FIELDS]
+    rows = [[block[name] for name in FIELDS] for block in parse(text)]
+    return Flattened('', [], columns, rows)
+
+
+def encode_markdown(text: str, level: str = 'full', multiline: bool = False) -> str:
+    """Encode a markdown document at one stele level."""
+    return emit(flatten_markdown(text), level, multiline)
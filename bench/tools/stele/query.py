@@ -0,0 +1,292 @@
+"""
+Queries over the dictionary-coded columns of a stele document.
+
+ColumnTable reads a document into a ColumnarTable (stele/columnar.py),
+one column per schema path. Low-cardinality string columns hold
+integer codes into one string table shared by the whole document. The
+table opens with the value dictionary in header order, so a token such
+as 𓀁 (or V1 in the ascii layout) maps straight to code 1 without being
+expanded. A string filter or group-by looks its constant up once and
+then compares integers; strings are only decoded for the values a query
+returns.
+
+Paths are dotted and use * for any array index, for example
+organization.departments.*.teams.*.name. A view over the elements of an
+object array resolves fields relative to each element. A leading ../
+steps out to the enclosing element.
+
+Usage:
+    table = ColumnTable.load('variant-a.stele-full')
+    users = table.rows()
+    users.where(role='admin', active=True).count()
+    users.group_count('role')                       # {'user': 4, 'admin': 3, ...}
+    users.where(id=5).value('email')
+
+    teams = table.at('organization.departments.*.teams.*')
+    teams.where(name='DevOps').value('tech_stack')
+    table.at('organization.departments.*.teams.*.members.*') \\
+        .where({'../name': 'Backend Engineering', 'role': 'Engineer'}).values('name')
+
+    table.query({'at': 'organization.departments.*', 'op': 'argmax',
+                 'field': 'employee_count', 'select': 'name'})
+"""
+
+from collections import Counter
+from typing import Any, Optional
+
+from .columnar import CodeColumn, ColumnarTable
+from .decoder import SteleReader
+
+WILDCARD = '*'
+PARENT = '..'
+
+
+def parse_path(path) -> tuple:
+    """'departments.*.name' -> ('departments', '*', 'name'); digits become indices."""
+    if isinstance(path, tuple):
+        return path
+    if not path:
+        return ()
+    return tuple(int(part) if part.isdigit() else part for part in path.split('.'))
+
+
+def _matches(path: tuple, pattern: tuple) -> bool:
+    return len(path) == len(pattern) and all(
+        isinstance(segment, int) if want == WILDCARD else segment == want
+        for segment, want in zip(path, pattern))
+
+
+class ColumnTable:
+    """Query access to a ColumnarTable: its value columns by path."""
+
+    def __init__(self, data: ColumnarTable):
+        self.data = data
+        self.root = data.header.root
+        self.length = data.length
+        self.columns = {}           # path -> storage column
+        self.arrays = set()         # object-array marker paths
+        self.lengths = {}           # marker path -> {row: stated element count}
+        for i, (column, storage) in enumerate(zip(data.header.columns, data.columns)):
+            if storage is None:
+                self.arrays.add(column.path)
+                self.lengths[column.path] = data.lengths.get(i, {})
+            else:
+                self.columns[column.path] = storage
+        self.strings = data.strings.strings
+        self.codes = data.strings.codes
+        self._under = {}
+
+    @classmethod
+    def from_reader(cls, reader: SteleReader) -> 'ColumnTable':
+        """Read the remaining rows of a reader into columns."""
+        return cls(ColumnarTable.from_reader(reader))
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ColumnTable':
+        return cls(ColumnarTable.from_text(text))
+
+    @classmethod
+    def from_document(cls, doc: Any) -> 'ColumnTable':
+        """Encode a parsed JSON document at the full level and read it back as columns."""
+        return cls(ColumnarTable.from_document(doc))
+
+    @classmethod
+    def load(cls, path) -> 'ColumnTable':
+        """Read a stele file, or a .json/.ndjson file encoded in memory first."""
+        return cls(ColumnarTable.load(path))
+
+    def string(self, code: Optional[int]) -> Optional[str]:
+        return None if code is None else self.strings[code]
+
+    def rows(self) -> 'Elements':
+        """A view over the document's rows (the records under its root)."""
+        return Elements(self, (), {(): list(range(self.length))})
+
+    def at(self, pattern) -> 'Elements':
+        """A view over every element whose path matches `pattern`, in document order."""
+
+        pattern = parse_path(pattern)
+        if not pattern:
+            return self.rows()
+        groups = {}
+        for path in self.columns:
+            if len(path) > len(pattern) and _matches(path[:len(pattern)], pattern):
+                groups.setdefault(path[:len(pattern)], None)
+        for prefix in groups:
+            groups[prefix] = [row for row in range(self.length) if self.present(prefix, row)]
+        return Elements(self, pattern, {prefix: rows for prefix, rows in groups.items() if rows})
+
+    def under(self, prefix: tuple) -> list:
+        """(path, column) for the columns at or below `prefix`."""
+        columns = self._under.get(prefix)
+        if columns is None:
+            columns = self._under[prefix] = [
+                (path, values) for path, values in self.columns.items() if path[:len(prefix)] == prefix]
+        return columns
+
+    def present(self, prefix: tuple, row: int) -> bool:
+        """
+        Whether an element exists, by RecordBuilder's rule: its array states
+        a longer element count, or a value at or after its index is non-null.
+        """
+
+        if not prefix or not isinstance(prefix[-1], int):
+            return any(not column.is_null(row) for _, column in self.under(prefix))
+        array, index = prefix[:-1], prefix[-1]
+        count = self.lengths.get(array, {}).get(row)
+        if count is not None:
+            return index < count
+        depth = len(array)
+        return any(path[depth] >= index and not column.is_null(row)
+                   for path, column in self.under(array)
+                   if len(path) > depth and isinstance(path[depth], int))
+
+    def query(self, query: dict) -> Any:
+        """
+        Evaluate a query given as data, as stored in bench/prompts:
+        {"at": pattern, "where": {field: value}, "op": ..., "field": ..., "select": ...}.
+        op is count (the default), value, values, size, sum, min, max, argmax
+        or group_count.
+        """
+
+        view = self.at(query.get('at', ''))
+        if query.get('where'):
+            view = view.where(query['where'])
+        op = query.get('op', 'count')
+        if op == 'count':
+            return view.count()
+        if op == 'argmax':
+            return view.argmax(query['field'], query.get('select'))
+        if op in ('value', 'values', 'size', 'sum', 'min', 'max', 'group_count'):
+            return getattr(view, op)(query['field'])
+        raise ValueError(f"unknown query op {op!r}")
+
+
+class Elements:
+    """A set of rows or array elements of a ColumnTable, grouped by element path."""
+
+    def __init__(self, table: ColumnTable, pattern: tuple, groups: dict):
+        self.table = table
+        self.pattern = pattern
+        self.groups = groups        # element path -> row numbers holding it
+        self._wildcards = [k for k, segment in enumerate(pattern) if segment == WILDCARD]
+
+    def _path(self, prefix: tuple, field) -> tuple:
+        """Absolute column path of `field` for the element at `prefix`."""
+
+        ups = 0
+        if isinstance(field, str):
+            while field.startswith(PARENT + '/'):
+                ups, field = ups + 1, field[len(PARENT) + 1:]
+        if ups:
+            if ups >= len(self._wildcards):
+                raise ValueError(f"{'../' * ups} steps out of {'.'.join(map(str, self.pattern))}")
+            prefix = prefix[:self._wildcards[-1 - ups] + 1]
+        return prefix + parse_path(field)
+
+    def where(self, conditions: Optional[dict] = None, **equals) -> 'Elements':
+        """Elements whose fields equal the given values; strings are compared as codes."""
+
+        conditions = {**(conditions or {}), **equals}
+        groups = {}
+        for prefix, rows in self.groups.items():
+            for field, wanted in conditions.items():
+                column = self.table.columns.get(self._path(prefix, field))
+                if column is None:
+                    rows = []
+                elif isinstance(column, CodeColumn) and wanted is not None:
+                    code = self.table.codes.get(wanted) if isinstance(wanted, str) else None
+                    codes, nulls = column.codes, column.nulls
+                    rows = [row for row in rows if codes[row] == code and not nulls[row]] \
+                        if code is not None else []
+                else:
+                    rows = [row for row in rows if column[row] == wanted
+                            and isinstance(column[row], bool) == isinstance(wanted, bool)]
+                if not rows:
+                    break
+            if rows:
+                groups[prefix] = rows
+        return Elements(self.table, self.pattern, groups)
+
+    def count(self) -> int:
+        return sum(len(rows) for rows in self.groups.values())
+
+    def values(self, field) -> list:
+        """The field's value for every element (a projection); None where absent."""
+
+        out = []
+        for prefix, rows in self.groups.items():
+            column = self.table.columns.get(self._path(prefix, field))
+            if column is None:
+                out.extend(None for _ in rows)
+            else:
+                out.extend(column[row] for row in rows)
+        return out
+
+    def select(self, *fields) -> list[dict]:
+        """One {field: value} dict per element."""
+        columns = [self.values(field) for field in fields]
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def value(self, field) -> Any:
+        """The field of the first element, or None if there is none."""
+        for prefix, rows in self.groups.items():
+            column = self.table.columns.get(self._path(prefix, field))
+            return None if column is None else column[rows[0]]
+        return None
+
+    def group_count(self, field) -> dict:
+        """Element count per distinct value, most common first; counted on codes."""
+
+        counts = Counter()
+        for prefix, rows in self.groups.items():
+            column = self.table.columns.get(self._path(prefix, field))
+            if isinstance(column, CodeColumn):
+                counts.update((True, column.code(row)) for row in rows)
+            else:
+                counts.update((False, None if column is None else column[row]) for row in rows)
+        return {(self.table.string(value) if is_code else value): n
+                for (is_code, value), n in counts.most_common()}
+
+    def _present_values(self, field) -> list:
+        return [value for value in self.values(field) if value is not None]
+
+    def sum(self, field):
+        values = self._present_values(field)
+        return sum(values) if values else None
+
+    def min(self, field):
+        values = self._present_values(field)
+        return min(values) if values else None
+
+    def max(self, field):
+        values = self._present_values(field)
+        return max(values) if values else None
+
+    def argmax(self, field, select=None):
+        """`select` (default: the field itself) of the element with the largest field."""
+        pairs = [(value, chosen) for value, chosen in zip(self.values(field), self.values(select or field))
+                 if value is not None]
+        return max(pairs, key=lambda pair: pair[0])[1] if pairs else None
+
+    def size(self, field):
+        """Total length of the array `field` over the elements; None when there are none."""
+
+        if not self.groups:
+            return None
+        total = 0
+        for prefix, rows in self.groups.items():
+            path = self._path(prefix, field)
+            column = self.table.columns.get(path)
+            if column is not None:
+                offsets = column.offsets
+                total += sum(offsets[row + 1] - offsets[row] for row in rows if not column.is_null(row))
+            elif path in self.table.arrays:
+                children = {p[len(path)] for p in self.table.columns
+                            if len(p) > len(path) and p[:len(path)] == path}
+                total += sum(self.table.present(path + (index,), row)
+                             for index in children for row in rows)
+        return total
+
+    def __len__(self) -> int:
+        return self.count()
@@ -0,0 +1,385 @@
+"""
+Constant-memory encoding of NDJSON streams and large JSON arrays.
+
+encode() needs the whole document in memory. encode_stream() reads records
+one at a time instead. It accepts NDJSON (one record per line, encoded as
+a top-level array) or a JSON document that is a top-level array of
+objects, or an object holding one such array next to scalar fields (the
+`users` array in the flat datasets). The array is parsed incrementally,
+one element at a time.
+
+The header needs the whole schema and the dictionaries before the first
+row, so the source is read twice:
+
+1. Every record is flattened into a SchemaUnion. The string and boolean
+   values of each path are counted for the value dictionary.
+2. The header is written from those statistics. Then the records are read
+   again, aligned to the schema and written `batch_size` rows at a time.
+
+A path or seekable file is simply re-read. A pipe is first spooled to a
+temporary file, which stays in memory up to SPOOL_MEMORY bytes. Peak
+memory is the schema, the value counts and one batch of rows. The output
+is byte-identical to encode() on the loaded document, as long as the
+distinct dictionary candidates fit in `max_distinct`. Past that, values
+seen only once so far are dropped from the counts, which keeps memory
+bounded but can miss a value that only starts repeating later.
+
+A JSON document of any other shape encodes as a single row anyway. It is
+loaded whole and handed to encode().
+
+Usage:
+    from stele.stream import encode_stream
+
+    with open('logs.stele-full', 'w', encoding='utf-8') as out:
+        result = encode_stream('exports/logs.ndjson', out)
+        result.rows, result.streamed, result.pruned
+
+    encode_stream(sys.stdin.buffer, sys.stdout, level='light', ndjson=True)
+"""
+
+import codecs
+import json
+import re
+import shutil
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Optional, TextIO
+
+from . import symbols as sym
+from .dictionary import CostModel, plan
+from .encoder import (
+    LEVELS, Flattened, SchemaUnion, _ascii_safe, _check_name, _dictionary_safe, _rank, _text,
+    ascii_header_segments, ascii_row_segments, assign_field_tokens, encode, field_references,
+    flatten_record, header_lines, row_lines, value_tokens,
+)
+
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 10_000
+MAX_DISTINCT = 250_000
+SPOOL_MEMORY = 64 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+class _NotRecords(Exception):
+    """The document is not a record array, so it encodes as one row."""
+
+
+class _Scanner:
+    """Incremental reader of one JSON text: punctuation and one value at a time."""
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        # Read at least as much as is buffered, so a value spanning many
+        # chunks is re-parsed a logarithmic number of times.
+        chunk = self.stream.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or '' at the end of the text."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if not char or char not in expected:
+            found = repr(char) if char else 'end of input'
+            raise ValueError(f"invalid JSON: expected one of {expected!r}, found {found}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Parse the next whole JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"invalid JSON: {e.msg}") from None
+                self._fill()
+                continue
+            # A number is only whole once something other than a digit,
+            # sign, point or exponent follows it.
+            if isinstance(value, (int, float)) and not self.eof and \
+                    (end == len(self.buffer) or self.buffer[end] in _NUMBER_CHARS):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def elements(self) -> Iterator[Any]:
+        """The values of the array starting at the next character."""
+        self.take('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.take(',]') == ']':
+                return
+
+
+@dataclass
+class _Shape:
+    """Root key and metadata of a record-array document, found on the first pass."""
+
+    root: Optional[str] = None
+    meta: dict = field(default_factory=dict)
+    records: int = 0
+
+
+def _json_records(stream: TextIO, shape: _Shape) -> Iterator[dict]:
+    """
+    The records of a JSON document, filling `shape` with its root key and
+    metadata; raises _NotRecords where split_document would make one row.
+    """
+
+    scanner = _Scanner(stream)
+    first = scanner.peek()
+    if first == '[':
+        shape.root = sym.LIST_ROOT
+        for item in scanner.elements():
+            if not isinstance(item, dict):
+                raise ValueError("top-level array must contain only objects")
+            shape.records += 1
+            yield item
+    elif first == '{':
+        scanner.take('{')
+        closing = scanner.peek() == '}'
+        while not closing:
+            key = scanner.value()
+            if not isinstance(key, str):
+                raise ValueError("invalid JSON: object keys must be strings")
+            scanner.take(':')
+            if key in shape.meta or key == shape.root:
+                raise _NotRecords   # repeated key: json.load keeps the last one
+            if scanner.peek() == '[':
+                if shape.root is not None:
+                    raise _NotRecords
+                shape.root = key
+                for item in scanner.elements():
+                    if not isinstance(item, dict):
+                        raise _NotRecords
+                    shape.records += 1
+                    yield item
+                if not shape.records:
+                    raise _NotRecords
+            else:
+                value = scanner.value()
+                if isinstance(value, (dict, list)):
+                    raise _NotRecords
+                shape.meta[key] = value
+            closing = scanner.take(',}') == '}'
+        if shape.root is None:
+            raise _NotRecords
+    elif first:
+        raise ValueError("top-level value must be an object or an array of objects")
+    else:
+        raise ValueError("invalid JSON: empty input")
+    if scanner.peek():
+        raise ValueError("invalid JSON: extra data after the document")
+
+
+def _ndjson_records(stream: BinaryIO, shape: _Shape) -> Iterator[dict]:
+    shape.root = sym.LIST_ROOT
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"NDJSON line {number}: {e.msg}") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"NDJSON line {number}: expected an object")
+        shape.records += 1
+        yield record
+
+
+class _Counts:
+    """Dictionary candidates per path, pruned to values seen twice when over `limit`."""
+
+    def __init__(self, accept, limit: int):
+        self.accept = accept
+        self.limit = limit
+        self.paths: dict = {}
+        self.size = 0
+        self.pruned = False
+
+    def add(self, values: dict) -> None:
+        for path, value in values.items():
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
+            elif not isinstance(value, str) or not self.accept(value):
+                continue
+            counts = self.paths.get(path)
+            if counts is None:
+                counts = self.paths[path] = Counter()
+            if value not in counts:
+                self.size += 1
+            counts[value] += 1
+        if self.size > self.limit:
+            self._prune()
+
+    def _prune(self) -> None:
+        self.pruned = True
+        self.size = 0
+        for path, counts in self.paths.items():
+            kept = Counter({value: n for value, n in counts.items() if n > 1})
+            self.paths[path] = kept
+            self.size += len(kept)
+
+    def total(self, flat: Flattened) -> Counter:
+        """Counts over the string and boolean value columns, as count_values sees them."""
+        total = Counter()
+        for column in flat.columns:
+            if column.kind == 'value' and column.type in ('s', 'b') and column.path in self.paths:
+                total.update(self.paths[column.path])
+        return total
+
+
+@dataclass
+class StreamResult:
+    """What encode_stream wrote."""
+
+    rows: int
+    streamed: bool      # False when the document was loaded whole (a single row)
+    pruned: bool        # dictionary counts were pruned past max_distinct
+
+
+def _batches(records: Iterator[dict], size: int) -> Iterator[list[tuple[dict, dict]]]:
+    """Flattened records, `size` at a time."""
+    batch = []
+    for record in records:
+        batch.append(flatten_record(record))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _is_ndjson(name: str) -> bool:
+    return Path(name).suffix in ('.ndjson', '.jsonl')
+
+
+@contextmanager
+def _rereadable(source):
+    """A binary stream that can be rewound: the file itself, or a spooled copy of a pipe."""
+
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            yield f
+        return
+    if source.seekable():
+        yield source
+        return
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY) as spool:
+        shutil.copyfileobj(source, spool, CHUNK_SIZE)
+        spool.seek(0)
+        yield spool
+
+
+def _records(f: BinaryIO, ndjson: bool, shape: _Shape) -> Iterator[dict]:
+    if ndjson:
+        yield from _ndjson_records(f, shape)
+        return
+    yield from _json_records(_TextReader(f), shape)
+
+
+class _TextReader:
+    """UTF-8 text reads over a binary stream, which is left open afterwards."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+
+    def read(self, size: int = -1) -> str:
+        data = self.stream.read(size)
+        return self.decoder.decode(data, final=size < 0 or not data)
+
+
+def encode_stream(source, out: TextIO, level: str = 'full', multiline: bool = False,
+                  cost_model: Optional[CostModel] = None, ndjson: Optional[bool] = None,
+                  batch_size: int = BATCH_SIZE, max_distinct: int = MAX_DISTINCT) -> StreamResult:
+    """
+    Encode a JSON or NDJSON source to `out` in two bounded-memory passes.
+
+    `source` is a path or a binary stream. `ndjson` defaults to whether a
+    path ends in .ndjson or .jsonl. Arrays of objects inside records are
+    flattened to indexed paths, as in encode(); there are no sub-tables.
+    """
+
+    if level not in LEVELS:
+        raise ValueError(f"unknown stele level: {level}")
+    if ndjson is None:
+        ndjson = isinstance(source, (str, Path)) and _is_ndjson(str(source))
+    if cost_model is None:
+        cost_model = CostModel(line_separator='\n' if multiline else sym.SPACE)
+
+    with _rereadable(source) as f:
+        start = f.tell()
+
+        # Pass 1: schema, metadata and dictionary counts.
+        shape = _Shape()
+        union = SchemaUnion()
+        counts = _Counts(_ascii_safe if level == 'ascii' else _dictionary_safe, max_distinct)
+        try:
+            for batch in _batches(_records(f, ndjson, shape), batch_size):
+                union.add(batch)
+                if level != 'light':
+                    for values, _ in batch:
+                        counts.add(values)
+        except _NotRecords:
+            f.seek(start)
+            out.write(encode(json.load(_TextReader(f)), level, multiline, cost_model))
+            return StreamResult(1, False, False)
+
+        if shape.root != sym.LIST_ROOT:
+            for key in (shape.root, *shape.meta):
+                _check_name(key)
+        flat = Flattened(shape.root, sorted(shape.meta.items()), union.close(), [])
+
+        if level == 'ascii':
+            total = counts.total(flat)
+            ranked = _rank(total, 2, len(total))
+            values = {value: f"{sym.ASCII_TOKEN_PREFIX}{n}" for n, value in enumerate(ranked, 1)}
+            header, separator = ascii_header_segments(flat, values), sym.ASCII_ROW
+            render = ascii_row_segments
+        else:
+            values = {}
+            if level == 'full':
+                entries = plan(counts.total(flat), _text, value_tokens(), cost_model)
+                values = {entry.value: entry.token for entry in entries}
+            tokens = assign_field_tokens(field_references(flat.columns), values.values(), cost_model)
+            header, separator = header_lines(flat, tokens, values), '\n' if multiline else sym.SPACE
+            render = row_lines
+        out.write(separator.join(header))
+
+        # Pass 2: rows, one batch at a time.
+        f.seek(start)
+        for batch in _batches(_records(f, ndjson, _Shape()), batch_size):
+            lines = render(flat, values, union.rows(batch))
+            out.write(''.join(separator + line for line in lines))
+
+    return StreamResult(shape.records, True, counts.pruned)
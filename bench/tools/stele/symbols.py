@@ -0,0 +1,83 @@
+"""
+Delimiters, type markers and token alphabets from docs/stele.md.
+
+Shared by the encoder and decoder so both sides agree on every code point.
+"""
+
+import base64
+
+SCHEMA = '@'
+ROW = '\u25c9'            # ◉ row start
+FIELD = '\u2503'          # ┃ field separator
+PATH = '\u10fb'           # ჻ nested path separator
+ELEMENT = '\u25c8'        # ◈ primitive array element separator
+NULL = '\u2205'           # ∅ null
+SPACE = '\u2593'          # ▓ minified space
+ARRAY = '\u27e6\u27e7'    # ⟦⟧ array marker
+ESCAPE_OPEN = '\U00013379'   # 𓍹 escape hatch open
+ESCAPE_CLOSE = '\U0001337a'  # 𓍺 escape hatch close
+
+# Superscript type markers (light/full) keyed by their ASCII spelling.
+TYPE_MARKERS = {
+    's': '\u02e2',  # ˢ string
+    'i': '\u2071',  # ⁱ integer
+    'f': '\u1da0',  # ᶠ float
+    'b': '\u1d47',  # ᵇ boolean
+}
+MARKER_TYPES = {marker: name for name, marker in TYPE_MARKERS.items()}
+
+# Token alphabets, in spec priority order: (first code point, count).
+RUNIC = (0x16A0, 89)
+HIEROGLYPHS = (0x13000, 1072)
+CUNEIFORM = (0x12000, 1024)
+
+# Root key used when the document itself is a top-level array of records.
+LIST_ROOT = ARRAY
+
+# ASCII level separators.
+ASCII_FIELD = ','
+ASCII_ROW = ';'
+ASCII_ELEMENT = '|'
+ASCII_TOKEN_PREFIX = 'V'
+
+# Characters that may not appear unescaped inside a light/full value.
+RESERVED = frozenset((ROW, FIELD, ELEMENT, NULL, SPACE, ESCAPE_OPEN, ESCAPE_CLOSE))
+ASCII_RESERVED = frozenset((ASCII_FIELD, ASCII_ROW, ASCII_ELEMENT, ESCAPE_OPEN, ESCAPE_CLOSE))
+
+# Characters that may not appear in a field name or metadata key.
+NAME_RESERVED = frozenset((
+    ROW, FIELD, PATH, ELEMENT, NULL, SPACE, ARRAY[0], ARRAY[1],
+    '=', ',', ';', '[', ']', '\n', ESCAPE_OPEN, ESCAPE_CLOSE,
+)) | frozenset(TYPE_MARKERS.values())
+
+
+def alphabet(start: int, count: int) -> list[str]:
+    """Return the characters of one token block."""
+    return [chr(start + i) for i in range(count)]
+
+
+def in_block(char: str, block: tuple[int, int]) -> bool:
+    """Check whether a single character belongs to a token block."""
+    start, count = block
+    return len(char) == 1 and start <= ord(char) < start + count
+
+
+def escape(text: str) -> str:
+    """
+    Wrap a value in the escape hatch.
+
+    The spec carries escaped values as carrier98 between 𓍹 and 𓍺; the
+    Python tools use base64 for the payload, which needs no extra codec.
+    """
+    payload = base64.b64encode(text.encode('utf-8')).decode('ascii')
+    return f"{ESCAPE_OPEN}{payload}{ESCAPE_CLOSE}"
+
+
+def unescape(text: str) -> str:
+    """Recover the original value from an escape-hatch wrapped value."""
+    return base64.b64decode(text[1:-1]).decode('utf-8')
+
+
+def is_escaped(text: str) -> bool:
+    """Check whether a raw value is wrapped in the escape hatch."""
+    return len(text) >= 2 and text[0] == ESCAPE_OPEN and text[-1] == ESCAPE_CLOSE
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Stand-in for `claude --print --output-format json`, for offline runner tests.
+
+Reads the prompt on stdin, waits a little, and prints a result object with
+the same shape as the real CLI's JSON output (usage, modelUsage, cost,
+durations). Token counts are estimated from the prompt length.
+
+Usage:
+    run-benchmark.py --all --claude ./stub-claude.py
+
+Environment:
+    STUB_CLAUDE_DELAY      seconds per call (default: 0.2)
+    STUB_CLAUDE_FAIL_RATE  probability that a call exits with an error (default: 0)
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+
+def main():
+    args = sys.argv[1:]
+    model = args[args.index('--model') + 1] if '--model' in args else 'stub'
+    prompt = sys.stdin.read()
+
+    delay = float(os.environ.get('STUB_CLAUDE_DELAY', '0.2'))
+    fail_rate = float(os.environ.get('STUB_CLAUDE_FAIL_RATE', '0'))
+
+    start = time.monotonic()
+    time.sleep(delay)
+    if random.random() < fail_rate:
+        print("Error: stub failure (STUB_CLAUDE_FAIL_RATE)", file=sys.stderr)
+        sys.exit(1)
+
+    input_tokens = max(1, len(prompt) // 4)
+    output_tokens = 40 * prompt.count('\nQ: ')
+    cost = input_tokens * 1e-6 + output_tokens * 5e-6
+    elapsed = int((time.monotonic() - start) * 1000)
+    answers = [f"A: stub answer to {line[3:]}" for line in prompt.splitlines() if line.startswith('Q: ')]
+
+    print(json.dumps({
+        'type': 'result',
+        'subtype': 'success',
+        'is_error': False,
+        'duration_ms': elapsed,
+        'duration_api_ms': elapsed,
+        'num_turns': 1,
+        'result': '\n\n'.join(answers),
+        'session_id': str(uuid.uuid4()),
+        'total_cost_usd': cost,
+        'usage': {
+            'input_tokens': input_tokens,
+            'cache_creation_input_tokens': 0,
+            'cache_read_input_tokens': 0,
+            'output_tokens': output_tokens,
+        },
+        'modelUsage': {
+            model: {
+                'inputTokens': input_tokens,
+                'outputTokens': output_tokens,
+                'cacheReadInputTokens': 0,
+                'cacheCreationInputTokens': 0,
+                'costUSD': cost,
+            },
+        },
+    }))
+
+
+if __name__ == '__main__':
+    main()
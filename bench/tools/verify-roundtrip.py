@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Verify that every encoded stele file decodes back to its source JSON.
+
+Each encoded/<path>.stele-<level> is decoded and compared structurally
+against datasets/<path>.json; failures report the first differing path.
+Files are checked in a process pool and verdicts are cached by content
+hash, so a re-run only decodes files whose bytes (or the decoder) changed.
+A check of the whole tree also round-trips EDGE_CASES, small documents the
+datasets do not exercise, in-process at every level and array mode, and
+checks that the encoder refuses REJECTED_CASES.
+
+Usage:
+    verify-roundtrip.py                        # whole bench/encoded tree
+    verify-roundtrip.py flat/500 nested        # only these subtrees
+    verify-roundtrip.py -j 4 --no-cache -v     # 4 workers, ignore cache, list passes
+
+Exit status is 1 when any file fails to round-trip.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import stele
+from stele.encoder import ARRAY_MODES, split_document
+
+BENCH_DIR = Path(__file__).parent.parent
+ENCODED_DIR = BENCH_DIR / "encoded"
+DATASETS_DIR = BENCH_DIR / "datasets"
+CACHE_FILE = BENCH_DIR / ".cache" / "roundtrip.json"
+
+EDGE_CASES = {
+    'null-element': {'r': [{'k': [{'x': None}, {'x': 6}]}]},
+    'trailing-null-element': {'r': [{'a': [{'x': 1}, {'x': None}]}, {'a': [{'x': 2}]}]},
+    'empty-array-element': {'r': [{'k': [{'a': []}, {'a': [1]}]}]},
+    'empty-object-array-element': {'r': [{'k': [{'a': []}, {'a': [{'z': 1}]}]}]},
+    'null-element-after-object': {'r': [{'a': [{'x': 1}, None]}, {'a': [{'x': 2}]}]},
+    'empty-object-element': {'r': [{'a': [{'x': 1}, {}]}]},
+    'nested-null-element': {'r': [{'a': [{'b': [{'c': None}]}, {'b': []}]}, {'a': [{'b': [{'c': 1}]}]}]},
+    'nullable-array': {'r': [{'t': ['a']}, {'t': None}, {'t': []}]},
+    'multiline-metadata': {'title': 'a\nb', 'note': 'c\r\nd', 'r': [{'a': 1}]},
+}
+
+# Shapes stele cannot rebuild; the encoder must refuse them, not guess.
+REJECTED_CASES = {
+    'null-or-object': {'rows': [{'c': {'b': [], 'a': 1}}, {'c': None}]},
+    'null-or-object-element': {'r': [{'a': [None, {'x': 1}]}, {'a': [{'x': 2}]}]},
+    'null-or-object-array': {'r': [{'t': [{'a': 1}]}, {'t': None}]},
+    'value-or-object': {'r': [{'c': 1}, {'c': {'d': 2}}]},
+    'empty-object': {'x': {}},
+    'empty-object-field': {'rows': [{'a': 1, 'b': {}}]},
+}
+
+
+def decoder_fingerprint() -> str:
+    """Hash of the stele package sources, so decoder changes invalidate verdicts."""
+    digest = hashlib.sha256()
+    for source in sorted(Path(stele.__file__).parent.glob("*.py")):
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_for(encoded: Path) -> Path:
+    """encoded/flat/10/variant-a.stele-full -> datasets/flat/10/variant-a.json"""
+    relative = encoded.relative_to(ENCODED_DIR)
+    return DATASETS_DIR / relative.parent / f"{encoded.name.rsplit('.', 1)[0]}.json"
+
+
+def first_difference(expected: Any, actual: Any, path: str = "$") -> Optional[str]:
+    """Describe the first place two JSON values differ, or None if equal."""
+
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in expected:
+            if key not in actual:
+                return f"{path}.{key}: missing from decoded output"
+        for key in actual:
+            if key not in expected:
+                return f"{path}.{key}: not in source"
+        for key in expected:
+            found = first_difference(expected[key], actual[key], f"{path}.{key}")
+            if found:
+                return found
+        return None
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            found = first_difference(a, b, f"{path}[{i}]")
+            if found:
+                return found
+        if len(expected) != len(actual):
+            return f"{path}: expected {len(expected)} items, got {len(actual)}"
+        return None
+
+    # bool is an int subclass, so check it separately from numeric equality.
+    if isinstance(expected, bool) != isinstance(actual, bool) or expected != actual \
+            or isinstance(expected, (dict, list)) != isinstance(actual, (dict, list)):
+        return f"{path}: expected {json.dumps(expected)[:60]}, got {json.dumps(actual)[:60]}"
+    return None
+
+
+def verify(encoded: Path, source: Path) -> dict:
+    """Decode one file and compare it against its source. Runs in a worker."""
+
+    try:
+        with open(encoded, 'r', encoding='utf-8', newline='') as f:
+            reader = stele.SteleReader(f)
+            decoded = reader.document()
+            root = reader.header.root
+    except (ValueError, UnicodeDecodeError) as e:
+        return {'ok': False, 'detail': f"decode error: {e}"}
+
+    with open(source, 'r') as f:
+        expected = json.load(f)
+    difference = first_difference(as_decoded(expected, root), decoded)
+    return {'ok': difference is None, 'detail': difference or ''}
+
+
+def as_decoded(expected: Any, root: str) -> Any:
+    """The source as a decoder gives it back: the ascii level omits the root key of single-table documents."""
+
+    if not root and isinstance(expected, dict):
+        try:
+            source_root, meta, records = split_document(expected)
+        except ValueError:
+            source_root = ''
+        if source_root and not meta:
+            return records
+    return expected
+
+
+def verify_edge_cases() -> list[str]:
+    """
+    Round-trip EDGE_CASES and check that REJECTED_CASES raise ValueError,
+    at every level and array mode; returns one line per failure.
+    """
+
+    failures = []
+    for level in stele.LEVELS:
+        for arrays in ('flatten',) if level == 'ascii' else ARRAY_MODES:
+            for name, doc in EDGE_CASES.items():
+                try:
+                    reader = stele.SteleReader(io.StringIO(stele.encode(doc, level, arrays=arrays)))
+                    difference = first_difference(as_decoded(doc, reader.header.root), reader.document())
+                except ValueError as e:
+                    difference = f"{type(e).__name__}: {e}"
+                if difference:
+                    failures.append(f"{name} ({level}, arrays={arrays}): {difference}")
+            for name, doc in REJECTED_CASES.items():
+                try:
+                    stele.encode(doc, level, arrays=arrays)
+                except ValueError:
+                    continue
+                failures.append(f"{name} ({level}, arrays={arrays}): encoded instead of raising ValueError")
+    return failures
+
+
+def collect_jobs(targets: list[str]) -> tuple[list[tuple[Path, Path]], list[Path]]:
+    """Pair encoded stele files with their source JSON."""
+
+    roots = [ENCODED_DIR / t for t in targets] if targets else [ENCODED_DIR]
+    jobs, orphans = [], []
+    for root in roots:
+        if not root.exists():
+            print(f"Error: Not found: {root}", file=sys.stderr)
+            sys.exit(1)
+        files = [root] if root.is_file() else sorted(root.rglob("*.stele-*"))
+        for encoded in files:
+            source = source_for(encoded)
+            if source.exists():
+                jobs.append((encoded, source))
+            else:
+                orphans.append(encoded)
+    return jobs, orphans
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(path: Path, cache: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify stele round-trips against source JSON.")
+    parser.add_argument('targets', nargs='*',
+                        help="subtrees or files under bench/encoded (default: all)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--no-cache', action='store_true', help="ignore cached verdicts")
+    parser.add_argument('-v', '--verbose', action='store_true', help="also list passing files")
+    args = parser.parse_args()
+
+    jobs, orphans = collect_jobs(args.targets)
+    fingerprint = decoder_fingerprint()
+    cache = {} if args.no_cache else load_cache(CACHE_FILE)
+
+    verdicts = {}
+    pending = []
+    for encoded, source in jobs:
+        key = hashlib.sha256(
+            f"{fingerprint}:{file_hash(encoded)}:{file_hash(source)}".encode()
+        ).hexdigest()
+        if key in cache:
+            verdicts[encoded] = cache[key]
+        else:
+            pending.append((key, encoded, source))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            results = pool.map(verify, [e for _, e, _ in pending], [s for _, _, s in pending])
+            for (key, encoded, _), verdict in zip(pending, results):
+                verdicts[encoded] = cache[key] = verdict
+        save_cache(CACHE_FILE, cache)
+
+    failed = 0
+    for encoded, _ in jobs:
+        verdict = verdicts[encoded]
+        name = encoded.relative_to(ENCODED_DIR)
+        if not verdict['ok']:
+            failed += 1
+            print(f"FAIL  {name}: {verdict['detail']}")
+        elif args.verbose:
+            print(f"ok    {name}")
+
+    if args.verbose:
+        for encoded in orphans:
+            print(f"skip  {encoded.relative_to(ENCODED_DIR)}: no source JSON")
+
+    edge_failures = [] if args.targets else verify_edge_cases()
+    for failure in edge_failures:
+        print(f"FAIL  edge case {failure}")
+
+    print()
+    print(f"{len(jobs) - failed} passed, {failed} failed, {len(orphans)} without source "
+          f"({len(jobs) - len(pending)} cached, {len(pending)} decoded)")
+    if not args.targets:
+        print(f"Edge cases: {len(EDGE_CASES) + len(REJECTED_CASES)} documents, {len(edge_failures)} failing level/mode pairs")
+    sys.exit(1 if failed or edge_failures else 0)
+
+
+if __name__ == '__main__':
+    main()